@@ -11,10 +11,10 @@ warnings.filterwarnings('ignore')
 class AIEngine:
     """AI-powered cricket analytics and predictions"""
     
-    def __init__(self, matches_df: pd.DataFrame, deliveries_df: pd.DataFrame):
+    def __init__(self, matches_df: pd.DataFrame, deliveries_df: pd.DataFrame, stats_engine: StatsEngine = None):
         self.matches_df = matches_df
         self.deliveries_df = deliveries_df
-        self.stats_engine = StatsEngine(matches_df, deliveries_df)
+        self.stats_engine = stats_engine or StatsEngine(matches_df, deliveries_df)
         self.models = {}
         self._prepare_features()
     
@@ -25,29 +25,14 @@ class AIEngine:
     
     def _calculate_team_features(self) -> pd.DataFrame:
         """Calculate team-level features"""
-        teams = pd.concat([
-            self.matches_df['team1'],
-            self.matches_df['team2']
-        ]).unique()
-        
-        team_features = []
-        for team in teams:
-            team_matches = self.matches_df[
-                (self.matches_df['team1'] == team) | (self.matches_df['team2'] == team)
-            ]
-            
-            wins = len(self.matches_df[self.matches_df['winner'] == team])
-            total = len(team_matches)
-            
-            team_features.append({
-                'team': team,
-                'total_matches': total,
-                'wins': wins,
-                'win_rate': wins / total if total > 0 else 0,
-                'avg_result_margin': team_matches['result_margin'].mean()
-            })
-        
-        return pd.DataFrame(team_features)
+        overall = self.stats_engine.team_tables.team_overall
+        return pd.DataFrame({
+            'team': overall['team'],
+            'total_matches': overall['matches'],
+            'wins': overall['wins'],
+            'win_rate': overall['wins'] / overall['matches'],
+            'avg_result_margin': overall['avg_result_margin']
+        })
     
     def _calculate_player_features(self) -> Dict:
         """Calculate player-level features (lazy-loaded)"""
@@ -126,22 +111,13 @@ class AIEngine:
     
     def get_trend_analysis(self, team: str, years: int = 5) -> Dict:
         """Analyze team performance trends"""
-        team_matches = self.matches_df[
-            (self.matches_df['team1'] == team) | (self.matches_df['team2'] == team)
-        ].sort_values('date')
+        team_seasons = self.stats_engine.team_tables.get_team_seasons(team)
         
-        if len(team_matches) == 0:
+        if len(team_seasons) == 0:
             return {'error': f'No matches found for {team}'}
         
-        recent_matches = team_matches.tail(years * 15)  # ~15 matches per season
-        wins_by_year = {}
-        
-        for year in recent_matches['year'].unique():
-            year_matches = recent_matches[recent_matches['year'] == year]
-            wins = len(self.matches_df[
-                (self.matches_df['year'] == year) & (self.matches_df['winner'] == team)
-            ])
-            wins_by_year[int(year)] = wins
+        recent_seasons = team_seasons.tail(years)
+        wins_by_year = {int(year): int(wins) for year, wins in zip(recent_seasons['year'], recent_seasons['wins'])}
         
         return {
             'team': team,
@@ -223,13 +199,10 @@ class AIEngine:
     
     def _batter_vs_bowler(self, batter: str, bowler: str) -> Dict:
         """Compare batter vs bowler head-to-head"""
-        # Get deliveries where batter faced this bowler
-        head_to_head_deliveries = self.deliveries_df[
-            (self.deliveries_df['batter'] == batter) & 
-            (self.deliveries_df['bowler'] == bowler)
-        ]
+        # Look up the pair in the prebuilt matchup matrix instead of scanning deliveries
+        matchup = self.stats_engine.matchups.get(batter, bowler)
         
-        if len(head_to_head_deliveries) == 0:
+        if matchup['deliveries'] == 0:
             return {
                 'type': 'batter_vs_bowler',
                 'batter': batter,
@@ -238,9 +211,9 @@ class AIEngine:
             }
         
         # Batter stats against this bowler
-        batter_runs = head_to_head_deliveries['batsman_runs'].sum()
-        batter_balls = len(head_to_head_deliveries)
-        batter_dismissals = len(head_to_head_deliveries[head_to_head_deliveries['is_wicket'] == 1])
+        batter_runs = matchup['runs']
+        batter_balls = matchup['deliveries']
+        batter_dismissals = matchup['dismissals']
         
         # Overall batter stats
         overall_batter_stats = self.stats_engine.get_player_stats(batter)
@@ -1,12 +1,19 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import Depends, FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import Optional, List
-from data_loader import IPLDataLoader
-from stats_engine import StatsEngine
-from ai_engine import AIEngine
-from models import PlayerStats, TeamStats, APIResponse
+from engine_context import EngineContext
+from models import (PlayerStats, TeamStats, APIResponse, Answer, ChatRequest, BatchChatRequest, StatsFilters,
+                    PlayersStatsRequest, TeamsStatsRequest)
+from pydantic import ValidationError
+from renderers import block_markdown, render_json, render_markdown
+from endpoint_pool import EndpointPool, PoolSaturated
+import asyncio
+import functools
+import json
+import os
 import uvicorn
+import config
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -25,12 +32,23 @@ app.add_middleware(
 )
 
 # Initialize data and engines globally
-loader = IPLDataLoader()
-matches_df, deliveries_df = loader.load_data()
-matches_df, deliveries_df = loader.preprocess_data()
+context = EngineContext.get()
+loader = context.loader
+matches_df, deliveries_df = context.matches_df, context.deliveries_df
 
-stats_engine = StatsEngine(matches_df, deliveries_df)
-ai_engine = AIEngine(matches_df, deliveries_df)
+stats_engine = context.stats_engine
+ai_engine = context.ai_engine
+
+# CPU-bound endpoint work runs on this pool; the event loop only handles I/O
+pool = EndpointPool(workers=config.API_POOL_WORKERS, limits=config.API_ENDPOINT_CONCURRENCY,
+                    max_queue=config.API_ENDPOINT_MAX_QUEUE)
+
+async def offload(endpoint: str, fn, *args, **kwargs):
+    """Run fn on the worker pool under the endpoint's concurrency limit (503 when its queue is full)"""
+    try:
+        return await pool.run(endpoint, fn, *args, **kwargs)
+    except PoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
 
 # Health check endpoint
 @app.get("/health")
@@ -45,7 +63,7 @@ async def health_check():
 @app.get("/api/dataset/summary")
 async def get_dataset_summary():
     """Get summary statistics of the dataset"""
-    summary = loader.get_summary_stats()
+    summary = await offload('dataset', loader.get_summary_stats)
     return {
         "status": "success",
         "data": summary
@@ -54,10 +72,10 @@ async def get_dataset_summary():
 @app.get("/api/dataset/teams")
 async def get_all_teams():
     """Get all teams in the dataset"""
-    teams = sorted(set(
+    teams = await offload('dataset', lambda: sorted(set(
         list(matches_df['team1'].unique()) + 
         list(matches_df['team2'].unique())
-    ))
+    )))
     return {
         "status": "success",
         "data": {"teams": teams, "count": len(teams)}
@@ -72,19 +90,60 @@ async def get_all_years():
         "data": {"years": years.tolist(), "count": len(years)}
     }
 
+# Stats filters
+def resolve_filters(filters: StatsFilters) -> StatsFilters:
+    """Filters with the opposition and ground replaced by their names in the dataset (422 if unknown)"""
+    names = {}
+    if filters.opposition_team:
+        names['opposition_team'] = stats_engine.find_team(filters.opposition_team)
+        if not names['opposition_team']:
+            raise HTTPException(status_code=422, detail=f"Unknown team: {filters.opposition_team}")
+    if filters.ground:
+        names['ground'] = stats_engine.find_venue(filters.ground)
+        if not names['ground']:
+            raise HTTPException(status_code=422, detail=f"Unknown ground: {filters.ground}")
+    return filters.model_copy(update=names) if names else filters
+
+def stats_filters(
+    seasons: Optional[List[str]] = Query(None, description="Seasons, repeated or comma-separated: 2023,2024"),
+    phase: Optional[str] = Query(None, description="powerplay, middle_overs, death_overs, opening or closing"),
+    situation: Optional[str] = Query(None, description="batting_first, chasing, defending, pressure_chase or winning_position"),
+    vs_conditions: Optional[str] = Query(None, description="vs_pace, vs_spin, vs_left_arm, vs_right_arm, vs_off_spin or vs_leg_spin"),
+    opposition: Optional[str] = Query(None, description="Opposition team"),
+    ground: Optional[str] = Query(None, description="Ground / venue"),
+    handedness: Optional[str] = Query(None, description="Batter handedness: left_handed or right_handed"),
+    innings: Optional[int] = Query(None, ge=1, le=2, description="1 = batting first, 2 = chasing"),
+    match_type: Optional[str] = Query(None, description="home or away")
+) -> StatsFilters:
+    """Query parameters validated into canonical StatsFilters"""
+    try:
+        filters = StatsFilters(seasons=seasons, match_phase=phase, match_situation=situation,
+                               vs_conditions=vs_conditions, opposition_team=opposition, ground=ground,
+                               handedness=handedness, innings_order=innings, match_type=match_type)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+    return resolve_filters(filters)
+
 # Player statistics endpoints
 @app.get("/api/player/{player_name}")
-async def get_player_stats(player_name: str):
-    """Get comprehensive statistics for a player"""
+async def get_player_stats(player_name: str, filters: StatsFilters = Depends(stats_filters)):
+    """Get comprehensive statistics for a player, optionally filtered (seasons, phase, opposition, ...)"""
     try:
-        stats = stats_engine.get_player_stats(player_name)
-        if not stats or (not stats.get('batting') and not stats.get('bowling')):
+        # Filtered stats are cached under filters.cache_key(), however the query spelled them
+        stats = await offload('player', stats_engine.get_player_stats, player_name, filters.to_filters() or None)
+        if not stats or 'error' in stats:
             raise HTTPException(status_code=404, detail=f"Player {player_name} not found")
+        if not stats.get('batting') and not stats.get('bowling'):
+            detail = f"No data for {stats['player']} with these filters" if filters.to_filters() else f"Player {player_name} not found"
+            raise HTTPException(status_code=404, detail=detail)
         
         return {
             "status": "success",
-            "data": stats
+            "data": stats,
+            "filters": filters.to_filters()
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -95,7 +154,7 @@ async def get_top_players(
 ):
     """Get top players by category"""
     try:
-        players = stats_engine.get_top_performers(category, limit)
+        players = await offload('players_top', stats_engine.get_top_performers, category, limit)
         return {
             "status": "success",
             "data": {
@@ -104,6 +163,8 @@ async def get_top_players(
                 "count": len(players)
             }
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -114,11 +175,38 @@ async def get_player_form(
 ):
     """Get recent form of a player"""
     try:
-        form = stats_engine.get_player_form(player_name, last_n_matches)
+        form = await offload('player_form', stats_engine.get_player_form, player_name, last_n_matches)
         return {
             "status": "success",
             "data": form
         }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _check_bulk_size(names: List[str]):
+    if len(names) > config.BULK_STATS_MAX_NAMES:
+        raise HTTPException(status_code=413, detail=f"At most {config.BULK_STATS_MAX_NAMES} names per request")
+
+@app.post("/api/players/stats")
+async def get_players_stats(request: PlayersStatsRequest):
+    """Statistics for several players under one filter set, computed together in one pass"""
+    _check_bulk_size(request.players)
+    filters = resolve_filters(request.filters)
+    try:
+        def players_stats():
+            not_found = [name for name in request.players if not stats_engine.find_player(name)]
+            return stats_engine.get_players_stats_batch(request.players, filters.to_filters() or None), not_found
+
+        players, not_found = await offload('players_bulk', players_stats)
+        return {
+            "status": "success",
+            "data": {"players": players, "not_found": not_found, "count": len(players)},
+            "filters": filters.to_filters()
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -127,11 +215,13 @@ async def get_player_form(
 async def get_team_stats(team_name: str):
     """Get statistics for a team"""
     try:
-        stats = stats_engine.get_team_stats(team_name)
+        stats = await offload('team', stats_engine.get_team_stats, team_name)
         return {
             "status": "success",
             "data": stats
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -139,15 +229,46 @@ async def get_team_stats(team_name: str):
 async def get_team_matches(team_name: str):
     """Get all matches for a team"""
     try:
-        matches = loader.get_team_matches(team_name)
+        def team_matches():
+            matches = loader.get_team_matches(team_name)
+            return len(matches), matches[['id', 'date', 'team1', 'team2', 'winner', 'venue']].to_dict('records')
+        
+        total, matches = await offload('team_matches', team_matches)
         return {
             "status": "success",
             "data": {
                 "team": team_name,
-                "total_matches": len(matches),
-                "matches": matches[['id', 'date', 'team1', 'team2', 'winner', 'venue']].to_dict('records')
+                "total_matches": total,
+                "matches": matches
             }
         }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/teams/stats")
+async def get_teams_stats(request: TeamsStatsRequest):
+    """Record plus batting and bowling aggregates for several teams, computed together in one pass"""
+    _check_bulk_size(request.teams)
+    unsupported = sorted(set(request.filters.to_filters()) - {'seasons', 'match_phase'})
+    if unsupported:
+        raise HTTPException(status_code=422, detail=f"Team stats only take seasons and match_phase filters, not: {', '.join(unsupported)}")
+    if request.filters.match_phase and request.filters.match_phase not in stats_engine.team_tables.PHASES:
+        raise HTTPException(status_code=422, detail=f"Team stats phases are {', '.join(stats_engine.team_tables.PHASES)}")
+    try:
+        def teams_stats():
+            not_found = [name for name in request.teams if not stats_engine.find_team(name)]
+            return stats_engine.get_teams_summary_batch(request.teams, request.filters.to_filters()), not_found
+
+        teams, not_found = await offload('teams_bulk', teams_stats)
+        return {
+            "status": "success",
+            "data": {"teams": teams, "not_found": not_found, "count": len(teams)},
+            "filters": request.filters.to_filters()
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -156,11 +277,13 @@ async def get_team_matches(team_name: str):
 async def predict_match(team1: str, team2: str):
     """Predict match outcome between two teams"""
     try:
-        prediction = ai_engine.predict_match_winner(team1, team2)
+        prediction = await offload('predict', ai_engine.predict_match_winner, team1, team2)
         return {
             "status": "success",
             "data": prediction
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -171,11 +294,13 @@ async def predict_player(
 ):
     """Predict player performance"""
     try:
-        prediction = ai_engine.predict_player_performance(player_name, match_type)
+        prediction = await offload('predict', ai_engine.predict_player_performance, player_name, match_type)
         return {
             "status": "success",
             "data": prediction
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -184,11 +309,13 @@ async def predict_player(
 async def get_trend(team_name: str):
     """Get performance trend for a team"""
     try:
-        trend = ai_engine.get_trend_analysis(team_name)
+        trend = await offload('analysis', ai_engine.get_trend_analysis, team_name)
         return {
             "status": "success",
             "data": trend
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -196,11 +323,13 @@ async def get_trend(team_name: str):
 async def get_h2h(team1: str, team2: str):
     """Get head-to-head statistics between teams"""
     try:
-        h2h = ai_engine.get_head_to_head(team1, team2)
+        h2h = await offload('analysis', ai_engine.get_head_to_head, team1, team2)
         return {
             "status": "success",
             "data": h2h
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -208,14 +337,138 @@ async def get_h2h(team1: str, team2: str):
 async def get_insights():
     """Get AI-generated insights"""
     try:
-        insights = ai_engine.get_insights()
+        insights = await offload('insights', ai_engine.get_insights)
         return {
             "status": "success",
             "data": {"insights": insights}
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Chat endpoints
+def get_chatbot():
+    """The chatbot shared by all chat requests, built on first use around the engine above"""
+    chatbot = context.get_chatbot(os.getenv("OPENAI_API_KEY"))
+    # Its stats work goes through the pool like every other endpoint's
+    chatbot.offload = functools.partial(pool.run, 'chat')
+    return chatbot
+
+# Answers still running after their client disconnected (they finish and are cached)
+_background_answers = set()
+
+def _answer_payload(query: str, answer: Answer, fmt: str) -> dict:
+    if fmt == 'json':
+        return {"query": query, **render_json(answer)}
+    return {"query": query, "query_type": answer.query_type, "error": answer.error,
+            "answer": render_markdown(answer)}
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+async def _chat_events(request: ChatRequest):
+    """Server-sent events for one query: query, parsed, one block per answer block, then done"""
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    async def produce():
+        try:
+            async for event in get_chatbot().astream_answer(request.query, request.session_id):
+                await queue.put(event)
+        except Exception as e:
+            await queue.put(('error', {"message": str(e)}))
+        finally:
+            await queue.put(None)
+    
+    # The answer runs in its own task so a disconnect does not abandon it half-computed
+    task = asyncio.create_task(produce())
+    _background_answers.add(task)
+    task.add_done_callback(_background_answers.discard)
+    
+    while (item := await queue.get()) is not None:
+        event, data = item
+        if event == 'query':
+            yield _sse('query', {"query": data})
+        elif event == 'parsed':
+            yield _sse('parsed', {field: value for field, value in data.items() if value is not None})
+        elif event == 'answer':
+            for index, block in enumerate(data.blocks):
+                yield _sse('block', {"index": index, "markdown": block_markdown(block)})
+            done = {"query_type": data.query_type, "error": data.error}
+            if request.format == 'json':
+                done = render_json(data)
+            yield _sse('done', done)
+        else:
+            yield _sse(event, data)
+
+@app.post("/api/chat")
+async def chat(request: ChatRequest):
+    """Answer a natural-language IPL question; with stream=true as server-sent events"""
+    if request.stream:
+        return StreamingResponse(_chat_events(request), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache"})
+    try:
+        answer = await get_chatbot().aget_answer(request.query, request.session_id)
+        return {
+            "status": "success",
+            "data": _answer_payload(request.query, answer, request.format)
+        }
+    except PoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/chat/batch")
+async def chat_batch(request: BatchChatRequest):
+    """Answer several questions concurrently; with stream=true each result is sent as it completes"""
+    if len(request.queries) > config.CHAT_BATCH_MAX_QUERIES:
+        raise HTTPException(status_code=413, detail=f"At most {config.CHAT_BATCH_MAX_QUERIES} queries per batch")
+    chatbot = get_chatbot()
+    
+    async def answer(index: int, query: str):
+        try:
+            return index, _answer_payload(query, await chatbot.aget_answer(query), request.format)
+        except Exception as e:
+            return index, {"query": query, "error": str(e)}
+    
+    # Repeated queries share one parse and one computation
+    pending = [answer(index, query) for index, query in enumerate(request.queries)]
+    if request.stream:
+        async def events():
+            for finished in asyncio.as_completed(pending):
+                index, payload = await finished
+                yield _sse('result', {"index": index, **payload})
+            yield _sse('done', {"count": len(pending)})
+        return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+    
+    results = await asyncio.gather(*pending)
+    return {
+        "status": "success",
+        "data": {"results": [payload for _, payload in results], "count": len(results)}
+    }
+
+@app.delete("/api/chat/session/{session_id}")
+async def end_chat_session(session_id: str):
+    """Forget a chat session's context"""
+    get_chatbot().end_session(session_id)
+    return {"status": "success"}
+
+@app.get("/api/pool/stats")
+async def get_pool_stats():
+    """Get worker pool backlog and per-endpoint queue depth, load and timings"""
+    return {
+        "status": "success",
+        "data": pool.stats()
+    }
+
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Get result cache size and hit/miss counters"""
+    return {
+        "status": "success",
+        "data": {"dataset_version": stats_engine.dataset_version, **stats_engine.cache_stats()}
+    }
+
 # Error handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -1,10 +1,9 @@
 # IPL Analytics ChatBot - Modern UI with Working Bottom Navigation
 import streamlit as st
 import pandas as pd
-from data_loader import IPLDataLoader
-from stats_engine import StatsEngine
-from ai_engine import AIEngine
-from openai_handler import CricketChatbot
+from engine_context import EngineContext
+from renderers import render_markdown, chart_series
+import config
 import os
 import warnings
 from pathlib import Path
@@ -128,16 +127,13 @@ st.markdown("""
 # Initialize data
 @st.cache_resource
 def load_data():
-    loader = IPLDataLoader()
-    matches, deliveries = loader.load_data()
-    matches, deliveries = loader.preprocess_data()
-    return loader, StatsEngine(matches, deliveries), AIEngine(matches, deliveries)
+    context = EngineContext.get()
+    return context.loader, context.stats_engine, context.ai_engine
 
 @st.cache_resource
 def init_chatbot(api_key):
     """Initialize chatbot once and cache it"""
-    loader_cached, _, _ = load_data()
-    return CricketChatbot(loader_cached.matches_df, loader_cached.deliveries_df, api_key)
+    return EngineContext.get().get_chatbot(api_key)
 
 @st.cache_data
 def get_all_players_and_teams():
@@ -221,7 +217,7 @@ with tab_cricbot:
     
     api_key, _ = _get_openai_api_key()
     
-    if not api_key:
+    if not api_key and config.LLM_BACKEND == "openai":
         st.error("❌ OpenAI API key not found in `.env` or Streamlit secrets.")
         st.markdown("""Add to `.env`:
 ```
@@ -248,8 +244,13 @@ OPENAI_API_KEY=sk-proj-your-key-here
             if search_btn and user_query:
                 st.divider()
                 with st.spinner("🔍 Analyzing..."):
-                    response = chatbot.get_response(user_query)
-                st.markdown(response)
+                    answer = chatbot.get_answer(user_query)
+                st.markdown(render_markdown(answer))
+                
+                # Charts come from the same computed answer as the text
+                for key, chart in chart_series(answer).items():
+                    with st.expander(f"📊 {chart['title'] or key.replace('_', ' ').title()} chart"):
+                        st.bar_chart(pd.DataFrame(chart['series'], index=chart['labels']))
                 st.session_state.show_output = True
                 
         except Exception as e:
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Batch chatbot evaluation over a query log
+
+    python batch_eval.py queries.jsonl --output results.jsonl --workers 4
+
+Each input line is a JSON object with a "query" (and optionally "id" and
+"expected_query_type"), a bare JSON string, or plain query text. Queries are
+spell-corrected, normalized and parsed once per distinct text in the parent
+process (model parses run concurrently); queries whose parses are identical
+share one answer.
+Answers are computed by forked worker processes that inherit the loaded data,
+so the dataset is read and indexed once. Every input line gets a result line
+with its routed query type, timings and error, and a throughput/latency
+summary is printed at the end.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import config
+from models import ERROR_PREFIXES
+from tracing import start_trace, note
+
+# The chatbot forked workers answer with (set in the parent before the pool starts)
+_chatbot = None
+
+# Parses whose answer still depends on the query text (intent fallback, team lookup, "who won ipl 2016")
+QUERY_DEPENDENT_TYPES = (None, 'general', 'team_stats')
+
+
+def read_queries(path: str) -> List[Dict]:
+    """Query records from a JSONL file (or '-' for stdin), in input order"""
+    records = []
+    stream = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8')
+    try:
+        for line_number, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                record = line
+            if isinstance(record, str):
+                record = {'query': record}
+            if not isinstance(record, dict) or not str(record.get('query', '')).strip():
+                print(f"Warning: Skipping line {line_number}: no query")
+                continue
+            record.setdefault('id', line_number)
+            records.append(record)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    return records
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    ordered = sorted(values)
+    pick = lambda fraction: round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 2)
+    return {'p50_ms': pick(0.50), 'p95_ms': pick(0.95), 'p99_ms': pick(0.99), 'max_ms': round(ordered[-1], 2)}
+
+
+def _answer_key(query: str, parsed: Dict) -> str:
+    """Queries with equal keys get the same answer"""
+    plan = {field: value for field, value in parsed.items() if field != 'interpretation'}
+    if parsed.get('query_type') in QUERY_DEPENDENT_TYPES:
+        plan['_query'] = ' '.join(query.lower().split())
+    return json.dumps(plan, sort_keys=True, default=str)
+
+
+# ===== PARENT: PARSE AND DEDUPLICATE =====
+
+def parse_queries(chatbot, queries: Iterable[str], concurrency: int) -> Dict[str, Tuple[Dict, float, Dict]]:
+    """{corrected query: (parse, parse ms, trace notes)}; model-bound parses overlap in threads"""
+    def parse(query: str):
+        with start_trace(query) as trace:
+            try:
+                parsed = chatbot.parse_query(query)
+            except Exception as e:
+                note('parse_error', f"{type(e).__name__}: {e}")
+                parsed = None
+        return query, (parsed, trace.total_ms, trace.notes)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        return dict(pool.map(parse, queries))
+
+
+# ===== WORKERS: ANSWER =====
+
+def _init_worker():
+    """Forked child: give the inherited caches their own locks and connections"""
+    _chatbot.after_fork()
+
+
+def _answer(item: Tuple[str, str, Dict]) -> Tuple[str, Dict]:
+    key, query, parsed = item
+    with start_trace(query) as trace:
+        try:
+            response = _chatbot._answer_query(query, parsed)
+            error = response.strip()[:200] if response.lstrip().startswith(ERROR_PREFIXES) else None
+        except Exception as e:
+            response, error = None, f"{type(e).__name__}: {e}"
+    return key, {
+        'response': response,
+        'error': error,
+        'query_type': trace.notes.get('query_type', parsed.get('query_type')),
+        'answer_ms': trace.total_ms,
+        'stages': trace.stage_timings(),
+    }
+
+
+def answer_parses(items: List[Tuple[str, str, Dict]], workers: int) -> Iterable[Tuple[str, Dict]]:
+    """Answer each distinct parse, in forked workers when the platform can fork"""
+    if workers > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        pool = multiprocessing.get_context('fork').Pool(workers, initializer=_init_worker)
+        try:
+            chunksize = max(1, len(items) // (workers * 8))
+            yield from pool.imap_unordered(_answer, items, chunksize=chunksize)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        if workers > 1:
+            print("Warning: fork() is not available - answering in this process")
+        yield from map(_answer, items)
+
+
+# ===== RUN =====
+
+def run(records: List[Dict], chatbot, workers: int, parse_concurrency: int,
+        include_responses: bool = True) -> Tuple[List[Dict], Dict]:
+    global _chatbot
+    _chatbot = chatbot
+    started = time.perf_counter()
+
+    # Case and spacing never change a parse, so queries differing only in those are parsed once
+    corrected = [' '.join(chatbot._correct_spelling(str(record['query'])).lower().split()) for record in records]
+    parses = parse_queries(chatbot, dict.fromkeys(corrected), parse_concurrency)
+    parse_done = time.perf_counter()
+
+    # One answer per distinct plan; failed parses are reported without one
+    answer_keys: Dict[str, str] = {}
+    items = {}
+    for query, (parsed, _, _) in parses.items():
+        if parsed is not None:
+            key = _answer_key(query, parsed)
+            answer_keys[query] = key
+            items.setdefault(key, (key, query, parsed))
+    answers = dict(answer_parses(list(items.values()), workers))
+    wall = time.perf_counter() - started
+
+    results = []
+    for record, query in zip(records, corrected):
+        parsed, parse_ms, notes = parses[query]
+        answer = answers.get(answer_keys.get(query), {})
+        result = {
+            'id': record['id'],
+            'query': record['query'],
+            'corrected_query': query if query != ' '.join(str(record['query']).lower().split()) else None,
+            'query_type': answer.get('query_type') or (parsed or {}).get('query_type'),
+            'parse_source': notes.get('parse_source'),
+            'parse_ms': parse_ms,
+            'answer_ms': answer.get('answer_ms'),
+            'error': notes.get('parse_error') or answer.get('error'),
+        }
+        if record.get('expected_query_type'):
+            result['expected_query_type'] = record['expected_query_type']
+            result['intent_match'] = result['query_type'] == record['expected_query_type']
+        if include_responses:
+            result['response'] = answer.get('response')
+        results.append(result)
+
+    stage_times: Dict[str, List[float]] = {}
+    for answer in answers.values():
+        for name, stage in answer.get('stages', {}).items():
+            stage_times.setdefault(name, []).append(stage['self_ms'])
+
+    latencies = [r['parse_ms'] + (r['answer_ms'] or 0) for r in results]
+    intents: Dict[str, int] = {}
+    for result in results:
+        intents[str(result['query_type'])] = intents.get(str(result['query_type']), 0) + 1
+    labelled = [r for r in results if 'intent_match' in r]
+    parse_sources: Dict[str, int] = {}
+    for notes in (notes for _, _, notes in parses.values()):
+        source = str(notes.get('parse_source'))
+        parse_sources[source] = parse_sources.get(source, 0) + 1
+
+    summary = {
+        'queries': len(records),
+        'distinct_queries': len(parses),
+        'distinct_answers': len(items),
+        'workers': workers,
+        'wall_seconds': round(wall, 2),
+        'parse_seconds': round(parse_done - started, 2),
+        'throughput_qps': round(len(records) / wall, 2) if wall > 0 else None,
+        'errors': sum(1 for r in results if r['error']),
+        'latency': _percentiles(latencies),
+        'answer_latency': _percentiles([a['answer_ms'] for a in answers.values()]),
+        'stages': {name: _percentiles(times) for name, times in sorted(stage_times.items())},
+        'query_types': dict(sorted(intents.items(), key=lambda item: -item[1])),
+        'parse_sources': parse_sources,
+    }
+    if labelled:
+        summary['intent_accuracy'] = round(sum(r['intent_match'] for r in labelled) / len(labelled), 4)
+    return results, summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Evaluate chatbot queries from a JSONL file in batch")
+    parser.add_argument('queries', help="JSONL query file ('-' for stdin)")
+    parser.add_argument('-o', '--output', default='batch_results.jsonl', help="one JSON result per query")
+    parser.add_argument('--summary', help="also write the summary JSON here")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1,
+                        help="answer worker processes (default: CPU count)")
+    parser.add_argument('--parse-concurrency', type=int, default=config.LLM_MAX_CONCURRENCY,
+                        help="concurrent query parses (model calls)")
+    parser.add_argument('--backend', choices=['openai', 'local', 'record'],
+                        help="LLM backend (default: config.LLM_BACKEND)")
+    parser.add_argument('--data-dir', default='.', help="directory with matches.csv and deliveries.csv")
+    parser.add_argument('--no-responses', action='store_true', help="leave answer text out of the results")
+    args = parser.parse_args(argv)
+
+    if args.backend:
+        config.LLM_BACKEND = args.backend
+    records = read_queries(args.queries)
+    if not records:
+        print("No queries to evaluate")
+        return 1
+
+    from engine_context import EngineContext
+    chatbot = EngineContext.get(args.data_dir).get_chatbot(os.getenv("OPENAI_API_KEY"))
+    results, summary = run(records, chatbot, max(1, args.workers), args.parse_concurrency,
+                           include_responses=not args.no_responses)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        for result in results:
+            f.write(json.dumps(result, ensure_ascii=False, default=str) + '\n')
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+    print(json.dumps(summary, indent=2))
+    print(f"\n✅ {len(results)} results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
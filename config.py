@@ -1,5 +1,7 @@
 # IPL Analytics AI Platform - Configuration File
 
+import os
+
 # Data Settings
 DATA_DIR = "."
 MATCHES_CSV = "matches.csv"
@@ -10,6 +12,15 @@ API_HOST = "0.0.0.0"
 API_PORT = 8000
 API_WORKERS = 4
 DEBUG = False
+CHAT_BATCH_MAX_QUERIES = 50  # queries per /api/chat/batch request
+BULK_STATS_MAX_NAMES = 50  # players or teams per /api/players/stats or /api/teams/stats request
+API_POOL_WORKERS = 4  # threads running CPU-bound endpoint work off the event loop
+API_ENDPOINT_CONCURRENCY = {  # requests of one endpoint running at once; the rest wait in its queue
+    'default': 2,
+    'chat': 4,
+    'insights': 1,
+}
+API_ENDPOINT_MAX_QUEUE = 64  # waiting requests per endpoint before new ones get a 503
 
 # Streamlit Settings
 STREAMLIT_HOST = "localhost"
@@ -30,6 +41,56 @@ TEST_SIZE = 0.2
 # Caching
 CACHE_ENABLED = True
 CACHE_TTL = 3600  # seconds
+CACHE_MAX_ENTRIES = 2048  # StatsEngine results kept in the in-memory LRU
+RESPONSE_CACHE_ENABLED = True  # Cache chatbot answers per normalized query
+
+# LLM backend: "openai" (live API), "local" (offline: recorded cassette, then the rule-based parser)
+# or "record" (live API, replies saved to the cassette)
+LLM_BACKEND = os.getenv("IPL_LLM_BACKEND", "openai")
+LLM_CASSETTE_PATH = os.getenv("IPL_LLM_CASSETTE", "llm_cassette.json")
+LLM_LOCAL_LATENCY = float(os.getenv("IPL_LLM_LATENCY", "0"))  # seconds of simulated latency per local call
+LLM_TIMEOUT = 6.0  # seconds per call
+LLM_PARSE_MAX_TOKENS = 150  # parse replies are compact JSON with null fields omitted
+LLM_MAX_CONCURRENCY = 8  # in-flight calls per process
+LLM_RETRIES = 1  # retries after the first attempt, with jittered backoff
+LLM_BREAKER_FAILURE_RATE = 0.5  # failure share that opens the circuit...
+LLM_BREAKER_MIN_CALLS = 5  # ...once this many calls fall in the window
+LLM_BREAKER_WINDOW = 30.0  # seconds
+LLM_BREAKER_COOLDOWN = 15.0  # seconds before a trial call is let through
+
+# Local parser: queries parsed with at least this confidence never reach the LLM
+LOCAL_PARSE_MIN_CONFIDENCE = 0.8
+
+# Intent classifier trained on the example queries in the docs (retrained when they change)
+INTENT_MODEL_PATH = ".cache/intent_classifier.pkl"
+INTENT_MIN_CONFIDENCE = 0.5  # below this the classifier's query type is ignored
+
+# Symmetric-delete spelling correction of query words against player/team/venue/cricket vocabulary
+SPELL_CORRECTION_ENABLED = True
+SPELL_MAX_EDIT_DISTANCE = 2
+
+# Per-stage request tracing (CricketChatbot.latency_stats / explain_response)
+TRACE_ENABLED = True
+TRACE_HISTORY = 1000  # recent requests kept for stage percentiles
+TRACE_SLOW_QUERY_MS = 2000  # requests slower than this keep their full trace...
+TRACE_KEEP_SLOW = 50  # ...up to this many
+
+# Conversation sessions: follow-ups refine the previous question against its cached delivery slices
+SESSION_MAX_ENTRIES = 128
+SESSION_TTL = 1800  # seconds a session is kept idle
+SESSION_MAX_SLICES = 4  # player delivery slices kept per session
+FOLLOW_UP_MAX_WORDS = 8  # longer queries are always parsed as new questions
+
+# LLM query parse cache
+PARSE_CACHE_ENABLED = True
+PARSE_CACHE_MAX_ENTRIES = 4096
+PARSE_CACHE_TTL = 86400  # seconds
+
+# Persistent cache tier (SQLite), invalidated automatically when the data changes
+DISK_CACHE_ENABLED = False
+DISK_CACHE_PATH = ".cache/ipl_results.sqlite"
+DISK_CACHE_MAX_ENTRIES = 50000
+DISK_CACHE_TTL = None  # seconds, None = keep until the dataset changes
 
 # Logging
 LOG_LEVEL = "INFO"
@@ -0,0 +1,129 @@
+"""
+Per-session conversation context for follow-up questions
+
+A session remembers the last resolved parse (entities, filters, query type)
+so "and in death overs?" or "what about 2023?" refine it instead of being
+parsed from scratch, and keeps the delivery slices the stats engine cut for
+the session's players so a refinement filters a few thousand rows rather
+than the whole dataset. Slices are handed to the engine through a context
+variable for the duration of one answer.
+"""
+
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Hashable, Iterable, Optional, Set
+
+import pandas as pd
+
+_active_slices: contextvars.ContextVar = contextvars.ContextVar('ipl_session_slices', default=None)
+
+
+class SliceStore:
+    """A session's delivery slices by (dataset version, player, role), least recently used dropped first
+
+    Only the players the session is asking about are sliced; a ranking that
+    touches every player must not evict them.
+    """
+
+    def __init__(self, max_slices: int = 4):
+        self.max_slices = max_slices
+        self.players: Set[str] = set()
+        self._slices: 'OrderedDict[Hashable, pd.DataFrame]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def focus(self, players: Iterable[Optional[str]]):
+        """Set the players whose slices are kept for the turn being answered"""
+        self.players = {player for player in players if player}
+
+    def get(self, key: Hashable) -> Optional[pd.DataFrame]:
+        with self._lock:
+            rows = self._slices.get(key)
+            if rows is None:
+                self.misses += 1
+                return None
+            self._slices.move_to_end(key)
+            self.hits += 1
+            return rows
+
+    def put(self, key: Hashable, rows: pd.DataFrame):
+        with self._lock:
+            self._slices[key] = rows
+            self._slices.move_to_end(key)
+            while len(self._slices) > self.max_slices:
+                self._slices.popitem(last=False)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._slices
+
+    def __len__(self) -> int:
+        return len(self._slices)
+
+
+def active_slices() -> Optional[SliceStore]:
+    """The slice store of the session being answered, if any"""
+    return _active_slices.get()
+
+
+@contextmanager
+def use_slices(store: Optional[SliceStore]):
+    """Let the stats engine reuse and keep player slices in store while the block runs"""
+    token = _active_slices.set(store)
+    try:
+        yield store
+    finally:
+        _active_slices.reset(token)
+
+
+class ConversationContext:
+    """What one session has asked so far"""
+
+    def __init__(self, session_id: str, max_slices: int = 4):
+        self.session_id = session_id
+        self.last_parsed: Optional[Dict] = None
+        self.turns = 0
+        self.follow_ups = 0
+        self.slices = SliceStore(max_slices)
+        self.updated = time.time()
+
+    def remember(self, parsed: Dict, follow_up: bool = False):
+        self.last_parsed = dict(parsed)
+        self.turns += 1
+        self.follow_ups += int(follow_up)
+        self.updated = time.time()
+
+
+class SessionStore:
+    """Thread-safe LRU of conversation contexts with an idle timeout"""
+
+    def __init__(self, max_sessions: int = 256, ttl: Optional[float] = 1800, max_slices: int = 4):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_slices = max_slices
+        self._sessions: 'OrderedDict[str, ConversationContext]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> ConversationContext:
+        """The session's context, a fresh one if it is new or has been idle past the TTL"""
+        with self._lock:
+            context = self._sessions.get(session_id)
+            if context is not None and self.ttl is not None and time.time() - context.updated > self.ttl:
+                context = None
+            if context is None:
+                context = self._sessions[session_id] = ConversationContext(session_id, self.max_slices)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return context
+
+    def end(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
@@ -0,0 +1,26 @@
+import numpy as np
+from typing import Optional
+
+
+# Innings phases by 0-based over number: powerplay 0-5, middle overs 6-15, death overs 16+
+PHASES = ['powerplay', 'middle_overs', 'death_overs']
+POWERPLAY_LAST_OVER = 5
+MIDDLE_OVERS_LAST_OVER = 15
+
+# Franchises that played under an older name; the data carries both (deliveries more often than matches)
+TEAM_NAME_MAPPING = {
+    'Royal Challengers Bangalore': 'Royal Challengers Bengaluru',
+    'Kings XI Punjab': 'Punjab Kings',
+    'Delhi Daredevils': 'Delhi Capitals',
+    'Rising Pune Supergiant': 'Rising Pune Supergiants',
+}
+
+
+def normalize_team(team: Optional[str]) -> Optional[str]:
+    """A franchise's current name for any name it played under"""
+    return TEAM_NAME_MAPPING.get(team, team)
+
+
+def phase_codes(over: np.ndarray) -> np.ndarray:
+    """Index into PHASES for each 0-based over number"""
+    return np.where(over <= POWERPLAY_LAST_OVER, 0, np.where(over <= MIDDLE_OVERS_LAST_OVER, 1, 2))
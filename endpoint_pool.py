@@ -0,0 +1,131 @@
+"""
+Bounded worker pool for CPU-bound API work
+
+The stats engine is synchronous pandas code; run on the event loop, one
+slow request stalls every other request on the worker, /health included.
+Endpoints hand their work to EndpointPool.run(), which runs it on a fixed
+thread pool (threads share the loaded data, which a process pool would have
+to copy). Each endpoint has its own concurrency limit so cheap endpoints are
+not queued behind a burst of expensive ones, a bounded wait queue past which
+requests are refused, and counters for its queue depth and timings.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class PoolSaturated(Exception):
+    """An endpoint's wait queue is full"""
+
+
+class _EndpointStats:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.queued = 0
+        self.running = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.wait_ms = 0.0
+        self.run_ms = 0.0
+
+    def to_dict(self) -> Dict:
+        finished = self.completed + self.failed
+        return {
+            'limit': self.limit,
+            'queued': self.queued,
+            'running': self.running,
+            'max_queued': self.max_queued,
+            'completed': self.completed,
+            'failed': self.failed,
+            'rejected': self.rejected,
+            'avg_wait_ms': round(self.wait_ms / finished, 2) if finished else 0.0,
+            'avg_run_ms': round(self.run_ms / finished, 2) if finished else 0.0,
+        }
+
+
+class EndpointPool:
+    """Runs blocking endpoint work on a shared thread pool, with per-endpoint limits"""
+
+    def __init__(self, workers: int = 4, limits: Optional[Dict[str, int]] = None, max_queue: int = 64):
+        self.workers = workers
+        self.limits = dict(limits or {})
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ipl-endpoint')
+        self._stats: Dict[str, _EndpointStats] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._loop = None
+        self._lock = threading.Lock()
+
+    def _limit(self, endpoint: str) -> int:
+        return max(1, self.limits.get(endpoint, self.limits.get('default', self.workers)))
+
+    def _semaphore(self, endpoint: str) -> asyncio.Semaphore:
+        # Semaphores belong to the loop they were first used on
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop, self._semaphores = loop, {}
+        if endpoint not in self._semaphores:
+            self._semaphores[endpoint] = asyncio.Semaphore(self._limit(endpoint))
+        return self._semaphores[endpoint]
+
+    def _endpoint_stats(self, endpoint: str) -> _EndpointStats:
+        with self._lock:
+            if endpoint not in self._stats:
+                self._stats[endpoint] = _EndpointStats(self._limit(endpoint))
+            return self._stats[endpoint]
+
+    async def run(self, endpoint: str, fn: Callable, *args, **kwargs) -> Any:
+        """fn(*args, **kwargs) on the pool, after waiting for one of the endpoint's slots
+
+        Raises PoolSaturated when max_queue requests are already waiting. The
+        caller's context (trace, session slices) is carried into the worker.
+        """
+        stats = self._endpoint_stats(endpoint)
+        semaphore = self._semaphore(endpoint)
+        if semaphore.locked() and stats.queued >= self.max_queue:
+            stats.rejected += 1
+            raise PoolSaturated(f"Too many '{endpoint}' requests waiting ({stats.queued})")
+
+        stats.queued += 1
+        stats.max_queued = max(stats.max_queued, stats.queued)
+        queued_at = time.perf_counter()
+        try:
+            await semaphore.acquire()
+        finally:
+            stats.queued -= 1
+        started = time.perf_counter()
+        stats.wait_ms += (started - queued_at) * 1000
+        stats.running += 1
+        try:
+            call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+            result = await asyncio.get_running_loop().run_in_executor(self.executor, call)
+            stats.completed += 1
+            return result
+        except BaseException:
+            stats.failed += 1
+            raise
+        finally:
+            stats.running -= 1
+            stats.run_ms += (time.perf_counter() - started) * 1000
+            semaphore.release()
+
+    def stats(self) -> Dict:
+        """Pool backlog plus queue depth, load and timings per endpoint"""
+        with self._lock:
+            endpoints = {name: stats.to_dict() for name, stats in sorted(self._stats.items())}
+        return {
+            'workers': self.workers,
+            'max_queue': self.max_queue,
+            'pool_backlog': self.executor._work_queue.qsize(),
+            'endpoints': endpoints,
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,60 @@
+import threading
+from typing import Dict, Optional
+from data_loader import IPLDataLoader
+from stats_engine import StatsEngine
+
+
+class EngineContext:
+    """Process-wide owner of the loaded IPL data and the engines built on it
+
+    The data, alias maps and materialized tables live in one StatsEngine; the
+    AIEngine and chatbots are built lazily on first use and share it.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, data_dir: str = '.'):
+        self.loader = IPLDataLoader(data_dir)
+        self.loader.load_data()
+        self.matches_df, self.deliveries_df = self.loader.preprocess_data()
+        self.stats_engine = StatsEngine(self.matches_df, self.deliveries_df)
+
+        self._ai_engine = None
+        self._chatbots: Dict[Optional[str], object] = {}
+        self._build_lock = threading.Lock()
+
+    @classmethod
+    def get(cls, data_dir: str = '.') -> 'EngineContext':
+        """Return the shared context, loading the data on first call"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls(data_dir)
+        return cls._instance
+
+    @classmethod
+    def reset(cls):
+        """Drop the shared context (next get() reloads the data)"""
+        with cls._instance_lock:
+            cls._instance = None
+
+    @property
+    def ai_engine(self):
+        """AIEngine sharing this context's StatsEngine, built on first use"""
+        if self._ai_engine is None:
+            with self._build_lock:
+                if self._ai_engine is None:
+                    from ai_engine import AIEngine
+                    self._ai_engine = AIEngine(self.matches_df, self.deliveries_df, stats_engine=self.stats_engine)
+        return self._ai_engine
+
+    def get_chatbot(self, api_key: Optional[str] = None):
+        """CricketChatbot for an API key, sharing this context's StatsEngine"""
+        if api_key not in self._chatbots:
+            with self._build_lock:
+                if api_key not in self._chatbots:
+                    from openai_handler import CricketChatbot
+                    self._chatbots[api_key] = CricketChatbot(self.matches_df, self.deliveries_df, api_key,
+                                                             stats_engine=self.stats_engine)
+        return self._chatbots[api_key]
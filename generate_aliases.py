@@ -5,13 +5,13 @@ Uses Claude to intelligently generate common misspellings and name permutations.
 """
 
 import json
-from openai import OpenAI
 import os
 from dotenv import load_dotenv
+from llm_backends import create_backend
 
-# Load API key
+# Load API key; IPL_LLM_BACKEND=local runs offline (cassette replies, else base variations only)
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+llm = create_backend(model="gpt-4o-mini", responder=lambda task, query, messages: '{"variations": []}')
 
 def generate_aliases_for_players():
     """Use Claude to generate comprehensive aliases including misspellings"""
@@ -79,19 +79,18 @@ Generate 15-20 variations including:
 
 Return as JSON: {{"variations": ["var1", "var2", ...]}}"""
         
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            max_tokens=300,
-            temperature=0.3,
-            messages=[
+        assistant_message = llm.complete(
+            [
                 {"role": "system", "content": system_prompt},
                 *conversation_history,
                 {"role": "user", "content": prompt}
-            ]
+            ],
+            temperature=0.3,
+            max_tokens=300,
+            task="player_aliases",
+            query=canonical_name
         )
         
-        assistant_message = response.choices[0].message.content
-        
         try:
             # Parse the response
             variations_json = json.loads(assistant_message)
@@ -168,19 +167,18 @@ Generate 10-15 variations including:
 
 Return as JSON: {{"variations": ["var1", "var2", ...]}}"""
         
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            max_tokens=200,
-            temperature=0.3,
-            messages=[
+        assistant_message = llm.complete(
+            [
                 {"role": "system", "content": system_prompt},
                 *conversation_history,
                 {"role": "user", "content": prompt}
-            ]
+            ],
+            temperature=0.3,
+            max_tokens=200,
+            task="team_aliases",
+            query=full_name
         )
         
-        assistant_message = response.choices[0].message.content
-        
         try:
             variations_json = json.loads(assistant_message)
             variations = variations_json.get("variations", [])
@@ -0,0 +1,222 @@
+import hashlib
+import os
+import pickle
+import re
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+
+class IntentClassifier:
+    """TF-IDF + logistic regression over the example queries in the project docs
+
+    Labels come from the document structure: the heading an example sits under
+    ("### 5. **RECORDS**", "Category 3: BOWLER \"LAST N MATCHES\"") or an explicit
+    "→ RANKINGS query" annotation on the same line. Queries go through a
+    normalizer (the chatbot masks player/team names) before training and
+    prediction, so the model learns phrasing rather than names.
+    """
+
+    # Docs with labelled examples, and the label for examples under headings that name none
+    CORPUS_FILES = {
+        'QUERY_TYPES_ANALYSIS.md': None,
+        'NEW_QUERY_TYPES_GUIDE.md': None,
+        'COMPLETE_TEST_CASES.md': 'trends',
+        'TRENDS_TEST_SCENARIOS.md': 'trends',
+    }
+
+    # Heading/annotation patterns -> query_type, checked in order
+    LABEL_PATTERNS = [
+        (r'head[-_ ]to[-_ ]head', 'head_to_head'),
+        (r'comparative', 'comparative_analysis'),
+        (r'player stats', 'player_stats'),
+        (r'\bteams?\b', 'team_comparison'),
+        (r'\btrends?\b|\blast n\b|all-rounders', 'trends'),
+        (r'\brecords?\b', 'records'),
+        (r'\brankings?\b', 'rankings'),
+        (r'\bground', 'ground_insights'),
+        (r'\bform\b|form_guide', 'form_guide'),
+        (r'\bpredictions?\b', 'predictions'),
+    ]
+
+    # Bump when the features, model or corpus extraction change
+    VERSION = 1
+
+    def __init__(self, normalizer: Optional[Callable[[str], str]] = None):
+        self.normalizer = normalizer or (lambda text: text)
+        self.vectorizer = None
+        self.model = None
+        self.corpus_hash = None
+        self.class_words: Dict[str, Set[str]] = {}
+
+    # ===== CORPUS =====
+
+    @classmethod
+    def _label(cls, text: str) -> Optional[str]:
+        text = text.lower()
+        for pattern, label in cls.LABEL_PATTERNS:
+            if re.search(pattern, text):
+                return label
+        return None
+
+    @classmethod
+    def _line_queries(cls, line: str, in_code_block: bool) -> List[str]:
+        """Example queries on one doc line: a leading quoted string, a query-table cell or a bare code line"""
+        text = re.sub(r'\([^)]*\)', '', line).strip()
+        if in_code_block:
+            quoted = re.match(r'^[-*✅❌\s`]*"([^"]{2,80})"', text)
+            if quoted:
+                return [quoted.group(1)]
+            return [text] if re.fullmatch(r"[a-z][a-z0-9' ]{1,60}", text) else []
+
+        if text.startswith('|'):
+            cells = [cell.strip() for cell in text.strip('|').split('|')]
+            ticked = re.search(r'`([^`]+)`', text)
+            cell = ticked.group(1) if ticked else cells[0]
+            if cell and not set(cell) <= set('-: ') and cell.lower() not in ('query', 'case'):
+                return [cell]
+            return []
+
+        # Only a quote that opens the bullet (or follows a "Label:") is an example, not quotes in prose
+        quoted = re.search(r'"([^"]{2,80})"', text)
+        if quoted:
+            before = re.sub(r'[-*✅❌⚠️\[\]\s`]', '', text[:quoted.start()])
+            if not before or before.endswith(':'):
+                return [quoted.group(1)]
+        return []
+
+    @classmethod
+    def load_corpus(cls, base_dir: str = '.') -> List[Tuple[str, str]]:
+        """(query, query_type) pairs from the docs, deduplicated"""
+        examples = {}
+        for name, default_label in cls.CORPUS_FILES.items():
+            path = os.path.join(base_dir, name)
+            if not os.path.exists(path):
+                continue
+            section_label = default_label
+            in_code_block = plain_block = False
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    stripped = line.strip()
+                    if stripped.startswith('```'):
+                        in_code_block = not in_code_block
+                        plain_block = in_code_block and stripped == '```'
+                        continue
+                    if in_code_block and not plain_block:
+                        continue
+                    if stripped.startswith('#'):
+                        section_label = cls._label(stripped) or default_label
+                        continue
+
+                    # An explicit "→ RANKINGS query" / "recognized as trends query" wins over the heading
+                    annotation = (re.search(r'→\s*([A-Z][A-Z_]{3,})', stripped)
+                                  or re.search(r'as (\w+) query', stripped))
+                    label = (cls._label(annotation.group(1)) if annotation else None) or section_label
+                    if label is None:
+                        continue
+                    for query in cls._line_queries(stripped, in_code_block):
+                        examples.setdefault(' '.join(query.lower().split()), label)
+        return sorted(examples.items())
+
+    @classmethod
+    def corpus_fingerprint(cls, examples: List[Tuple[str, str]]) -> str:
+        digest = hashlib.sha1(repr((cls.VERSION, examples)).encode('utf-8'))
+        return digest.hexdigest()[:16]
+
+    # ===== TRAINING / PERSISTENCE =====
+
+    def train(self, examples: List[Tuple[str, str]]) -> 'IntentClassifier':
+        texts = [self.normalizer(query) for query, _ in examples]
+        labels = [label for _, label in examples]
+        self.vectorizer = TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True, token_pattern=r'[<>\w]+')
+        features = self.vectorizer.fit_transform(texts)
+        self.model = LogisticRegression(C=10.0, max_iter=2000, class_weight='balanced')
+        self.model.fit(features, labels)
+        self.corpus_hash = self.corpus_fingerprint(examples)
+
+        self.class_words = {}
+        for text, label in zip(texts, labels):
+            self.class_words.setdefault(label, set()).update(
+                word for word in text.split() if not word.startswith('<'))
+        return self
+
+    def save(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'wb') as f:
+            pickle.dump({'vectorizer': self.vectorizer, 'model': self.model, 'corpus_hash': self.corpus_hash,
+                         'class_words': self.class_words}, f)
+
+    @classmethod
+    def load_or_train(cls, path: str, base_dir: str = '.',
+                      normalizer: Optional[Callable[[str], str]] = None) -> 'IntentClassifier':
+        """Persisted model when it was trained on the current corpus, else a freshly trained (and saved) one"""
+        classifier = cls(normalizer)
+        examples = cls.load_corpus(base_dir)
+        fingerprint = cls.corpus_fingerprint(examples)
+
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'rb') as f:
+                    state = pickle.load(f)
+                if state.get('corpus_hash') == fingerprint:
+                    classifier.vectorizer = state['vectorizer']
+                    classifier.model = state['model']
+                    classifier.corpus_hash = fingerprint
+                    classifier.class_words = state['class_words']
+                    return classifier
+            except Exception as e:
+                print(f"Warning: Could not load intent classifier: {e}")
+
+        if not examples:
+            print("Warning: No labelled example queries found - intent classifier disabled")
+            return classifier
+        classifier.train(examples)
+        if path:
+            try:
+                classifier.save(path)
+            except OSError as e:
+                print(f"Warning: Could not save intent classifier: {e}")
+        return classifier
+
+    # ===== PREDICTION =====
+
+    @property
+    def ready(self) -> bool:
+        return self.model is not None
+
+    def predict(self, query: str) -> Tuple[Optional[str], float]:
+        """(query_type, probability); (None, 0.0) when untrained"""
+        if not self.ready:
+            return None, 0.0
+        scores = self._scores(self.normalizer(query))
+        probabilities = np.exp(scores - scores.max())
+        probabilities /= probabilities.sum()
+        best = int(probabilities.argmax())
+        return str(self.model.classes_[best]), float(probabilities[best])
+
+    def _scores(self, text: str) -> np.ndarray:
+        """Linear class scores computed straight from the fitted vocabulary
+
+        Same features as vectorizer.transform (sublinear tf * idf, l2-normalized
+        uni/bigrams) without scikit-learn's per-call validation overhead, which
+        dominates for a single short query.
+        """
+        words = re.findall(self.vectorizer.token_pattern, text.lower())
+        terms = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        vocabulary = self.vectorizer.vocabulary_
+        counts: Dict[int, int] = {}
+        for term in terms:
+            index = vocabulary.get(term)
+            if index is not None:
+                counts[index] = counts.get(index, 0) + 1
+        scores = self.model.intercept_.copy()
+        if not counts:
+            return scores
+        indices = np.fromiter(counts.keys(), dtype=int)
+        weights = (1 + np.log(np.fromiter(counts.values(), dtype=float))) * self.vectorizer.idf_[indices]
+        weights /= np.linalg.norm(weights)
+        return scores + self.model.coef_[:, indices] @ weights
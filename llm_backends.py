@@ -0,0 +1,474 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Callable, Dict, List, Optional
+from openai import AsyncOpenAI, OpenAI
+
+import config
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for backends that don't report usage"""
+    return max(1, len(text) // 4) if text else 0
+
+
+class UsageLog:
+    """Per-call token counts and latency, summarized per task ('parse', 'team', ...)"""
+
+    def __init__(self, max_records: int = 1000):
+        self.records = deque(maxlen=max_records)
+        self._totals: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def record(self, task: Optional[str], prompt_tokens: int, completion_tokens: int, latency: float,
+               estimated: bool = False):
+        task = task or 'other'
+        entry = {
+            'task': task,
+            'prompt_tokens': int(prompt_tokens or 0),
+            'completion_tokens': int(completion_tokens or 0),
+            'latency_ms': round(latency * 1000, 1),
+            'estimated': estimated,
+        }
+        with self._lock:
+            self.records.append(entry)
+            totals = self._totals.setdefault(task, {'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0})
+            totals['calls'] += 1
+            totals['prompt_tokens'] += entry['prompt_tokens']
+            totals['completion_tokens'] += entry['completion_tokens']
+
+    def summary(self) -> Dict[str, Dict]:
+        """Totals per task, plus averages and latency percentiles over the recent records"""
+        with self._lock:
+            records = list(self.records)
+            totals = {task: dict(values) for task, values in self._totals.items()}
+        for task, values in totals.items():
+            latencies = sorted(r['latency_ms'] for r in records if r['task'] == task)
+            values['avg_prompt_tokens'] = round(values['prompt_tokens'] / values['calls'], 1)
+            values['avg_completion_tokens'] = round(values['completion_tokens'] / values['calls'], 1)
+            if latencies:
+                values['p50_latency_ms'] = latencies[len(latencies) // 2]
+                values['p95_latency_ms'] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        return totals
+
+
+class LLMBackend:
+    """Chat-completion backend used by the chatbot and the alias generator
+
+    complete() returns the reply text. `task` and `query` are optional hints
+    ('parse' plus the user's question, say) that let offline backends answer
+    without interpreting the prompt.
+    """
+
+    name = 'base'
+
+    def __init__(self, model: str):
+        self.model = model
+        self.usage = UsageLog()
+
+    def complete(self, messages: List[Dict], temperature: float = 0.2, max_tokens: int = 500,
+                 task: Optional[str] = None, query: Optional[str] = None) -> str:
+        raise NotImplementedError
+
+    async def acomplete(self, messages: List[Dict], temperature: float = 0.2, max_tokens: int = 500,
+                        task: Optional[str] = None, query: Optional[str] = None) -> str:
+        """Async complete(); backends without a native async client run the sync call in a thread"""
+        return await asyncio.to_thread(self.complete, messages, temperature, max_tokens, task, query)
+
+
+class OpenAIBackend(LLMBackend):
+    """OpenAI chat completions"""
+
+    name = 'openai'
+
+    def __init__(self, api_key: Optional[str] = None, model: str = 'gpt-4o-mini', timeout: Optional[float] = None):
+        super().__init__(model)
+        if api_key:
+            api_key = api_key.strip()
+        elif os.getenv('OPENAI_API_KEY'):
+            api_key = os.getenv('OPENAI_API_KEY').strip()
+        else:
+            raise ValueError("OpenAI API key not provided. Set OPENAI_API_KEY environment variable.")
+
+        if not api_key or not api_key.startswith('sk-'):
+            raise ValueError(f"Invalid API key format. Expected sk-... format, got: {api_key[:20] if api_key else 'empty'}")
+
+        # Retries are handled by ResilientBackend, so the SDK's own are off
+        self.client = OpenAI(api_key=api_key, timeout=timeout, max_retries=0)
+        self.async_client = AsyncOpenAI(api_key=api_key, timeout=timeout, max_retries=0)
+
+    def complete(self, messages: List[Dict], temperature: float = 0.2, max_tokens: int = 500,
+                 task: Optional[str] = None, query: Optional[str] = None) -> str:
+        start = time.time()
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        self._record_usage(response, task, time.time() - start)
+        return response.choices[0].message.content
+
+    async def acomplete(self, messages: List[Dict], temperature: float = 0.2, max_tokens: int = 500,
+                        task: Optional[str] = None, query: Optional[str] = None) -> str:
+        start = time.time()
+        response = await self.async_client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        self._record_usage(response, task, time.time() - start)
+        return response.choices[0].message.content
+
+    def _record_usage(self, response, task: Optional[str], latency: float):
+        usage = getattr(response, 'usage', None)
+        if usage is not None:
+            self.usage.record(task, usage.prompt_tokens, usage.completion_tokens, latency)
+        else:
+            self.usage.record(task, 0, estimate_tokens(response.choices[0].message.content), latency, estimated=True)
+
+
+def cassette_key(messages: List[Dict], task: Optional[str] = None, query: Optional[str] = None) -> str:
+    """Cassette lookup key: task plus normalized query when given, else a hash of the messages
+
+    Keying parses on the query rather than the prompt keeps a cassette valid
+    across prompt edits.
+    """
+    if task and query:
+        return f"{task}:{' '.join(query.lower().split())}"
+    digest = hashlib.sha1(json.dumps(messages, sort_keys=True).encode('utf-8')).hexdigest()
+    return f"sha1:{digest}"
+
+
+def load_cassette(path: str) -> Dict[str, str]:
+    """Recorded replies, {"replies": {key: text}}; a missing file is an empty cassette"""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        data = json.load(f)
+    return data.get('replies', data)
+
+
+class LocalBackend(LLMBackend):
+    """Offline backend for benchmarks and tests - no network, deterministic replies
+
+    Replies come from a recorded cassette when it has the key, otherwise from
+    `responder(task, query, messages)` (the chatbot plugs in its rule-based
+    parser). `latency` seconds are slept per call to stand in for the network.
+    """
+
+    name = 'local'
+
+    def __init__(self, cassette_path: Optional[str] = None, latency: float = 0.0,
+                 responder: Optional[Callable[[Optional[str], Optional[str], List[Dict]], Optional[str]]] = None,
+                 model: str = 'local'):
+        super().__init__(model)
+        self.cassette_path = cassette_path
+        self.cassette = load_cassette(cassette_path)
+        self.latency = latency
+        self.responder = responder
+        self.calls = 0
+        self.cassette_hits = 0
+
+    def complete(self, messages: List[Dict], temperature: float = 0.2, max_tokens: int = 500,
+                 task: Optional[str] = None, query: Optional[str] = None) -> str:
+        start = time.time()
+        self.calls += 1
+        if self.latency > 0:
+            time.sleep(self.latency)
+        return self._recorded_reply(messages, task, query, start)
+
+    async def acomplete(self, messages: List[Dict], temperature: float = 0.2, max_tokens: int = 500,
+                        task: Optional[str] = None, query: Optional[str] = None) -> str:
+        start = time.time()
+        self.calls += 1
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        return self._recorded_reply(messages, task, query, start)
+
+    def _recorded_reply(self, messages: List[Dict], task: Optional[str], query: Optional[str], start: float) -> str:
+        reply = self._reply(messages, task, query)
+        prompt_tokens = sum(estimate_tokens(m.get('content', '')) for m in messages)
+        self.usage.record(task, prompt_tokens, estimate_tokens(reply), time.time() - start, estimated=True)
+        return reply
+
+    def _reply(self, messages: List[Dict], task: Optional[str], query: Optional[str]) -> str:
+        key = cassette_key(messages, task, query)
+        if key in self.cassette:
+            self.cassette_hits += 1
+            return self.cassette[key]
+
+        reply = self.responder(task, query, messages) if self.responder else None
+        if reply is None:
+            raise LookupError(f"No recorded reply for {key} and no local responder")
+        return reply
+
+
+class RecordingBackend(LLMBackend):
+    """Wraps a live backend and writes every reply to a cassette for LocalBackend"""
+
+    name = 'recording'
+
+    def __init__(self, backend: LLMBackend, cassette_path: str):
+        super().__init__(backend.model)
+        self.backend = backend
+        self.usage = backend.usage
+        self.cassette_path = cassette_path
+        self.cassette = load_cassette(cassette_path)
+        self._lock = threading.Lock()
+
+    def complete(self, messages: List[Dict], temperature: float = 0.2, max_tokens: int = 500,
+                 task: Optional[str] = None, query: Optional[str] = None) -> str:
+        reply = self.backend.complete(messages, temperature=temperature, max_tokens=max_tokens,
+                                      task=task, query=query)
+        with self._lock:
+            self.cassette[cassette_key(messages, task, query)] = reply
+            directory = os.path.dirname(self.cassette_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.cassette_path, 'w') as f:
+                json.dump({'replies': self.cassette}, f, indent=2, sort_keys=True)
+        return reply
+
+
+class BackendUnavailable(RuntimeError):
+    """Raised instead of calling the model when the circuit is open or no slot frees up in time"""
+
+
+class CircuitBreaker:
+    """Error-rate circuit breaker over a sliding window of recent calls
+
+    Opens when at least `min_calls` of the last `window` seconds' calls have
+    been made and the failure share reaches `failure_rate`. While open every
+    call is refused; after `cooldown` seconds one trial call is let through
+    (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_rate: float = 0.5, min_calls: int = 5, window: float = 30.0, cooldown: float = 15.0):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.cooldown = cooldown
+        self._outcomes = deque()  # (timestamp, succeeded)
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state(time.time())
+
+    def _state(self, now: float) -> str:
+        if self._opened_at is None:
+            return 'closed'
+        return 'half_open' if now - self._opened_at >= self.cooldown else 'open'
+
+    def allow(self) -> Optional[str]:
+        """Whether a call may go to the backend now: 'call', 'trial' (the half-open probe) or None"""
+        with self._lock:
+            state = self._state(time.time())
+            if state == 'closed':
+                return 'call'
+            if state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return 'trial'
+            return None
+
+    def release(self, grant: Optional[str]):
+        """Hand back a granted call that ended without an outcome (cancelled, or never sent)
+
+        A half-open trial that is not recorded must be released, or the circuit
+        would wait on it forever and refuse every later call.
+        """
+        if grant == 'trial':
+            with self._lock:
+                self._trial_in_flight = False
+
+    def record(self, succeeded: bool, grant: Optional[str] = 'call'):
+        now = time.time()
+        with self._lock:
+            if self._opened_at is not None:
+                # Only the half-open trial decides the circuit; stragglers from before it opened don't
+                if grant != 'trial':
+                    return
+                self._trial_in_flight = False
+                if succeeded:
+                    self._opened_at = None
+                    self._outcomes.clear()
+                else:
+                    self._opened_at = now
+                return
+
+            self._outcomes.append((now, succeeded))
+            while self._outcomes and now - self._outcomes[0][0] > self.window:
+                self._outcomes.popleft()
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+                self._opened_at = now
+                self.times_opened += 1
+
+
+class ResilientBackend(LLMBackend):
+    """Timeouts, bounded concurrency, jittered retries and a circuit breaker around a backend
+
+    Callers get BackendUnavailable (immediately when the circuit is open) or
+    the last error, and are expected to fall back to the local parser.
+    """
+
+    name = 'resilient'
+
+    def __init__(self, backend: LLMBackend, timeout: float = 6.0, max_concurrency: int = 8, retries: int = 1,
+                 backoff: float = 0.25, breaker: Optional[CircuitBreaker] = None):
+        super().__init__(backend.model)
+        self.backend = backend
+        self.usage = backend.usage
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        # Keyed by the loop itself: a dead loop's id() can be reused by a new one
+        self._async_slots: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]' = weakref.WeakKeyDictionary()
+        self._async_slots_lock = threading.Lock()
+        self.timeouts = 0
+        self.rejected = 0
+
+    def _delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff"""
+        return random.uniform(0, self.backoff * (2 ** attempt))
+
+    @staticmethod
+    def _is_timeout(error: Exception) -> bool:
+        """Timeouts from asyncio, the socket layer or a client library (openai.APITimeoutError, ...)"""
+        return isinstance(error, (TimeoutError, asyncio.TimeoutError)) or 'timeout' in type(error).__name__.lower()
+
+    def _record_failure(self, error: Exception, grant: str):
+        if self._is_timeout(error):
+            self.timeouts += 1
+        self.breaker.record(False, grant)
+
+    def _check_breaker(self) -> str:
+        grant = self.breaker.allow()
+        if not grant:
+            self.rejected += 1
+            raise BackendUnavailable("LLM circuit open - using the local parser")
+        return grant
+
+    def complete(self, messages: List[Dict], temperature: float = 0.2, max_tokens: int = 500,
+                 task: Optional[str] = None, query: Optional[str] = None) -> str:
+        last_error = None
+        for attempt in range(self.retries + 1):
+            grant = self._check_breaker()
+            recorded = False
+            try:
+                if not self._slots.acquire(timeout=self.timeout):
+                    # Saturation is local back-pressure, not an upstream failure, so the breaker isn't told
+                    self.rejected += 1
+                    raise BackendUnavailable(f"No LLM slot free within {self.timeout}s")
+                try:
+                    reply = self.backend.complete(messages, temperature=temperature, max_tokens=max_tokens,
+                                                  task=task, query=query)
+                    self.breaker.record(True, grant)
+                    recorded = True
+                    return reply
+                except Exception as e:
+                    last_error = e
+                    self._record_failure(e, grant)
+                    recorded = True
+                finally:
+                    self._slots.release()
+            finally:
+                if not recorded:
+                    self.breaker.release(grant)
+            if attempt < self.retries:
+                time.sleep(self._delay(attempt))
+        raise last_error
+
+    def _loop_slots(self) -> asyncio.Semaphore:
+        """asyncio semaphores belong to one event loop, so keep one per running loop"""
+        loop = asyncio.get_running_loop()
+        with self._async_slots_lock:
+            slots = self._async_slots.get(loop)
+            if slots is None:
+                slots = self._async_slots[loop] = asyncio.Semaphore(self.max_concurrency)
+        return slots
+
+    async def acomplete(self, messages: List[Dict], temperature: float = 0.2, max_tokens: int = 500,
+                        task: Optional[str] = None, query: Optional[str] = None) -> str:
+        slots = self._loop_slots()
+        last_error = None
+        for attempt in range(self.retries + 1):
+            grant = self._check_breaker()
+            recorded = False
+            try:
+                # The slot wait is bounded like the sync path's
+                try:
+                    await asyncio.wait_for(slots.acquire(), timeout=self.timeout)
+                except asyncio.TimeoutError:
+                    self.rejected += 1
+                    raise BackendUnavailable(f"No LLM slot free within {self.timeout}s")
+                try:
+                    reply = await asyncio.wait_for(
+                        self.backend.acomplete(messages, temperature=temperature, max_tokens=max_tokens,
+                                               task=task, query=query),
+                        timeout=self.timeout
+                    )
+                    self.breaker.record(True, grant)
+                    recorded = True
+                    return reply
+                except Exception as e:
+                    last_error = e
+                    self._record_failure(e, grant)
+                    recorded = True
+                finally:
+                    slots.release()
+            finally:
+                # Cancellation (a BaseException) and slot timeouts end the call without an outcome
+                if not recorded:
+                    self.breaker.release(grant)
+            if attempt < self.retries:
+                await asyncio.sleep(self._delay(attempt))
+        raise last_error
+
+    def stats(self) -> Dict:
+        return {
+            'circuit': self.breaker.state,
+            'times_opened': self.breaker.times_opened,
+            'rejected': self.rejected,
+            'timeouts': self.timeouts,
+            'usage': self.usage.summary(),
+        }
+
+
+def create_backend(name: Optional[str] = None, api_key: Optional[str] = None, model: str = 'gpt-4o-mini',
+                   responder: Optional[Callable] = None) -> LLMBackend:
+    """Backend selected by name, defaulting to config.LLM_BACKEND (env IPL_LLM_BACKEND)
+
+    'openai' - live API; 'local' - cassette, then the responder;
+    'record' - live API, replies saved to config.LLM_CASSETTE_PATH.
+    Every backend is wrapped in a ResilientBackend configured from config.LLM_*.
+    """
+    name = (name or config.LLM_BACKEND).lower()
+    if name == 'openai':
+        backend = OpenAIBackend(api_key, model, timeout=config.LLM_TIMEOUT)
+    elif name == 'local':
+        backend = LocalBackend(config.LLM_CASSETTE_PATH, config.LLM_LOCAL_LATENCY, responder)
+    elif name == 'record':
+        backend = RecordingBackend(OpenAIBackend(api_key, model, timeout=config.LLM_TIMEOUT), config.LLM_CASSETTE_PATH)
+    else:
+        raise ValueError(f"Unknown LLM backend '{name}'. Expected openai, local or record.")
+
+    breaker = CircuitBreaker(config.LLM_BREAKER_FAILURE_RATE, config.LLM_BREAKER_MIN_CALLS,
+                             config.LLM_BREAKER_WINDOW, config.LLM_BREAKER_COOLDOWN)
+    return ResilientBackend(backend, timeout=config.LLM_TIMEOUT, max_concurrency=config.LLM_MAX_CONCURRENCY,
+                            retries=config.LLM_RETRIES, breaker=breaker)
@@ -0,0 +1,193 @@
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional
+from cricket_conventions import PHASES, phase_codes
+
+
+class MatchupMatrix:
+    """Sparse batter x bowler matchup aggregates built once from ball-by-ball data
+
+    Each non-empty (batter, bowler) pair is stored as a set of cells keyed by
+    (batter_id, bowler_id, year, phase), so head-to-head lookups and per-player
+    row/column scans never touch the deliveries table after construction.
+    """
+
+    PHASES = PHASES
+    STATS = ['deliveries', 'balls', 'runs', 'dismissals', 'dots', 'fours', 'sixes']
+
+    # Dismissal kinds not credited to the bowler
+    NON_BOWLER_DISMISSALS = ['run out', 'retired hurt', 'retired out', 'obstructing the field']
+
+    def __init__(self, deliveries_df: pd.DataFrame, matches_df: pd.DataFrame):
+        self.batters, self.bowlers, self.cells = self._build(deliveries_df, matches_df)
+        self._batter_ids = {name: i for i, name in enumerate(self.batters)}
+        self._bowler_ids = {name: i for i, name in enumerate(self.bowlers)}
+
+        # Pair totals (all seasons, all phases) for O(1) unfiltered lookups
+        self.pairs = self.cells.groupby(['batter_id', 'bowler_id'], sort=True)[self.STATS].sum()
+
+        # Career balls faced and bowled, for telling a player's primary role
+        self.balls_faced = self.pairs.groupby(level='batter_id')['balls'].sum()
+        self.balls_bowled = self.pairs.groupby(level='bowler_id')['balls'].sum()
+
+        # Row offsets into the sorted cells frame for each pair / batter / bowler
+        self._pair_rows = self._group_offsets(['batter_id', 'bowler_id'])
+        self._batter_rows = self._group_offsets(['batter_id'])
+        self._bowler_index = self.cells.sort_values(['bowler_id', 'batter_id']).index.to_numpy()
+        bowler_codes = self.cells['bowler_id'].to_numpy()[self._bowler_index]
+        bounds = np.flatnonzero(np.diff(bowler_codes)) + 1
+        starts = np.concatenate(([0], bounds))
+        ends = np.concatenate((bounds, [len(bowler_codes)]))
+        self._bowler_rows = {int(bowler_codes[s]): (int(s), int(e)) for s, e in zip(starts, ends)}
+
+    def _build(self, deliveries_df: pd.DataFrame, matches_df: pd.DataFrame):
+        """Aggregate deliveries into (batter, bowler, year, phase) cells in one grouped pass"""
+        df = deliveries_df[['match_id', 'over', 'batter', 'bowler', 'batsman_runs',
+                            'extras_type', 'is_wicket', 'player_dismissed', 'dismissal_kind']]
+        years = matches_df.set_index('id')['year']
+
+        batter_codes, batters = pd.factorize(df['batter'], sort=True)
+        bowler_codes, bowlers = pd.factorize(df['bowler'], sort=True)
+
+        phase = phase_codes(df['over'].to_numpy())
+
+        runs = df['batsman_runs'].to_numpy()
+        legal = ~df['extras_type'].isin(['wides', 'noballs']).to_numpy()
+        dismissed = (
+            (df['is_wicket'] == 1) &
+            (df['player_dismissed'] == df['batter']) &
+            (~df['dismissal_kind'].isin(self.NON_BOWLER_DISMISSALS))
+        ).to_numpy()
+
+        frame = pd.DataFrame({
+            'batter_id': batter_codes,
+            'bowler_id': bowler_codes,
+            'year': df['match_id'].map(years).fillna(0).astype(int).to_numpy(),
+            'phase': phase,
+            'deliveries': 1,
+            'balls': legal.astype(int),
+            'runs': runs,
+            'dismissals': dismissed.astype(int),
+            'dots': (runs == 0).astype(int),
+            'fours': (runs == 4).astype(int),
+            'sixes': (runs == 6).astype(int),
+        })
+
+        cells = frame.groupby(['batter_id', 'bowler_id', 'year', 'phase'], sort=True).sum().reset_index()
+        return list(batters), list(bowlers), cells
+
+    def _group_offsets(self, keys: List[str]) -> Dict:
+        """Map each group key to its (start, end) row range in the sorted cells frame"""
+        codes = self.cells[keys].to_numpy()
+        if len(codes) == 0:
+            return {}
+        changed = np.any(codes[1:] != codes[:-1], axis=1)
+        bounds = np.flatnonzero(changed) + 1
+        starts = np.concatenate(([0], bounds))
+        ends = np.concatenate((bounds, [len(codes)]))
+        if len(keys) == 1:
+            return {int(codes[s][0]): (int(s), int(e)) for s, e in zip(starts, ends)}
+        return {tuple(int(c) for c in codes[s]): (int(s), int(e)) for s, e in zip(starts, ends)}
+
+    def _phase_code(self, phase: Optional[str]) -> Optional[int]:
+        if not phase:
+            return None
+        return self.PHASES.index(phase)
+
+    def _select(self, cells: pd.DataFrame, seasons: List[int] = None, phase: str = None) -> pd.DataFrame:
+        """Restrict a block of cells to the requested season/phase slice"""
+        if seasons:
+            cells = cells[cells['year'].isin(seasons)]
+        phase_code = self._phase_code(phase)
+        if phase_code is not None:
+            cells = cells[cells['phase'] == phase_code]
+        return cells
+
+    @classmethod
+    def supports(cls, filters: Dict = None) -> bool:
+        """Whether a filter dict can be answered from matchup cells alone"""
+        if not filters:
+            return True
+        for key, value in filters.items():
+            if not value:
+                continue
+            if key == 'seasons':
+                continue
+            if key == 'match_phase' and value in cls.PHASES:
+                continue
+            return False
+        return True
+
+    def get(self, batter: str, bowler: str, seasons: List[int] = None, phase: str = None) -> Dict:
+        """Head-to-head totals for a batter against a bowler"""
+        empty = {stat: 0 for stat in self.STATS}
+        batter_id = self._batter_ids.get(batter)
+        bowler_id = self._bowler_ids.get(bowler)
+        if batter_id is None or bowler_id is None:
+            return empty
+
+        if not seasons and not phase:
+            if (batter_id, bowler_id) not in self.pairs.index:
+                return empty
+            row = self.pairs.loc[(batter_id, bowler_id)]
+            return {stat: int(row[stat]) for stat in self.STATS}
+
+        rows = self._pair_rows.get((batter_id, bowler_id))
+        if rows is None:
+            return empty
+        cells = self._select(self.cells.iloc[rows[0]:rows[1]], seasons, phase)
+        return {stat: int(cells[stat].sum()) for stat in self.STATS}
+
+    def primary_role(self, player: str) -> Optional[str]:
+        """'batter' or 'bowler', whichever the player has more career balls as, or None if unknown"""
+        batter_id = self._batter_ids.get(player)
+        bowler_id = self._bowler_ids.get(player)
+        faced = int(self.balls_faced.get(batter_id, 0)) if batter_id is not None else 0
+        bowled = int(self.balls_bowled.get(bowler_id, 0)) if bowler_id is not None else 0
+        if not faced and not bowled:
+            return None
+        return 'batter' if faced >= bowled else 'bowler'
+
+    def bowlers_vs(self, batter: str, seasons: List[int] = None, phase: str = None,
+                   min_balls: int = 0) -> pd.DataFrame:
+        """All bowlers a batter has faced (row scan), one row per bowler"""
+        batter_id = self._batter_ids.get(batter)
+        rows = self._batter_rows.get(batter_id) if batter_id is not None else None
+        if rows is None:
+            return self._empty_frame('bowler')
+        cells = self._select(self.cells.iloc[rows[0]:rows[1]], seasons, phase)
+        table = cells.groupby('bowler_id')[self.STATS].sum()
+        table.index = [self.bowlers[i] for i in table.index]
+        return self._finish(table, 'bowler', min_balls)
+
+    def batters_vs(self, bowler: str, seasons: List[int] = None, phase: str = None,
+                   min_balls: int = 0) -> pd.DataFrame:
+        """All batters a bowler has bowled to (column scan), one row per batter"""
+        bowler_id = self._bowler_ids.get(bowler)
+        rows = self._bowler_rows.get(bowler_id) if bowler_id is not None else None
+        if rows is None:
+            return self._empty_frame('batter')
+        cells = self._select(self.cells.loc[self._bowler_index[rows[0]:rows[1]]], seasons, phase)
+        table = cells.groupby('batter_id')[self.STATS].sum()
+        table.index = [self.batters[i] for i in table.index]
+        return self._finish(table, 'batter', min_balls)
+
+    def toughest_bowlers(self, batter: str, n: int = 5, min_balls: int = 12,
+                         seasons: List[int] = None, phase: str = None) -> pd.DataFrame:
+        """Bowlers who trouble a batter most: most dismissals, then lowest strike rate"""
+        table = self.bowlers_vs(batter, seasons, phase, min_balls)
+        return table.sort_values(['dismissals', 'strike_rate'], ascending=[False, True]).head(n)
+
+    def _empty_frame(self, name: str) -> pd.DataFrame:
+        table = pd.DataFrame(columns=self.STATS + ['strike_rate', 'dot_percentage'])
+        table.index.name = name
+        return table
+
+    def _finish(self, table: pd.DataFrame, name: str, min_balls: int) -> pd.DataFrame:
+        """Drop thin samples and add derived rate columns"""
+        table = table[table['balls'] >= min_balls].copy()
+        balls = table['balls'].replace(0, np.nan)
+        table['strike_rate'] = (table['runs'] / balls * 100).round(2).fillna(0)
+        table['dot_percentage'] = (table['dots'] / table['deliveries'] * 100).round(2)
+        table.index.name = name
+        return table
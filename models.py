@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, List, Dict
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import Any, Optional, List, Dict, Literal, Tuple
 from datetime import datetime
 
 # Match Models
@@ -88,3 +88,140 @@ class APIResponse(BaseModel):
     message: str
     data: Optional[Dict] = None
     timestamp: datetime = datetime.now()
+
+# Stats Filter Models
+class StatsFilters(BaseModel):
+    """Stats engine filters from an API request, validated and in canonical form
+
+    Values are lower-cased, seasons sorted and deduplicated, and blanks dropped,
+    so equal filter sets are equal (and hash equal) however they were written.
+    cache_key() is the key the stats engine caches the filtered result under.
+    """
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
+    seasons: Optional[Tuple[int, ...]] = None
+    match_phase: Optional[Literal['powerplay', 'middle_overs', 'death_overs', 'opening', 'closing']] = None
+    match_situation: Optional[Literal['batting_first', 'chasing', 'defending', 'pressure_chase',
+                                      'winning_position']] = None
+    vs_conditions: Optional[Literal['vs_pace', 'vs_spin', 'vs_left_arm', 'vs_right_arm', 'vs_off_spin',
+                                    'vs_leg_spin', 'vs_left_arm_spin', 'vs_right_arm_spin']] = None
+    opposition_team: Optional[str] = None
+    ground: Optional[str] = None
+    handedness: Optional[Literal['left_handed', 'right_handed']] = None
+    innings_order: Optional[int] = Field(None, ge=1, le=2)
+    match_type: Optional[Literal['home', 'away']] = None
+
+    @field_validator('seasons', mode='before')
+    @classmethod
+    def _canonical_seasons(cls, value):
+        """Accepts [2023, 2024], ['2023,2024'] or '2024'; returns sorted unique years"""
+        if value is None or value == '' or value == []:
+            return None
+        if isinstance(value, (str, int)):
+            value = [value]
+        years = set()
+        for item in value:
+            for part in str(item).split(','):
+                if part.strip():
+                    years.add(int(part.strip()))
+        for year in years:
+            if not 2008 <= year <= 2100:
+                raise ValueError(f"{year} is not an IPL season")
+        return tuple(sorted(years)) or None
+
+    @field_validator('match_phase', 'match_situation', 'vs_conditions', 'handedness', 'match_type', mode='before')
+    @classmethod
+    def _canonical_choice(cls, value):
+        if isinstance(value, str):
+            value = value.strip().lower().replace(' ', '_').replace('-', '_')
+            if value and value.startswith(('pace', 'spin', 'left_arm', 'right_arm', 'off_spin', 'leg_spin')):
+                value = 'vs_' + value
+        return value or None
+
+    @field_validator('opposition_team', 'ground', mode='before')
+    @classmethod
+    def _strip_name(cls, value):
+        return (value.strip() or None) if isinstance(value, str) else value
+
+    def to_filters(self) -> Dict:
+        """The filter dict the stats engine takes"""
+        filters = self.model_dump(exclude_none=True)
+        if 'seasons' in filters:
+            filters['seasons'] = list(filters['seasons'])
+        return filters
+
+    def cache_key(self) -> Tuple:
+        from result_cache import normalize_filters
+        return normalize_filters(self.to_filters())
+
+# Chat Models
+class ChatRequest(BaseModel):
+    query: str = Field(..., min_length=1)
+    session_id: Optional[str] = None  # follow-ups refine this session's previous question
+    format: str = Field('markdown', pattern='^(markdown|json)$')
+    stream: bool = False  # server-sent events as each stage completes
+
+class BatchChatRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1)
+    format: str = Field('markdown', pattern='^(markdown|json)$')
+    stream: bool = False  # one event per query, in completion order
+
+# Bulk Stats Models
+class PlayersStatsRequest(BaseModel):
+    players: List[str] = Field(..., min_length=1)
+    filters: StatsFilters = StatsFilters()  # one filter set for every player
+
+class TeamsStatsRequest(BaseModel):
+    teams: List[str] = Field(..., min_length=1)
+    filters: StatsFilters = StatsFilters()  # only seasons and match_phase apply to team aggregates
+
+ERROR_PREFIXES = ('❌', 'Error', '🏏 I understood', 'I understood')
+
+class AnswerBlock(BaseModel):
+    """One piece of an answer: markdown text, or a table of raw values"""
+    kind: str = 'text'  # 'text' | 'table'
+    text: str = ''
+    key: Optional[str] = None  # stable table id for chart lookups
+    title: Optional[str] = None
+    icon: Optional[str] = None
+    columns: List[str] = []
+    rows: List[List[Any]] = []
+    formats: Dict[str, str] = {}  # column name or row label -> '{:.2f}'-style template
+    chart: bool = False  # rows are comparable entities, worth plotting
+    label: Optional[str] = None  # column naming the rows in charts (default: the first)
+
+class Answer(BaseModel):
+    """A chatbot answer as computed, before rendering to markdown, JSON or chart series"""
+    query_type: Optional[str] = None
+    title: Optional[str] = None
+    data: Dict[str, Any] = {}
+    blocks: List[AnswerBlock] = []
+    error: Optional[str] = None
+
+    @classmethod
+    def from_markdown(cls, text: str, query_type: Optional[str] = None) -> 'Answer':
+        """Wrap an answer already formatted as markdown; error and rephrase messages are flagged as errors"""
+        error = text.strip() if text.lstrip().startswith(ERROR_PREFIXES) else None
+        return cls(query_type=query_type, blocks=[AnswerBlock(text=text)], error=error)
+
+    @classmethod
+    def failure(cls, message: str, query_type: Optional[str] = None) -> 'Answer':
+        return cls(query_type=query_type, blocks=[AnswerBlock(text=message)], error=message)
+
+    @property
+    def is_error(self) -> bool:
+        return self.error is not None
+
+    def add_text(self, text: str) -> 'Answer':
+        self.blocks.append(AnswerBlock(text=text))
+        return self
+
+    def add_table(self, key: str, columns: List[str], rows: List[List[Any]], title: Optional[str] = None,
+                  icon: Optional[str] = None, formats: Optional[Dict[str, str]] = None,
+                  chart: bool = False, label: Optional[str] = None) -> 'Answer':
+        self.blocks.append(AnswerBlock(kind='table', key=key, title=title, icon=icon, columns=columns,
+                                       rows=rows, formats=formats or {}, chart=chart, label=label))
+        return self
+
+    def table(self, key: str) -> Optional[AnswerBlock]:
+        return next((block for block in self.blocks if block.kind == 'table' and block.key == key), None)
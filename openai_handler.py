@@ -2,14 +2,27 @@
 OpenAI LLM integration for natural language cricket analytics queries
 """
 
+import asyncio
+import copy
 import json
 import os
+import re
 import pandas as pd
+from contextlib import contextmanager
 from typing import Dict, List, Tuple, Optional
-from openai import OpenAI
 from pathlib import Path
 from data_loader import IPLDataLoader
 from stats_engine import StatsEngine
+from result_cache import ResultCache, SingleFlight, AsyncSingleFlight
+from llm_backends import LLMBackend, ResilientBackend, create_backend
+from intent_classifier import IntentClassifier
+from spell_correction import SpellCorrector
+from cricket_conventions import normalize_team
+from tracing import StageLatencyLog, current_trace, start_trace, span, note
+from conversation import SessionStore, use_slices
+from models import Answer
+from renderers import render_markdown
+import config
 
 class CricketChatbot:
     """
@@ -17,27 +30,159 @@ class CricketChatbot:
     Supports queries like: "kohli vs bumrah in chinnaswamy stadium"
     """
     
-    def __init__(self, matches_df, deliveries_df, api_key: Optional[str] = None):
-        """Initialize chatbot with IPL data and OpenAI API"""
+    # Bump whenever the parse prompt or post-parse canonicalization changes
+    PARSE_PROMPT_VERSION = 3
+    
+    # Every key of a parse; the model omits the null ones
+    PARSE_FIELDS = (
+        'player1', 'player2', 'venue', 'seasons', 'bowler_type', 'match_phase', 'match_situation',
+        'opposition_team', 'batter_role', 'vs_conditions', 'ground', 'handedness', 'inning', 'match_type',
+        'form_filter', 'time_period', 'record_type', 'comparison_type', 'ranking_metric', 'player_list',
+        'team_list', 'query_type', 'interpretation',
+    )
+    
+    # Static parse instructions. Names are canonicalized after the call, so no alias samples are needed.
+    PARSE_SYSTEM_PROMPT = """Parse an IPL cricket question into JSON. Reply with one JSON object only, no prose. Omit null fields.
+
+Fields:
+player1, player2: player names as written or well known (e.g. "Virat Kohli")
+player_list: [names] for questions about three or more players
+team_list: [full IPL team names] for comparing several teams
+opposition_team: full IPL team name
+seasons: [years 2008-2025]
+match_phase: powerplay|middle_overs|death_overs|opening|closing
+match_situation: batting_first|chasing|defending|pressure_chase|winning_position
+bowler_type: pace|spin|left_arm|right_arm
+batter_role: opener|middle_order|lower_order|finisher
+vs_conditions: vs_pace|vs_spin|vs_left_arm|vs_right_arm|vs_off_spin|vs_leg_spin
+ground: stadium name, e.g. Wankhede Stadium
+handedness: left_handed|right_handed
+inning: 1|2
+match_type: home|away
+time_period: recent|last N matches|last N innings|last season|all time
+record_type: highest_score|most_runs|fastest_century|best_figures|most_wickets|most_sixes
+comparison_type: vs_league_avg|vs_cohort|peer_group|vs_all_rounders|batting|bowling
+ranking_metric: runs|strike_rate|economy|wickets|consistency
+query_type (required): player_stats|head_to_head|team_comparison|trends|records|rankings|ground_insights|form_guide|comparative_analysis|predictions|general
+interpretation (required): a few words
+
+Examples:
+kohli chasing in death overs 2024 -> {"player1":"Virat Kohli","match_situation":"chasing","match_phase":"death_overs","seasons":[2024],"query_type":"player_stats","interpretation":"Kohli chasing, death overs, 2024"}
+kohli vs bumrah at chinnaswamy -> {"player1":"Virat Kohli","player2":"Jasprit Bumrah","ground":"M Chinnaswamy Stadium","query_type":"head_to_head","interpretation":"Kohli vs Bumrah at Chinnaswamy"}
+kohli vs sharma in powerplay -> {"player1":"Virat Kohli","player2":"Rohit Sharma","match_phase":"powerplay","query_type":"comparative_analysis","interpretation":"Compare Kohli and Rohit in powerplay"}
+kohli, rohit and gill in 2024 -> {"player_list":["Virat Kohli","Rohit Sharma","Shubman Gill"],"seasons":[2024],"query_type":"comparative_analysis","interpretation":"Compare Kohli, Rohit and Gill, 2024"}
+compare MI, CSK and RCB death bowling -> {"team_list":["Mumbai Indians","Chennai Super Kings","Royal Challengers Bengaluru"],"match_phase":"death_overs","comparison_type":"bowling","query_type":"comparative_analysis","interpretation":"MI, CSK, RCB death bowling"}
+bumrah vs left hander -> {"player1":"Jasprit Bumrah","handedness":"left_handed","query_type":"player_stats","interpretation":"Bumrah vs left-handers"}
+kohli's recent form -> {"player1":"Virat Kohli","time_period":"recent","query_type":"form_guide","interpretation":"Kohli recent form"}
+bumrah last 10 matches -> {"player1":"Jasprit Bumrah","time_period":"last 10 matches","query_type":"trends","interpretation":"Bumrah last 10 matches"}
+top 10 run scorers in 2024 -> {"seasons":[2024],"ranking_metric":"runs","query_type":"rankings","interpretation":"Top run scorers 2024"}
+kohli at wankhede -> {"player1":"Virat Kohli","ground":"Wankhede Stadium","query_type":"ground_insights","interpretation":"Kohli at Wankhede"}
+who should bat for CSK in powerplay -> {"opposition_team":"Chennai Super Kings","match_phase":"powerplay","query_type":"predictions","interpretation":"Best CSK powerplay batters"}
+best death bowlers for MI against CSK -> {"team_list":["Mumbai Indians","Chennai Super Kings"],"match_phase":"death_overs","query_type":"predictions","interpretation":"MI death bowlers vs CSK"}"""
+    
+    # Words the local parser can account for without an entity or filter behind them
+    LOCAL_PARSE_FILLER_WORDS = {
+        'stats', 'statistics', 'stat', 'record', 'records', 'performance', 'numbers', 'profile',
+        'summary', 'figures', 'career', 'overall', 'ipl', 'season', 'seasons', 'year', 'in', 'the',
+        'of', 'at', 'on', 'for', 'and', 'during', 'show', 'me', 'give', 'get', 'tell', 'about',
+        'batting', 'bowling', 'head', 'to', 'h2h', 'all', 'time', 'his', 'vs', 'versus', 'against', 'v',
+    }
+    
+    # Words that belong to a recognized filter keyword (see _extract_filter_keywords)
+    LOCAL_PARSE_FILTER_WORDS = {
+        'powerplay', 'power', 'play', 'middle', 'overs', 'over', 'death', 'opening', 'closing',
+        'chasing', 'chase', 'defending', 'batting', 'first', 'second', 'inning', 'innings',
+        'pace', 'pacers', 'pacer', 'fast', 'spin', 'spinner', 'spinners', 'left', 'right', 'arm',
+        'hand', 'handed', 'hander', 'handers', 'opener', 'finisher', 'home', 'away', 'recent',
+        'last', 'matches', 'match', 'games', 'stadium', 'ground',
+    }
+    
+    # Common words that are also someone's short alias ("is", "how"); never a player on their own
+    LOCAL_PARSE_STOPWORDS = {
+        'is', 'how', 'what', 'who', 'which', 'when', 'where', 'why', 'a', 'an', 'it', 'was', 'has', 'had',
+        'be', 'by', 'with', 'good', 'best', 'top', 'most', 'much', 'many', 'did', 'does', 'do', 'can',
+        'will', 'should', 'i', 'my', 'we', 'you', 'he', 'this', 'that', 'compare', 'comparison',
+    }
+    
+    HEAD_TO_HEAD_WORDS = {'vs', 'versus', 'against', 'v'}
+    
+    # Words that flip which end of a ranking is asked for; spelling correction never lands on them by accident
+    RANKING_WORDS = {'least', 'lowest', 'worst', 'fewest', 'highest', 'most', 'best', 'top'}
+    
+    # Openings that mark a session follow-up ("what about rohit?", "and in death overs?")
+    FOLLOW_UP_CUES = ('and', 'what about', 'how about', 'same', 'also', 'only', 'just', 'but', 'instead')
+    FOLLOW_UP_WORDS = {'and', 'about', 'same', 'also', 'only', 'just', 'but', 'instead', 'then', 'there', 'those'}
+    # Words that start a new question even in a short query ("top scorers in 2023")
+    NEW_QUESTION_WORDS = {'top', 'most', 'best', 'who', 'which', 'compare', 'comparison'}
+    # Filters that describe the same thing; a follow-up setting one replaces the others
+    LINKED_FILTERS = (('bowler_type', 'vs_conditions'), ('seasons', 'time_period'))
+    
+    # Ground keywords, checked in order against the query text
+    VENUE_KEYWORDS = [
+        ('wankhede', 'Wankhede Stadium'),
+        ('chinnaswamy', 'M Chinnaswamy Stadium'),
+        ('arun jaitley', 'Arun Jaitley Stadium'),
+        ('feroz shah kotla', 'Arun Jaitley Stadium'),
+        ('eden gardens', 'Eden Gardens'),
+        ('chidambaram', 'MA Chidambaram Stadium'),
+        ('rajiv gandhi', 'Rajiv Gandhi International Stadium'),
+        ('narendra modi', 'Narendra Modi Stadium'),
+        ('sardar patel', 'Narendra Modi Stadium'),
+        ('motera', 'Narendra Modi Stadium'),
+        ('sawai mansingh', 'Sawai Mansingh Stadium'),
+        ('dy patil', 'Dr DY Patil Sports Academy'),
+        ('bindra', 'Punjab Cricket Association IS Bindra Stadium'),
+        ('mohali', 'Punjab Cricket Association IS Bindra Stadium'),
+        ('reddy', 'Dr. Y.S. Rajasekhara Reddy ACA-VDCA Cricket Stadium'),
+        ('visakhapatnam', 'Dr. Y.S. Rajasekhara Reddy ACA-VDCA Cricket Stadium'),
+        ('arun nagar', 'Arun Nagar Stadium'),
+        ('maharashtra cricket', 'Maharashtra Cricket Association Stadium'),
+        ('pune', 'Maharashtra Cricket Association Stadium'),
+        ('bharat ratna', 'Bharat Ratna Rajiv Gandhi Intl'),
+        ('chepauk', 'MA Chidambaram Stadium'),
+        ('uppal', 'Rajiv Gandhi International Stadium'),
+        ('hyderabad', 'Rajiv Gandhi International Stadium'),
+        ('ahmedabad', 'Narendra Modi Stadium'),
+        ('jaipur', 'Sawai Mansingh Stadium'),
+        ('mumbai', 'Wankhede Stadium'),
+        ('bangalore', 'M Chinnaswamy Stadium'),
+        ('bengaluru', 'M Chinnaswamy Stadium'),
+        ('delhi', 'Arun Jaitley Stadium'),
+        ('kolkata', 'Eden Gardens'),
+        ('chennai', 'MA Chidambaram Stadium'),
+    ]
+    
+    def __init__(self, matches_df, deliveries_df, api_key: Optional[str] = None,
+                 stats_engine: Optional[StatsEngine] = None, backend: Optional[LLMBackend] = None):
+        """Initialize chatbot with IPL data and an LLM backend (OpenAI unless config.LLM_BACKEND says otherwise)"""
         self.matches_df = matches_df
         self.deliveries_df = deliveries_df
-        self.stats_engine = StatsEngine(matches_df, deliveries_df)
+        self.stats_engine = stats_engine or StatsEngine(matches_df, deliveries_df)
 
         # Model selection (with environment variable override)
         self.model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
         
-        # Set OpenAI API key - strip whitespace and ensure it's valid
-        if api_key:
-            api_key_to_use = api_key.strip()
-        elif os.getenv('OPENAI_API_KEY'):
-            api_key_to_use = os.getenv('OPENAI_API_KEY').strip()
-        else:
-            raise ValueError("OpenAI API key not provided. Set OPENAI_API_KEY environment variable.")
-        
-        if not api_key_to_use or not api_key_to_use.startswith('sk-'):
-            raise ValueError(f"Invalid API key format. Expected sk-... format, got: {api_key_to_use[:20] if api_key_to_use else 'empty'}")
-        
-        self.client = OpenAI(api_key=api_key_to_use)
+        # The OpenAI backend validates the key (sk-... format); the local one needs none
+        self.llm = backend or create_backend(api_key=api_key, model=self.model, responder=self._local_llm_reply)
+        self.model = self.llm.model
+        
+        self._parse_cache = ResultCache(max_entries=config.PARSE_CACHE_MAX_ENTRIES, ttl=config.PARSE_CACHE_TTL,
+                                        enabled=config.PARSE_CACHE_ENABLED,
+                                        backing=self.stats_engine.open_disk_cache('parses'), name='parses')
+        self._response_cache = ResultCache(max_entries=config.CACHE_MAX_ENTRIES, ttl=config.CACHE_TTL,
+                                           enabled=config.RESPONSE_CACHE_ENABLED,
+                                           backing=self.stats_engine.open_disk_cache('responses'), name='responses')
+        # Concurrent identical queries share one in-flight parse / answer
+        self._inflight = SingleFlight()
+        self._async_inflight = AsyncSingleFlight()
+        # Runs the stats work of async answers: async (fn, *args) -> result, keeping the caller's context
+        self.offload = asyncio.to_thread
+        # Stage timings of recent requests, and the full trace of slow ones
+        self.latency_log = StageLatencyLog(max_traces=config.TRACE_HISTORY, slow_ms=config.TRACE_SLOW_QUERY_MS,
+                                           keep_slow=config.TRACE_KEEP_SLOW)
+        # Conversation context per session_id, for follow-up questions
+        self.sessions = SessionStore(max_sessions=config.SESSION_MAX_ENTRIES, ttl=config.SESSION_TTL,
+                                     max_slices=config.SESSION_MAX_SLICES)
         
         # Get all unique players and venues for context
         self.all_players = self._get_all_players()
@@ -47,6 +192,14 @@ class CricketChatbot:
         # Load player aliases for smart matching
         self.player_aliases = self._build_player_aliases()
         self.team_aliases = self._build_team_aliases()
+        self._player_ngrams, self._team_ngrams = self._build_entity_ngrams()
+        self.spell_corrector = self._build_spell_corrector() if config.SPELL_CORRECTION_ENABLED else None
+        self.intent_classifier = IntentClassifier.load_or_train(config.INTENT_MODEL_PATH,
+                                                                base_dir=str(Path(__file__).resolve().parent),
+                                                                normalizer=self._intent_text)
+        if self.spell_corrector is not None:
+            for words in self.intent_classifier.class_words.values():
+                self.spell_corrector.add_words(words)
         
         # Valid filter values
         self.VALID_MATCH_PHASES = ['powerplay', 'middle_overs', 'death_overs', 'opening', 'closing']
@@ -54,17 +207,12 @@ class CricketChatbot:
         self.VALID_BOWLER_TYPES = ['fast_bowler', 'spin_bowler', 'left_arm', 'right_arm', 'pacer', 'spinner', 'pace']
         self.VALID_BATTER_ROLES = ['opener', 'middle_order', 'lower_order', 'finisher']
         self.VALID_VS_CONDITIONS = ['vs_pace', 'vs_spin', 'vs_left_arm', 'vs_right_arm']
-        
-        # Team name normalization mapping
-        self.team_name_mapping = {
-            'Royal Challengers Bangalore': 'Royal Challengers Bengaluru'
-        }
     
     def _normalize_team_name(self, team_name: str) -> str:
         """Normalize team name for consistent display"""
         if not team_name or pd.isna(team_name):
             return team_name
-        return self.team_name_mapping.get(team_name, team_name)
+        return normalize_team(team_name)
     
     def _validate_filter(self, filter_name: str, filter_value: Optional[str]) -> bool:
         """Validate that filter values are recognized"""
@@ -88,9 +236,7 @@ class CricketChatbot:
     
     def _get_all_players(self) -> List[str]:
         """Extract all unique player names from dataset"""
-        batters = self.deliveries_df['batter'].unique().tolist()
-        bowlers = self.deliveries_df['bowler'].unique().tolist()
-        return list(set(batters + bowlers))
+        return self.stats_engine._get_all_players()
     
     def _get_all_venues(self) -> List[str]:
         """Extract all unique venues from dataset"""
@@ -102,32 +248,21 @@ class CricketChatbot:
         return teams.tolist()
     
     def _build_player_aliases(self) -> Dict[str, str]:
-        """Load player name aliases from player_aliases.json"""
-        try:
-            aliases_file = Path(__file__).resolve().parent / "player_aliases.json"
-            if aliases_file.exists():
-                with open(aliases_file, 'r') as f:
-                    data = json.load(f)
-                
-                # Store canonical aliases for later use
-                self._canonical_aliases = data.get("aliases", {})
-                
-                # Build reverse mapping: alias -> [list of canonical names]
-                # This allows handling cases where multiple players have the same alias
-                alias_map = {}
-                for canonical_name, alias_list in self._canonical_aliases.items():
-                    for alias in alias_list:
-                        alias_lower = alias.lower()
-                        if alias_lower not in alias_map:
-                            alias_map[alias_lower] = []
-                        alias_map[alias_lower].append(canonical_name)
-                
-                return alias_map
-        except Exception as e:
-            print(f"Warning: Could not load player aliases: {e}")
-        
-        self._canonical_aliases = {}
-        return {}
+        """Build reverse player alias map from the aliases StatsEngine already loaded"""
+        # Store canonical aliases for later use
+        self._canonical_aliases = self.stats_engine._aliases
+        
+        # Build reverse mapping: alias -> [list of canonical names]
+        # This allows handling cases where multiple players have the same alias
+        alias_map = {}
+        for canonical_name, alias_list in self._canonical_aliases.items():
+            for alias in alias_list:
+                alias_lower = alias.lower()
+                if alias_lower not in alias_map:
+                    alias_map[alias_lower] = []
+                alias_map[alias_lower].append(canonical_name)
+        
+        return alias_map
     
     def _build_team_aliases(self) -> Dict[str, str]:
         """Load team aliases from team_aliases.json"""
@@ -158,6 +293,254 @@ class CricketChatbot:
         
         return {}
     
+    def _build_entity_ngrams(self) -> Tuple[Dict[str, List[str]], Dict[str, str]]:
+        """Whole-phrase lookup tables for the local parser: player and team aliases by lowercase phrase"""
+        player_ngrams = {alias: list(names) for alias, names in self.player_aliases.items()}
+        for player in self.all_players:
+            if player and not pd.isna(player):
+                player_ngrams.setdefault(player.lower(), [player])
+        
+        team_ngrams = dict(self.team_aliases)
+        for team in self.all_teams:
+            if team and not pd.isna(team):
+                team_ngrams.setdefault(team.lower(), team)
+        return player_ngrams, team_ngrams
+    
+    def _build_spell_corrector(self) -> SpellCorrector:
+        """The stats engine's spelling index, extended with team aliases, ground keywords and parser vocabulary"""
+        corrector = self.stats_engine.spell_corrector
+        common = max(corrector.words.values(), default=1)
+        teams: Dict[str, List[str]] = {}
+        for alias, team in self.team_aliases.items():
+            teams.setdefault(team, []).append(alias)
+        corrector.add_aliases(teams, default_weight=common)
+        corrector.add_aliases({keyword: [] for keyword, _ in self.VENUE_KEYWORDS}, default_weight=common)
+        corrector.add_words(self.LOCAL_PARSE_FILLER_WORDS | self.LOCAL_PARSE_FILTER_WORDS
+                            | self.LOCAL_PARSE_STOPWORDS, common)
+        corrector.guard_words(self.LOCAL_PARSE_FILTER_WORDS | self.RANKING_WORDS)
+        return corrector
+    
+    def _correct_spelling(self, query: str) -> str:
+        """Query with misspelled names and cricket terms corrected ('wankede' -> 'wankhede')"""
+        return self.spell_corrector.correct(query) if self.spell_corrector is not None else query
+    
+    def _match_entities(self, tokens: List[str]) -> Tuple[List[Tuple[int, str, float]], List[Tuple[int, str]], set]:
+        """Longest-first whole-phrase matches of players and teams in a token list
+        
+        Returns (players as (position, name, confidence), teams as (position, name), covered token positions).
+        """
+        players, teams, covered = [], [], set()
+        i = 0
+        while i < len(tokens):
+            for size in (4, 3, 2, 1):
+                phrase = ' '.join(tokens[i:i + size])
+                if i + size > len(tokens):
+                    continue
+                if size == 1 and (phrase in self.LOCAL_PARSE_FILLER_WORDS or phrase in self.LOCAL_PARSE_FILTER_WORDS
+                                  or phrase in self.LOCAL_PARSE_STOPWORDS):
+                    continue
+                if phrase in self._team_ngrams:
+                    teams.append((i, self._team_ngrams[phrase]))
+                elif phrase in self._player_ngrams:
+                    # Same tie-break as _resolve_player_name: the player with more aliases is the better known one
+                    names = sorted(self._player_ngrams[phrase], key=lambda p: -len(self._canonical_aliases.get(p, [])))
+                    best = names[0]
+                    # Short aliases and aliases shared by several players are weaker evidence
+                    confidence = 1.0 if len(phrase) > 2 else 0.6
+                    if len(names) > 1:
+                        alias_counts = [len(self._canonical_aliases.get(p, [])) for p in names[:2]]
+                        confidence *= 0.95 if alias_counts[0] > alias_counts[1] else 0.7
+                    players.append((i, best, confidence))
+                else:
+                    continue
+                covered.update(range(i, i + size))
+                i += size
+                break
+            else:
+                i += 1
+        return players, teams, covered
+    
+    @staticmethod
+    def _local_tokens(query: str) -> List[str]:
+        """Lowercase words of a query, possessive 's and punctuation removed"""
+        text = re.sub(r"'s\b", '', query.lower())
+        return re.sub(r'[^\w\s]', ' ', text).split()
+    
+    def _intent_text(self, query: str) -> str:
+        """Query with players, teams and numbers masked, as the intent classifier sees it"""
+        tokens = self._local_tokens(query)
+        players, teams, covered = self._match_entities(tokens)
+        tags = {position: '<player>' for position, _, _ in players}
+        tags.update({position: '<team>' for position, _ in teams})
+        words = []
+        for i, token in enumerate(tokens):
+            if i in tags:
+                words.append(tags[i])
+            elif i in covered:
+                continue  # rest of a multi-word name
+            elif re.fullmatch(r'20\d{2}', token):
+                words.append('<year>')
+            elif token.isdigit():
+                words.append('<num>')
+            else:
+                words.append(token)
+        return ' '.join(words)
+    
+    # Entities each query type needs before the classifier may route to it
+    @staticmethod
+    def _intent_fits(intent: str, player_count: int, has_team: bool, filters: Dict) -> bool:
+        if intent in ('player_stats', 'trends', 'form_guide'):
+            return player_count == 1
+        if intent == 'head_to_head':
+            return player_count == 2
+        if intent == 'comparative_analysis':
+            return player_count >= 1
+        if intent == 'ground_insights':
+            return player_count == 1 and bool(filters.get('ground'))
+        if intent in ('rankings', 'predictions'):
+            return player_count == 0
+        if intent == 'team_comparison':
+            return player_count == 0 and has_team
+        return intent == 'records'
+    
+    def _matchup_orientation(self, player1: str, player2: str) -> Tuple[str, str, Optional[str]]:
+        """(batter, bowler, kind) for two players named around 'vs'
+        
+        kind is 'matchup' when one has bowled to the other (the order with more
+        deliveries wins), 'peers' when both have the same primary role, and None
+        when they never met; the batter comes first where it can be told.
+        """
+        matchups = self.stats_engine.matchups
+        forward = matchups.get(player1, player2)['deliveries']
+        reverse = matchups.get(player2, player1)['deliveries']
+        role1, role2 = matchups.primary_role(player1), matchups.primary_role(player2)
+        if role1 and role1 == role2:
+            return player1, player2, 'peers'
+        if forward or reverse:
+            return (player1, player2, 'matchup') if forward >= reverse else (player2, player1, 'matchup')
+        if role1 == 'bowler' or role2 == 'batter':
+            return player2, player1, None
+        return player1, player2, None
+    
+    def _parse_locally(self, query: str) -> Tuple[Dict, float]:
+        """Rule-based parse with a confidence score in [0, 1]
+        
+        Confidence is high only when every word is accounted for by a whole-phrase
+        player/team match, a filter keyword or a filler word, and the intent follows
+        from the entities (one player: stats, a batter and a bowler around 'vs': head-to-head).
+        """
+        query_lower = query.lower()
+        tokens = self._local_tokens(query)
+        
+        players, teams, covered = self._match_entities(tokens)
+        extracted_filters = self._extract_filter_keywords(query)
+        
+        # The classifier refines generic entity-based guesses (stats -> trends/records/form, ...)
+        intent, intent_probability = self.intent_classifier.predict(query)
+        use_intent = (intent_probability >= config.INTENT_MIN_CONFIDENCE
+                      and self._intent_fits(intent, len(players), bool(teams), extracted_filters))
+        intent_words = self.intent_classifier.class_words.get(intent, set()) if use_intent else set()
+        
+        venue_words = set()
+        if extracted_filters.get('ground'):
+            for venue_keyword, _ in self.VENUE_KEYWORDS:
+                if venue_keyword in query_lower:
+                    venue_words.update(venue_keyword.split())
+        for i, token in enumerate(tokens):
+            if (token in self.LOCAL_PARSE_FILLER_WORDS or token in venue_words or token in self.LOCAL_PARSE_FILTER_WORDS
+                    or token in intent_words
+                    or re.fullmatch(r'20\d{2}|\d{1,2}', token)):
+                covered.add(i)
+        coverage = len(covered) / len(tokens) if tokens else 0.0
+        
+        player1 = players[0][1] if players else None
+        player2 = players[1][1] if len(players) > 1 else None
+        team = teams[0][1] if teams else None
+        between = tokens[players[0][0]:players[1][0]] if len(players) > 1 else []
+        
+        player_list = team_list = comparison_type = None
+        
+        # Intent from the entities found
+        if len(players) == 2 and not teams and self.HEAD_TO_HEAD_WORDS.intersection(between):
+            player1, player2, orientation = self._matchup_orientation(player1, player2)
+            if orientation == 'peers':
+                # "rohit vs gill": two batters (or two bowlers) are compared, not matched up
+                query_type, intent_confidence = 'comparative_analysis', 0.9
+            elif orientation == 'matchup':
+                query_type, intent_confidence = 'head_to_head', 0.95
+            else:
+                # They never met: leave the reading to the LLM
+                query_type, intent_confidence = 'head_to_head', 0.5
+        elif len(players) == 2 and not teams and {'compare', 'comparison'}.intersection(tokens):
+            query_type, intent_confidence = 'comparative_analysis', 0.9
+        elif len(players) >= 3 and not teams:
+            # "kohli, rohit and gill in powerplay": one batched comparison
+            player_list = list(dict.fromkeys(player for _, player, _ in players))
+            player1 = player2 = None
+            query_type, intent_confidence = 'comparative_analysis', 0.9
+        elif len(teams) >= 2 and not players:
+            team_list = list(dict.fromkeys(team for _, team in teams))
+            team = None
+            comparison_type = 'bowling' if 'bowling' in tokens and 'batting' not in tokens else 'batting'
+            query_type, intent_confidence = 'comparative_analysis', 0.85
+        elif len(players) == 1 and len(teams) <= 1:
+            query_type, intent_confidence = 'player_stats', 0.9 if not teams else 0.85
+        elif not players and len(teams) == 1:
+            query_type, intent_confidence = 'team_comparison', 0.7
+        else:
+            query_type, intent_confidence = 'general', 0.0
+        
+        if use_intent and query_type in ('general', 'player_stats', 'team_comparison'):
+            intent_confidence = max(intent_confidence if intent == query_type else 0.0, intent_probability)
+            query_type = intent
+        
+        if query_type == 'player_stats' and extracted_filters.get('time_period') not in (None, 'all time'):
+            query_type = 'trends'
+        elif query_type == 'player_stats' and extracted_filters.get('ground') and not teams:
+            query_type = 'ground_insights'
+        
+        entity_confidence = 1.0
+        for _, _, confidence in players:
+            entity_confidence *= confidence
+        
+        # Fall back to substring resolution so the parse is still usable when the model is unavailable
+        if not player1 and not team and not team_list and query_type == 'general':
+            player1 = self._resolve_player_name(query)
+            team = self._resolve_team_name(query)
+            if player1:
+                query_type = 'player_stats'
+            elif team:
+                query_type = 'team_comparison'
+            intent_confidence = 0.0
+        
+        parsed = {
+            "player1": player1,
+            "player2": player2,
+            "venue": None,
+            "seasons": extracted_filters.get('seasons'),
+            "bowler_type": extracted_filters.get('bowler_type'),
+            "match_phase": extracted_filters.get('match_phase'),
+            "match_situation": extracted_filters.get('match_situation'),
+            "opposition_team": team,
+            "batter_role": extracted_filters.get('batter_role'),
+            "vs_conditions": extracted_filters.get('vs_conditions'),
+            "ground": extracted_filters.get('ground'),
+            "handedness": extracted_filters.get('handedness'),
+            "inning": extracted_filters.get('inning'),
+            "match_type": extracted_filters.get('match_type'),
+            "time_period": extracted_filters.get('time_period'),
+            "record_type": None,
+            "comparison_type": comparison_type,
+            "ranking_metric": None,
+            "player_list": player_list,
+            "team_list": team_list,
+            "form_filter": None,
+            "query_type": query_type,
+            "interpretation": f"Comparing {', '.join(player_list or team_list)}" if (player_list or team_list) else
+                              f"Comparing {player1} vs {player2}" if (player1 and player2) else (f"Stats for {player1}" if player1 else "Cricket query")
+        }
+        return parsed, round(intent_confidence * entity_confidence * coverage, 3)
+    
     def _resolve_player_name(self, query_text: str) -> Optional[str]:
         """Intelligently resolve player name from query using aliases and fuzzy matching"""
         query_lower = query_text.lower()
@@ -204,6 +587,16 @@ class CricketChatbot:
         
         return None
     
+    def _local_llm_reply(self, task: Optional[str], query: Optional[str], messages: List[Dict]) -> Optional[str]:
+        """Offline stand-in for the model, used by the local backend when its cassette has no reply"""
+        if query is None:
+            return None
+        if task == 'parse':
+            return json.dumps(self._parse_locally(query)[0])
+        if task == 'team':
+            return self._resolve_team_name(query) or 'null'
+        return None
+    
     def _extract_team_name_with_gpt(self, query: str) -> Optional[str]:
         """Extract team name from query using GPT when pattern matching fails"""
         try:
@@ -215,14 +608,8 @@ Valid teams: {', '.join(self.all_teams)}
 
 Respond with just the team name (e.g., "Chennai Super Kings") or null if no team mentioned."""
             
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1,
-                max_tokens=50
-            )
-            
-            team_name = response.choices[0].message.content.strip()
+            team_name = self.llm.complete([{"role": "user", "content": prompt}], temperature=0.1, max_tokens=50,
+                                          task='team', query=query).strip()
             if team_name.lower() != 'null' and team_name:
                 # Try to canonicalize the team name
                 return self._get_canonical_team_name(team_name)
@@ -304,41 +691,8 @@ Respond with just the team name (e.g., "Chennai Super Kings") or null if no team
         
         # ===== GROUND/VENUE FILTERS =====
         # Check for ground names - first try exact matches with known venues
-        venues_to_check = [
-            ('wankhede', 'Wankhede Stadium'),
-            ('chinnaswamy', 'M Chinnaswamy Stadium'),
-            ('arun jaitley', 'Arun Jaitley Stadium'),
-            ('feroz shah kotla', 'Arun Jaitley Stadium'),
-            ('eden gardens', 'Eden Gardens'),
-            ('chidambaram', 'MA Chidambaram Stadium'),
-            ('rajiv gandhi', 'Rajiv Gandhi International Stadium'),
-            ('narendra modi', 'Narendra Modi Stadium'),
-            ('sardar patel', 'Narendra Modi Stadium'),
-            ('motera', 'Narendra Modi Stadium'),
-            ('sawai mansingh', 'Sawai Mansingh Stadium'),
-            ('dy patil', 'Dr DY Patil Sports Academy'),
-            ('bindra', 'Punjab Cricket Association IS Bindra Stadium'),
-            ('mohali', 'Punjab Cricket Association IS Bindra Stadium'),
-            ('reddy', 'Dr. Y.S. Rajasekhara Reddy ACA-VDCA Cricket Stadium'),
-            ('visakhapatnam', 'Dr. Y.S. Rajasekhara Reddy ACA-VDCA Cricket Stadium'),
-            ('arun nagar', 'Arun Nagar Stadium'),
-            ('maharashtra cricket', 'Maharashtra Cricket Association Stadium'),
-            ('pune', 'Maharashtra Cricket Association Stadium'),
-            ('bharat ratna', 'Bharat Ratna Rajiv Gandhi Intl'),
-            ('chepauk', 'MA Chidambaram Stadium'),
-            ('uppal', 'Rajiv Gandhi International Stadium'),
-            ('hyderabad', 'Rajiv Gandhi International Stadium'),
-            ('ahmedabad', 'Narendra Modi Stadium'),
-            ('jaipur', 'Sawai Mansingh Stadium'),
-            ('mumbai', 'Wankhede Stadium'),
-            ('bangalore', 'M Chinnaswamy Stadium'),
-            ('bengaluru', 'M Chinnaswamy Stadium'),
-            ('delhi', 'Arun Jaitley Stadium'),
-            ('kolkata', 'Eden Gardens'),
-            ('chennai', 'MA Chidambaram Stadium'),
-        ]
-        
-        for venue_keyword, canonical_venue in venues_to_check:
+        
+        for venue_keyword, canonical_venue in self.VENUE_KEYWORDS:
             if venue_keyword in query_lower:
                 filters['ground'] = canonical_venue
                 break
@@ -388,6 +742,11 @@ Respond with just the team name (e.g., "Chennai Super Kings") or null if no team
         
         return filters
     
+    def _parse_cache_key(self, query: str) -> Tuple:
+        """Parse cache key: model, prompt version and the query with case, punctuation and spacing collapsed"""
+        normalized = ' '.join(re.sub(r'[^\w\s]', ' ', query.lower()).split())
+        return ('parse', self.model, self.PARSE_PROMPT_VERSION, normalized)
+    
     def parse_query(self, query: str) -> Dict:
         """
         Parse natural language query using GPT to intelligently extract cricket-specific information.
@@ -395,12 +754,123 @@ Respond with just the team name (e.g., "Chennai Super Kings") or null if no team
         
         Optimization: Try simple pattern matching FIRST before calling GPT.
         """
+        query = self._correct_spelling(query)
+        with span('parse.local'):
+            parsed = self._parse_without_model(query)
+        if parsed is not None:
+            return parsed
+        with span('parse.llm'):
+            parsed, shared = self._inflight.do(self._parse_cache_key(query), lambda: self._parse_with_model(query))
+        return copy.deepcopy(parsed) if shared else parsed
+    
+    def _parse_with_model(self, query: str) -> Dict:
+        try:
+            response_text = self.llm.complete(self._parse_messages(query), temperature=0.2,
+                                              max_tokens=config.LLM_PARSE_MAX_TOKENS, task='parse', query=query)
+        except Exception as e:
+            # Timeout, open circuit or upstream error: the local parse, whatever its confidence
+            note('parse_source', f'local_fallback ({type(e).__name__})')
+            return self._parse_locally(query)[0]
+        return self._finish_model_parse(query, response_text)
+    
+    async def aparse_query(self, query: str) -> Dict:
+        """parse_query() for async callers: the model call is awaited, with the same fallbacks"""
+        query = self._correct_spelling(query)
+        with span('parse.local'):
+            parsed = self._parse_without_model(query)
+        if parsed is not None:
+            return parsed
+        with span('parse.llm'):
+            parsed, shared = await self._async_inflight.do(self._parse_cache_key(query),
+                                                           lambda: self._aparse_with_model(query))
+        return copy.deepcopy(parsed) if shared else parsed
+    
+    async def _aparse_with_model(self, query: str) -> Dict:
+        try:
+            response_text = await self.llm.acomplete(self._parse_messages(query), temperature=0.2,
+                                                     max_tokens=config.LLM_PARSE_MAX_TOKENS, task='parse', query=query)
+        except Exception as e:
+            note('parse_source', f'local_fallback ({type(e).__name__})')
+            return self._parse_locally(query)[0]
+        return self._finish_model_parse(query, response_text)
+    
+    def _parse_follow_up(self, query: str, previous: Optional[Dict]) -> Optional[Dict]:
+        """The previous parse refined by a short follow-up, or None when the query is a new question
+        
+        A follow-up names no team, carries no words of its own intent, and either sets
+        filters ("in 2023?") or opens with a cue and swaps the player ("what about rohit?").
+        """
+        if not previous or previous.get('query_type') in (None, 'general'):
+            return None
+        tokens = self._local_tokens(query)
+        if not tokens or len(tokens) > config.FOLLOW_UP_MAX_WORDS:
+            return None
+        players, teams, covered = self._match_entities(tokens)
+        if teams:
+            return None
+        venue_words = {word for keyword, _ in self.VENUE_KEYWORDS for word in keyword.split()}
+        known = (self.LOCAL_PARSE_FILLER_WORDS | self.LOCAL_PARSE_FILTER_WORDS | self.LOCAL_PARSE_STOPWORDS
+                 | self.FOLLOW_UP_WORDS | venue_words)
+        for position, token in enumerate(tokens):
+            if position not in covered and (token in self.NEW_QUESTION_WORDS or not (token in known or token.isdigit())):
+                return None
+        
+        filters = self._extract_filter_keywords(query)
+        has_cue = ' '.join(tokens).startswith(self.FOLLOW_UP_CUES)
+        if not (filters or (players and has_cue)) or (players and not has_cue):
+            return None
+        
+        parsed = copy.deepcopy(previous)
+        for position, (_, player, _) in enumerate(players[:2]):
+            parsed['player1' if position == 0 else 'player2'] = player
+        for linked in self.LINKED_FILTERS:
+            if any(field in filters for field in linked):
+                for field in linked:
+                    parsed[field] = None
+        parsed.update(filters)
+        described = [parsed.get('player1'), parsed.get('player2')] + [
+            f"{field}={parsed[field]}" for field in self.PARSE_FIELDS[2:-2] if parsed.get(field) is not None]
+        parsed['interpretation'] = f"Follow-up ({parsed['query_type']}): {', '.join(filter(None, described))}"
+        return parsed
+    
+    def _parse_without_model(self, query: str) -> Optional[Dict]:
+        """Rule-based, confidently local or cached parse; None when the query needs the model"""
+        note('parse_source', 'rules')
         
         # OPTIMIZATION: Try simple pattern matching first for common queries
         # This avoids expensive GPT calls for queries like "player last N matches" or "player stats"
         query_lower = query.lower()
         import re
         
+        # ===== CHECK FOR POINTS TABLE / STANDINGS QUERIES =====
+        if any(kw in query_lower for kw in ['points table', 'point table', 'points-table', 'standings', 'league table']):
+            standings_seasons = self._extract_filter_keywords(query).get('seasons')
+            return {
+                "player1": None,
+                "player2": None,
+                "venue": None,
+                "seasons": standings_seasons,
+                "bowler_type": None,
+                "match_phase": None,
+                "match_situation": None,
+                "opposition_team": None,
+                "batter_role": None,
+                "vs_conditions": None,
+                "ground": None,
+                "handedness": None,
+                "inning": None,
+                "match_type": None,
+                "time_period": None,
+                "record_type": None,
+                "comparison_type": None,
+                "ranking_metric": None,
+                "player_list": None,
+                "team_list": None,
+                "form_filter": None,
+                "query_type": "points_table",
+                "interpretation": f"IPL points table {', '.join(map(str, standings_seasons)) if standings_seasons else '(latest season)'}"
+            }
+        
         # ===== CHECK FOR RECORD QUERIES FIRST (highest score, most runs, best figures) =====
         record_keywords = {
             'highest_score': ['highest individual score', 'max individual score', 'highest score by batter', 'highest batter score', 'highest player score', 'highest player total', 'highest score'],
@@ -512,6 +982,7 @@ Respond with just the team name (e.g., "Chennai Super Kings") or null if no team
                     "comparison_type": None,
                     "ranking_metric": None,
                     "player_list": None,
+                    "team_list": None,
                     "form_filter": None,
                     "query_type": "records",
                     "interpretation": f"{record_description} record for {player1}"
@@ -539,6 +1010,7 @@ Respond with just the team name (e.g., "Chennai Super Kings") or null if no team
                     "comparison_type": None,
                     "ranking_metric": None,
                     "player_list": None,
+                    "team_list": None,
                     "form_filter": None,
                     "query_type": "records",
                     "interpretation": f"{record_description} in IPL"
@@ -586,6 +1058,7 @@ Respond with just the team name (e.g., "Chennai Super Kings") or null if no team
                 "comparison_type": None,
                 "ranking_metric": detected_ranking_metric,
                 "player_list": None,
+                "team_list": None,
                 "form_filter": None,
                 "query_type": "rankings",
                 "interpretation": f"Top {detected_ranking_metric.replace('_', ' ')} in IPL"
@@ -613,15 +1086,17 @@ Respond with just the team name (e.g., "Chennai Super Kings") or null if no team
             # Try to resolve a team name from the query
             team_name = self._resolve_team_name(query)
             
+            team_filters = self._extract_filter_keywords(query)
+            
             # Always return team_stats query type if team metric is detected
             # Even if team_name is None, we'll handle it in get_response
             return {
                 "player1": None,
                 "player2": None,
                 "venue": None,
-                "seasons": None,
+                "seasons": team_filters.get('seasons'),
                 "bowler_type": None,
-                "match_phase": None,
+                "match_phase": team_filters.get('match_phase'),
                 "match_situation": None,
                 "opposition_team": team_name,
                 "batter_role": None,
@@ -635,6 +1110,7 @@ Respond with just the team name (e.g., "Chennai Super Kings") or null if no team
                 "comparison_type": None,
                 "ranking_metric": detected_team_metric if detected_team_metric == 'best_team' else None,
                 "player_list": None,
+                "team_list": None,
                 "form_filter": None,
                 "query_type": "team_stats",
                 "interpretation": f"Team stats for {team_name}" if team_name else f"Team statistics - {detected_team_metric.replace('_', ' ')}"
@@ -669,6 +1145,7 @@ Respond with just the team name (e.g., "Chennai Super Kings") or null if no team
                     "comparison_type": None,
                     "ranking_metric": None,
                     "player_list": None,
+                    "team_list": None,
                     "form_filter": None,
                     "query_type": "trends",
                     "interpretation": f"Trends for {player1} in last {number} {period_type}"
@@ -729,152 +1206,39 @@ Respond with just the team name (e.g., "Chennai Super Kings") or null if no team
                     "comparison_type": None,
                     "ranking_metric": "team_summary",  # Special metric for team summary
                     "player_list": None,
+                    "team_list": None,
                     "form_filter": None,
                     "query_type": "team_stats",
                     "interpretation": f"Team summary for {team_name}"
                 }
         
-        # OPTIMIZATION: Try to resolve a simple player stats query without GPT
-        # This handles queries like "sachin stats", "kohli", "bumrah performance", etc.
-        player1 = self._resolve_player_name(query)
-        if player1 and not ' vs ' in query_lower and not ' against ' in query_lower:
-            # Check if this looks like a simple player stats query
-            # (has player name, but no "vs" comparison, no head-to-head)
-            
-            # Extract any available filters without calling GPT
-            extracted_filters = self._extract_filter_keywords(query)
-            
-            # If no complex filters, just return basic player stats
-            if not any([
-                extracted_filters.get('bowler_type'),
-                extracted_filters.get('match_phase'),
-                extracted_filters.get('match_situation'),
-                extracted_filters.get('batter_role'),
-                extracted_filters.get('vs_conditions'),
-                extracted_filters.get('ground'),
-                extracted_filters.get('handedness'),
-                extracted_filters.get('inning'),
-                extracted_filters.get('match_type'),
-            ]):
-                # Simple player stats query - no complex filters needed
-                return {
-                    "player1": player1,
-                    "player2": None,
-                    "venue": None,
-                    "seasons": extracted_filters.get('seasons'),
-                    "bowler_type": None,
-                    "match_phase": None,
-                    "match_situation": None,
-                    "opposition_team": None,
-                    "batter_role": None,
-                    "vs_conditions": None,
-                    "ground": None,
-                    "handedness": None,
-                    "inning": None,
-                    "match_type": None,
-                    "time_period": extracted_filters.get('time_period'),
-                    "record_type": None,
-                    "comparison_type": None,
-                    "ranking_metric": None,
-                    "player_list": None,
-                    "form_filter": None,
-                    "query_type": "player_stats",
-                    "interpretation": f"Stats for {player1}"
-                }
-        
-        # Build context about available aliases for the prompt
-        # Create a display-friendly version of aliases for the prompt
-        player_alias_samples = {}
-        for i, (player, aliases) in enumerate(list(self._canonical_aliases.items())[:8]):
-            player_alias_samples[player] = aliases
-        
-        team_alias_samples = {k: v for k, v in list(self.team_aliases.items())[:6]}
-        
-        prompt = f"""You are an expert cricket analytics assistant. Parse this cricket query intelligently.
-
-USE THESE PLAYER ALIASES TO RESOLVE NAMES:
-{json.dumps(player_alias_samples, indent=2)}
-... and {len(self._canonical_aliases)-8} more player aliases loaded from player_aliases.json
-
-USE THESE TEAM ALIASES:
-{json.dumps(team_alias_samples, indent=2)}
-... and {len(self.team_aliases)-6} more team aliases
-- match_phase: 'powerplay' (0-6 overs), 'middle_overs' (6-16 overs), 'death_overs' (16+ overs), 'opening' (0-3 overs), 'closing' (17-20 overs)
-- match_situation: 'batting_first', 'chasing', 'defending', 'pressure_chase', 'winning_position'
-- bowler_type: 'pace', 'spin', 'left_arm', 'right_arm'
-- batter_role: 'opener', 'middle_order', 'lower_order', 'finisher'
-- vs_conditions: 'vs_pace', 'vs_spin', 'vs_left_arm', 'vs_right_arm', 'vs_off_spin', 'vs_leg_spin'
-- ground: IPL stadium names (e.g., 'Wankhede Stadium', 'Eden Gardens', 'M Chinnaswamy Stadium')
-- handedness: 'left_handed', 'right_handed'
-- seasons: List of years [2008-2025]
-- inning: 1 or 2 (1 = batting first, 2 = batting second/chasing)
-- match_type: 'home', 'away'
-- time_period: 'recent', 'last 5 matches', 'last 10 matches', 'last season', 'all time'
-- record_type: 'highest_score', 'most_runs', 'fastest_century', 'best_figures', 'most_wickets', 'most_sixes'
-- comparison_type: 'vs_league_avg', 'vs_cohort', 'peer_group', 'vs_all_rounders'
-- trend_direction: 'improving', 'declining', 'stable'
-- form_status: 'in_form', 'good_form', 'average', 'poor_form', 'out_of_form'
-- ranking_metric: 'runs', 'strike_rate', 'economy', 'wickets', 'consistency'
-
-USER QUERY: "{query}"
-
-Return ONLY valid JSON (NO other text):
-{{
-    "player1": "Full player name (use aliases if needed) or null",
-    "player2": "Second player (for comparisons) or null",
-    "venue": "Venue/Ground name or null",
-    "seasons": [List of years mentioned (2008-2025) or null],
-    "bowler_type": "Bowler type or null",
-    "match_phase": "Match phase or null",
-    "match_situation": "Match situation or null",
-    "opposition_team": "Full team name or null",
-    "batter_role": "Batter role or null",
-    "vs_conditions": "Condition or null",
-    "ground": "Ground/Venue name or null",
-    "handedness": "left_handed or right_handed or null",
-    "inning": 1 or 2 or null,
-    "match_type": "home or away or null",
-    "form_filter": "Form or null",
-    "time_period": "Time period filter or null",
-    "record_type": "Type of record requested or null",
-    "comparison_type": "Type of comparison or null",
-    "ranking_metric": "Ranking metric or null",
-    "player_list": [List of player names for group queries or null],
-    "query_type": "player_stats|head_to_head|team_comparison|trends|records|rankings|ground_insights|form_guide|comparative_analysis|predictions|general",
-    "interpretation": "What the user is asking"
-}}
-
-EXAMPLES:
-- "virat in powerplay" → player1: "V Kohli", match_phase: "powerplay", query_type: "player_stats"
-- "virat vs bumrah" → player1: "V Kohli", player2: "JJ Bumrah", query_type: "head_to_head"
-- "kohli vs bumrah in chinnaswamy" → player1: "V Kohli", player2: "JJ Bumrah", ground: "M Chinnaswamy Stadium", query_type: "head_to_head"
-- "kohli chasing in death overs 2024" → player1: "V Kohli", match_situation: "chasing", match_phase: "death_overs", seasons: [2024], query_type: "player_stats"
-- "bumrah vs left hander" → player1: "JJ Bumrah", handedness: "left_handed", query_type: "player_stats"
-- "sky in powerplay chasing" → player1: "SA Yadav", match_phase: "powerplay", match_situation: "chasing", query_type: "player_stats"
-- "bumrah at home in 2024" → player1: "JJ Bumrah", match_type: "home", seasons: [2024], query_type: "player_stats"
-- "sharma vs pace bowlers" → player1: "RG Sharma", vs_conditions: "vs_pace", query_type: "player_stats"
-- "bumrah vs right hander" → player1: "JJ Bumrah", handedness: "right_handed", query_type: "player_stats"
-- "kohli's recent form" → player1: "V Kohli", time_period: "recent", query_type: "form_guide"
-- "kohli's highest score" → player1: "V Kohli", record_type: "highest_score", query_type: "records"
-- "top 10 run scorers in 2024" → seasons: [2024], ranking_metric: "runs", query_type: "rankings"
-- "kohli at wankhede" → player1: "V Kohli", ground: "Wankhede Stadium", query_type: "ground_insights"
-- "bumrah's trend in last 5 matches" → player1: "JJ Bumrah", time_period: "last 5 matches", query_type: "trends"
-- "kohli last 5 innings" → player1: "V Kohli", time_period: "last 5 innings", query_type: "trends"
-- "bumrah last 10 matches" → player1: "JJ Bumrah", time_period: "last 10 matches", query_type: "trends"
-- "kohli vs sharma in powerplay" → player1: "V Kohli", player2: "RG Sharma", match_phase: "powerplay", query_type: "comparative_analysis"
-- "who should bat for CSK in powerplay" → opposition_team: "CSK", match_phase: "powerplay", query_type: "predictions"
-"""
-        
+        # Confident local parses skip the model entirely ("kohli stats 2024", "bumrah vs kohli");
+        # substring-only matches and unexplained words keep the score low and go to the model
+        local_parsed, confidence = self._parse_locally(query)
+        note('local_parse_confidence', confidence)
+        if confidence >= config.LOCAL_PARSE_MIN_CONFIDENCE:
+            note('parse_source', 'local')
+            return local_parsed
+        
+        # Repeated and trivially rephrased queries reuse the canonicalized LLM parse
+        parse_key = self._parse_cache_key(query)
+        hit, parsed = self._parse_cache.get(parse_key)
+        if hit:
+            note('parse_source', 'cache')
+            return parsed
+        return None
+    
+    def _parse_messages(self, query: str) -> List[Dict]:
+        """Static system prefix (identical on every call, so the provider can cache it) plus the bare query"""
+        return [{"role": "system", "content": self.PARSE_SYSTEM_PROMPT},
+                {"role": "user", "content": query}]
+    
+    def _finish_model_parse(self, query: str, response_text: str) -> Dict:
+        """Canonicalize and cache the model's parse; unreadable replies fall back to the local parse"""
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.2,
-                max_tokens=500
-            )
-            
-            response_text = response.choices[0].message.content.strip()
-            parsed = json.loads(response_text)
+            parsed = json.loads(response_text.strip())
+            for field in self.PARSE_FIELDS:
+                parsed.setdefault(field, None)
             
             # Normalize and validate player/team names
             if parsed.get('player1'):
@@ -892,6 +1256,11 @@ EXAMPLES:
                 if canonical:
                     parsed['opposition_team'] = canonical
             
+            if isinstance(parsed.get('player_list'), list):
+                parsed['player_list'] = [self._get_canonical_player_name(str(p)) or str(p) for p in parsed['player_list']]
+            if isinstance(parsed.get('team_list'), list):
+                parsed['team_list'] = [self._get_canonical_team_name(str(t)) or str(t) for t in parsed['team_list']]
+            
             # Normalize filter values to snake_case lowercase
             if parsed.get('match_phase'):
                 parsed['match_phase'] = str(parsed['match_phase']).lower().replace(' ', '_').replace('-', '_')
@@ -904,61 +1273,14 @@ EXAMPLES:
             if parsed.get('vs_conditions'):
                 parsed['vs_conditions'] = str(parsed['vs_conditions']).lower().replace(' ', '_').replace('-', '_')
             
+            self._parse_cache.set(self._parse_cache_key(query), parsed)
+            note('parse_source', 'llm')
             return parsed
             
         except (json.JSONDecodeError, Exception) as e:
-            # Fallback: Extract keywords AND entities
-            player1 = self._resolve_player_name(query)
-            player2 = None
-            team = self._resolve_team_name(query)
-            
-            # Try to extract second player from "vs" comparison
-            if ' vs ' in query.lower() or ' against ' in query.lower():
-                separator = ' vs ' if ' vs ' in query.lower() else ' against '
-                parts = query.lower().split(separator)
-                if len(parts) >= 2:
-                    player2 = self._resolve_player_name(parts[1])
-            
-            # Extract filter keywords using pattern matching
-            extracted_filters = self._extract_filter_keywords(query)
-            
-            # Determine query type
-            determined_type = 'general'
-            if player1 and player2:
-                determined_type = 'head_to_head'
-            elif player1:
-                determined_type = 'player_stats'
-            elif team:
-                determined_type = 'team_comparison'
-            
-            # Determine query_type based on extracted filters
-            if extracted_filters.get('time_period') and player1:
-                determined_type = 'trends'
-            
-            return {
-                "player1": player1,
-                "player2": player2,
-                "venue": None,
-                "seasons": extracted_filters.get('seasons'),
-                "bowler_type": extracted_filters.get('bowler_type'),
-                "match_phase": extracted_filters.get('match_phase'),
-                "match_situation": extracted_filters.get('match_situation'),
-                "opposition_team": team,
-                "batter_role": extracted_filters.get('batter_role'),
-                "vs_conditions": extracted_filters.get('vs_conditions'),
-                "ground": extracted_filters.get('ground'),
-                "handedness": extracted_filters.get('handedness'),
-                "inning": extracted_filters.get('inning'),
-                "match_type": extracted_filters.get('match_type'),
-                "time_period": extracted_filters.get('time_period'),
-                "record_type": None,
-                "comparison_type": None,
-                "ranking_metric": None,
-                "player_list": None,
-                "form_filter": None,
-                "query_type": determined_type,
-                "interpretation": f"Comparing {player1} vs {player2}" if (player1 and player2) else (f"Stats for {player1}" if player1 else "Cricket query")
-            }
+            # Fallback: the local parse, whatever its confidence
+            note('parse_source', 'local_fallback (unreadable reply)')
+            return self._parse_locally(query)[0]
     
     def _get_canonical_player_name(self, player_input: str) -> Optional[str]:
         """Get canonical player name using loaded aliases"""
@@ -1010,15 +1332,219 @@ EXAMPLES:
         
         return None
     
-    def get_response(self, query: str) -> str:
+    def get_response(self, query: str, session_id: Optional[str] = None) -> str:
         """
         Main method: Takes user query and returns analytics response
         Supports 10 query types: player_stats, head_to_head, team_comparison, trends, 
         records, rankings, ground_insights, form_guide, comparative_analysis, predictions
+        
+        With a session_id, follow-ups ("and in death overs?") refine that session's previous question.
         """
+        return render_markdown(self.get_answer(query, session_id))
+    
+    async def aget_response(self, query: str, session_id: Optional[str] = None) -> str:
+        """get_response() for async callers: the parse awaits the model, the stats work runs in a thread"""
+        return render_markdown(await self.aget_answer(query, session_id))
+    
+    def get_answer(self, query: str, session_id: Optional[str] = None) -> Answer:
+        """The computed answer to a query, for rendering as markdown, JSON or charts (see renderers)"""
+        with self._request_trace(query):
+            query, key = self._prepare_query(query)
+            if session_id is not None:
+                return self._session_answer(query, key, session_id)
+            with span('response_cache'):
+                hit, answer = self._response_cache.get(key)
+            if hit:
+                return answer
+            
+            answer, shared = self._inflight.do(key, lambda: self._cache_answer(key, self._compute_answer(query)))
+            if shared:
+                note('coalesced', True)
+            return answer
+    
+    async def aget_answer(self, query: str, session_id: Optional[str] = None) -> Answer:
+        answer = None
+        async for event, data in self.astream_answer(query, session_id):
+            if event == 'answer':
+                answer = data
+        return answer
+    
+    async def astream_answer(self, query: str, session_id: Optional[str] = None):
+        """get_answer() for async callers, as (event, data) pairs yielded as each stage completes
+        
+        Yields ('query', spell-corrected query), then ('parsed', parse) unless the answer was
+        cached, then ('answer', Answer). The parse awaits the model; the stats work runs in
+        a thread (see offload).
+        """
+        with self._request_trace(query):
+            query, key = self._prepare_query(query)
+            yield 'query', query
+            
+            context = self.sessions.get(session_id) if session_id is not None else None
+            parsed = self._parse_follow_up(query, context.last_parsed) if context is not None else None
+            follow_up = parsed is not None
+            if follow_up:
+                note('follow_up', True)
+            else:
+                # A session remembers the parse even when the answer is cached
+                if context is not None:
+                    with span('parse'):
+                        parsed = await self.aparse_query(query)
+                with span('response_cache'):
+                    hit, answer = self._response_cache.get(key)
+                if hit:
+                    if context is not None:
+                        context.remember(parsed)
+                        await self.offload(self._fill_session_slices, context, parsed)
+                    yield 'answer', answer
+                    return
+                if context is None:
+                    with span('parse'):
+                        parsed = await self.aparse_query(query)
+            yield 'parsed', parsed
+            
+            if context is not None:
+                answer = await self.offload(self._compute_session_answer, context, query, parsed)
+                yield 'answer', self._finish_session_turn(context, key, parsed, answer, follow_up)
+                return
+            
+            async def compute():
+                return self._cache_answer(key, await self.offload(self._compute_answer, query, parsed))
+            
+            answer, shared = await self._async_inflight.do(key, compute)
+            if shared:
+                note('coalesced', True)
+            yield 'answer', answer
+    
+    def _session_answer(self, query: str, key: Tuple, session_id: str) -> Answer:
+        """Answer within a session: follow-ups reuse its last parse and the delivery slices it already cut"""
+        context = self.sessions.get(session_id)
+        parsed = self._parse_follow_up(query, context.last_parsed)
+        follow_up = parsed is not None
+        if follow_up:
+            note('follow_up', True)
+        else:
+            with span('parse'):
+                parsed = self.parse_query(query)
+            with span('response_cache'):
+                hit, answer = self._response_cache.get(key)
+            if hit:
+                context.remember(parsed)
+                self._fill_session_slices(context, parsed)
+                return answer
+        answer = self._compute_session_answer(context, query, parsed)
+        return self._finish_session_turn(context, key, parsed, answer, follow_up)
+    
+    def _fill_session_slices(self, context, parsed: Dict):
+        """Focus the session on the turn's players and cut their slices if it has none yet"""
+        context.slices.focus([parsed.get('player1'), parsed.get('player2')])
+        self.stats_engine.fill_slices(context.slices)
+    
+    def _compute_session_answer(self, context, query: str, parsed: Dict) -> Answer:
+        """Compute a session turn with its slice store in use
         
+        Stats served from the result cache cut no slices, so the turn's players
+        are sliced afterwards for the follow-ups.
+        """
+        context.slices.focus([parsed.get('player1'), parsed.get('player2')])
+        with use_slices(context.slices):
+            answer = self._compute_answer(query, parsed)
+        self.stats_engine.fill_slices(context.slices)
+        return answer
+    
+    def _finish_session_turn(self, context, key: Tuple, parsed: Dict, answer: Answer, follow_up: bool) -> Answer:
+        """Remember a successfully answered turn; only standalone questions go in the response cache"""
+        if answer.is_error:
+            return answer
+        context.remember(parsed, follow_up)
+        return answer if follow_up else self._cache_answer(key, answer)
+    
+    def end_session(self, session_id: str):
+        """Forget a session's context and slices"""
+        self.sessions.end(session_id)
+    
+    def explain_response(self, query: str, use_cache: bool = True) -> Dict:
+        """Answer a query and report how: parsed intent, resolved entities, applied filters,
+        row counts per step, cache lookups and per-stage timings
+        
+        With use_cache=False the response cache is skipped so every stage runs.
+        """
+        with start_trace(query) as trace:
+            if use_cache:
+                answer = self.get_answer(query)
+            else:
+                query, _ = self._prepare_query(query)
+                answer = self._compute_answer(query)
+        return {'answer': render_markdown(answer), **trace.to_dict()}
+    
+    def latency_stats(self) -> Dict:
+        """Per-stage p50/p95/p99 over recent requests; slow requests' traces are in latency_log.slow_traces"""
+        return self.latency_log.summary()
+    
+    @contextmanager
+    def _request_trace(self, query: str):
+        """Trace a request into the latency log, unless tracing is off or a caller (explain) already traces it"""
+        if not config.TRACE_ENABLED or current_trace() is not None:
+            yield current_trace()
+            return
+        with start_trace(query) as trace:
+            yield trace
+        self.latency_log.record(trace)
+    
+    def _prepare_query(self, query: str) -> Tuple[str, Tuple]:
+        """Spell-corrected query and its response cache key"""
+        with span('spell_correction'):
+            corrected = self._correct_spelling(query)
+        if corrected != query:
+            note('corrected_query', corrected)
+        return corrected, self._response_cache_key(corrected)
+    
+    def _cache_answer(self, key: Tuple, answer: Answer) -> Answer:
+        """Store an answer unless it is an error or a request to rephrase"""
+        if not answer.is_error:
+            self._response_cache.set(key, answer)
+        return answer
+    
+    def after_fork(self):
+        """Reset locks and in-flight state inherited by a forked worker process"""
+        self.stats_engine.after_fork()
+        self._parse_cache.after_fork()
+        self._response_cache.after_fork()
+        self._inflight = SingleFlight()
+        self.sessions = SessionStore(max_sessions=config.SESSION_MAX_ENTRIES, ttl=config.SESSION_TTL,
+                                     max_slices=config.SESSION_MAX_SLICES)
+    
+    def llm_stats(self) -> Dict:
+        """Token usage and latency per task, plus circuit breaker state, of this chatbot's model calls"""
+        if isinstance(self.llm, ResilientBackend):
+            return self.llm.stats()
+        return {'usage': self.llm.usage.summary()}
+    
+    def _response_cache_key(self, query: str) -> Tuple:
+        """Computed answers are cached per normalized query, model and dataset version"""
+        return ('answer', self.model, self.stats_engine.dataset_version, ' '.join(query.lower().split()))
+    
+    def _answer_query(self, query: str, parsed: Optional[Dict] = None) -> str:
+        """The markdown answer to a query, computed without the response cache"""
+        return render_markdown(self._compute_answer(query, parsed))
+    
+    def _compute_answer(self, query: str, parsed: Optional[Dict] = None) -> Answer:
         # Parse the query
-        parsed = self.parse_query(query)
+        if parsed is None:
+            with span('parse'):
+                parsed = self.parse_query(query)
+        if current_trace() is not None:
+            note('parsed', copy.deepcopy(parsed))
+        
+        # The answer span's own time (excluding the stats engine spans inside it) is formatting
+        with span('answer'):
+            return self._route_query(query, parsed)
+    
+    def _route_query(self, query: str, parsed: Dict) -> Answer:
+        """Dispatch a parsed query to the handler for its query type
+        
+        Handlers with structured output return an Answer; the others' markdown is wrapped in one.
+        """
         player1 = parsed.get('player1')
         player2 = parsed.get('player2')
         venue = parsed.get('venue')
@@ -1041,6 +1567,7 @@ EXAMPLES:
         comparison_type = parsed.get('comparison_type')
         ranking_metric = parsed.get('ranking_metric')
         player_list = parsed.get('player_list')
+        team_list = parsed.get('team_list')
         
         # Canonicalize opposition_team using team aliases
         if opposition_team:
@@ -1048,14 +1575,21 @@ EXAMPLES:
         query_type = parsed.get('query_type')
         
         # Validation: Ensure query has cricket-relevant entity
-        has_cricket_entity = player1 or player2 or venue or opposition_team or ranking_metric or record_type or query_type == 'team_stats'
+        has_cricket_entity = player1 or player2 or player_list or team_list or venue or opposition_team or ranking_metric or record_type or query_type in ['team_stats', 'points_table']
         
         if not has_cricket_entity:
-            return f"🏏 I understood you're asking about: {parsed['interpretation']}\n\n**Please ask something specific about IPL cricket:**\n- 'kohli vs bumrah in powerplay'\n- 'kohli's recent form'\n- 'top 10 run scorers'\n- 'bumrah at wankhede'\n- 'how many matches has CSK played'"
+            return Answer.from_markdown(f"🏏 I understood you're asking about: {parsed['interpretation']}\n\n**Please ask something specific about IPL cricket:**\n- 'kohli vs bumrah in powerplay'\n- 'kohli's recent form'\n- 'top 10 run scorers'\n- 'bumrah at wankhede'\n- 'how many matches has CSK played'")
         
         try:
             # Determine query type if not set correctly or set to 'general'
             # IMPORTANT: Check time_period FIRST - it's highly specific
+            if not query_type or query_type == 'general':
+                intent, probability = self.intent_classifier.predict(query)
+                player_count = len([p for p in (player1, player2) if p])
+                if probability >= config.INTENT_MIN_CONFIDENCE and \
+                        self._intent_fits(intent, player_count, bool(opposition_team), parsed):
+                    query_type = intent
+            
             if not query_type or query_type == 'general':
                 if time_period and player1:
                     query_type = 'trends'
@@ -1072,104 +1606,121 @@ EXAMPLES:
                 elif opposition_team:
                     query_type = 'team_comparison'
             
+            note('query_type', query_type)
+            
             # Route to appropriate handler based on query type
             if query_type == 'head_to_head' and player1 and player2:
-                return self._get_head_to_head_response(player1, player2, venue, seasons, 
-                                                        match_phase=match_phase, match_situation=match_situation,
-                                                        bowler_type=bowler_type, opposition_team=opposition_team,
-                                                        vs_conditions=vs_conditions, ground=ground,
-                                                        handedness=handedness, inning=inning, match_type=match_type)
+                return self._head_to_head_answer(player1, player2, venue, seasons, 
+                                                 match_phase=match_phase, match_situation=match_situation,
+                                                 bowler_type=bowler_type, opposition_team=opposition_team,
+                                                 vs_conditions=vs_conditions, ground=ground,
+                                                 handedness=handedness, inning=inning, match_type=match_type)
             
             elif query_type == 'player_stats' and player1:
-                return self._get_player_stats_response(player1, seasons, 
-                                                       match_phase=match_phase, match_situation=match_situation,
-                                                       bowler_type=bowler_type, opposition_team=opposition_team,
-                                                       batter_role=batter_role, vs_conditions=vs_conditions,
-                                                       ground=ground, handedness=handedness, inning=inning, 
-                                                       match_type=match_type)
+                return self._player_stats_answer(player1, seasons, 
+                                                 match_phase=match_phase, match_situation=match_situation,
+                                                 bowler_type=bowler_type, opposition_team=opposition_team,
+                                                 batter_role=batter_role, vs_conditions=vs_conditions,
+                                                 ground=ground, handedness=handedness, inning=inning, 
+                                                 match_type=match_type)
             
             elif query_type == 'trends' and player1:
-                return self._get_trends_response(player1, time_period=time_period, 
-                                                 match_phase=match_phase, match_situation=match_situation,
-                                                 seasons=seasons)
+                return Answer.from_markdown(self._get_trends_response(player1, time_period=time_period,
+                                                                      match_phase=match_phase,
+                                                                      match_situation=match_situation,
+                                                                      seasons=seasons), query_type)
             
             elif query_type == 'records':
-                return self._get_records_response(player=player1, record_type=record_type, 
-                                                  seasons=seasons, match_phase=match_phase)
+                return Answer.from_markdown(self._get_records_response(player=player1, record_type=record_type,
+                                                                       seasons=seasons, match_phase=match_phase),
+                                            query_type)
             
             elif query_type == 'rankings':
-                return self._get_rankings_response(metric=ranking_metric, seasons=seasons,
-                                                   match_phase=match_phase, ground=ground, limit=10)
+                return self._rankings_answer(metric=ranking_metric, seasons=seasons,
+                                             match_phase=match_phase, ground=ground, limit=10)
             
             elif query_type == 'ground_insights' and player1 and ground:
-                return self._get_ground_insights_response(player1, ground)
+                return Answer.from_markdown(self._get_ground_insights_response(player1, ground), query_type)
             
             elif query_type == 'form_guide':
-                return self._get_form_guide_response(player=player1, time_period=time_period)
-            
-            elif query_type == 'comparative_analysis' and (player1 or player_list):
-                return self._get_comparative_analysis_response(player1=player1, player2=player2,
-                                                               player_list=player_list, 
-                                                               comparison_type=comparison_type,
-                                                               match_phase=match_phase)
+                return Answer.from_markdown(self._get_form_guide_response(player=player1, time_period=time_period),
+                                            query_type)
+            
+            elif query_type == 'comparative_analysis' and (player1 or player_list or team_list):
+                return self._comparative_analysis_answer(player1=player1, player2=player2,
+                                                         player_list=player_list, team_list=team_list,
+                                                         comparison_type=comparison_type,
+                                                         match_phase=match_phase, seasons=seasons,
+                                                         match_situation=match_situation,
+                                                         bowler_type=bowler_type, opposition_team=opposition_team,
+                                                         batter_role=batter_role,
+                                                         vs_conditions=vs_conditions, ground=ground,
+                                                         handedness=handedness, inning=inning,
+                                                         match_type=match_type)
             
             elif query_type == 'predictions':
-                return self._get_predictions_response(opposition_team=opposition_team, 
-                                                      match_phase=match_phase)
+                team, opponent = self._selection_sides(query, opposition_team, team_list)
+                return Answer.from_markdown(self._get_predictions_response(team=team, opposition_team=opponent,
+                                                                           match_phase=match_phase), query_type)
             
             elif query_type == 'team_stats':
                 # Handle team stats queries - resolve team name if not already done
                 if opposition_team:
                     # Check if this is a team summary query (team_summary metric)
                     if ranking_metric == 'team_summary':
-                        return self._get_team_summary_response(opposition_team)
+                        return Answer.from_markdown(self._get_team_summary_response(opposition_team), query_type)
                     else:
-                        return self._get_team_stats_response(opposition_team, metric=ranking_metric)
+                        return self._team_stats_answer(opposition_team, metric=ranking_metric,
+                                                       seasons=seasons, match_phase=match_phase)
                 else:
                     # Special handling for "who won ipl YYYY" or "who won ipl season XX" queries
                     import re
                     year_match = re.search(r'who won ipl (\d{4})', query.lower())
                     if year_match:
                         year = int(year_match.group(1))
-                        return self._get_ipl_winner_response(year)
+                        return Answer.from_markdown(self._get_ipl_winner_response(year), query_type)
                     
                     season_match = re.search(r'who won ipl season (\d+)', query.lower())
                     if season_match:
                         season_num = int(season_match.group(1))
                         year = self._season_number_to_year(season_num)
                         if year:
-                            return self._get_ipl_winner_response(year)
+                            return Answer.from_markdown(self._get_ipl_winner_response(year), query_type)
                         else:
-                            return f"❌ Invalid IPL season number. Valid seasons are 1-18 (2008-2025)."
+                            return Answer.failure(f"❌ Invalid IPL season number. Valid seasons are 1-18 (2008-2025).", query_type)
                     
                     # Team metric detected but name not resolved - use GPT to extract team name
                     team_from_query = self._resolve_team_name(query) or self._extract_team_name_with_gpt(query)
                     if team_from_query:
-                        return self._get_team_stats_response(team_from_query, metric=ranking_metric)
+                        return self._team_stats_answer(team_from_query, metric=ranking_metric,
+                                                       seasons=seasons, match_phase=match_phase)
                     else:
-                        return "❌ I detected a team statistics question, but couldn't identify which team. Please specify the team name (e.g., CSK, MI, RCB, KKR, DC, SRH, RR, GT, LSG, PBKS)"
+                        return Answer.failure("❌ I detected a team statistics question, but couldn't identify which team. Please specify the team name (e.g., CSK, MI, RCB, KKR, DC, SRH, RR, GT, LSG, PBKS)", query_type)
+            
+            elif query_type == 'points_table':
+                return self._points_table_answer(seasons[0] if seasons else None)
             
             elif query_type == 'team_comparison' and opposition_team:
-                return self._get_team_stats_response(opposition_team)
+                return self._team_stats_answer(opposition_team, seasons=seasons, match_phase=match_phase)
             
             elif player1:
                 # Default to player stats if we have a player
-                return self._get_player_stats_response(player1, seasons, 
-                                                       match_phase=match_phase, match_situation=match_situation,
-                                                       bowler_type=bowler_type, opposition_team=opposition_team,
-                                                       batter_role=batter_role, vs_conditions=vs_conditions)
+                return self._player_stats_answer(player1, seasons, 
+                                                 match_phase=match_phase, match_situation=match_situation,
+                                                 bowler_type=bowler_type, opposition_team=opposition_team,
+                                                 batter_role=batter_role, vs_conditions=vs_conditions)
             else:
-                return f"I understood you're asking about: {parsed['interpretation']}\n\nPlease ask something like:\n- 'kohli statistics'\n- 'kohli vs bumrah in powerplay'\n- 'kohli's recent form'\n- 'top 10 run scorers in 2024'\n- 'kohli at wankhede'"
+                return Answer.from_markdown(f"I understood you're asking about: {parsed['interpretation']}\n\nPlease ask something like:\n- 'kohli statistics'\n- 'kohli vs bumrah in powerplay'\n- 'kohli's recent form'\n- 'top 10 run scorers in 2024'\n- 'kohli at wankhede'", query_type)
         
         except Exception as e:
-            return f"Error processing query: {str(e)}\n\nPlease try again with a clearer query."
+            return Answer.failure(f"Error processing query: {str(e)}\n\nPlease try again with a clearer query.", query_type)
     
-    def _get_head_to_head_response(self, player1: str, player2: str, venue: Optional[str] = None, 
+    def _head_to_head_answer(self, player1: str, player2: str, venue: Optional[str] = None, 
                                     seasons: List[int] = None, match_phase: Optional[str] = None,
                                     match_situation: Optional[str] = None, bowler_type: Optional[str] = None,
                                     opposition_team: Optional[str] = None, vs_conditions: Optional[str] = None,
                                     ground: Optional[str] = None, handedness: Optional[str] = None,
-                                    inning: Optional[int] = None, match_type: Optional[str] = None) -> str:
+                                    inning: Optional[int] = None, match_type: Optional[str] = None) -> Answer:
         """Get head-to-head comparison between two players with comprehensive filters"""
         
         try:
@@ -1178,7 +1729,7 @@ EXAMPLES:
             found_player2 = self.stats_engine.find_player(player2)
             
             if not found_player1 or not found_player2:
-                return f"Could not find players. Searching for: {player1}, {player2}"
+                return Answer.from_markdown(f"Could not find players. Searching for: {player1}, {player2}", 'head_to_head')
             
             # Build filters dict with all available filters
             filters = {}
@@ -1208,7 +1759,7 @@ EXAMPLES:
                                                                   filters if filters else None)
             
             if h2h_data.get('error'):
-                return f"Could not find head-to-head data between {found_player1} and {found_player2}. They may not have faced each other."
+                return Answer.from_markdown(f"Could not find head-to-head data between {found_player1} and {found_player2}. They may not have faced each other.", 'head_to_head')
             
             # Generate intelligent insights
             insights = []
@@ -1240,7 +1791,9 @@ EXAMPLES:
                     insights.append(f"💪 **Bowler's Strength**: {found_player2} restricts {found_player1} effectively")
             
             # Format main response
-            response = f"**Head-to-Head: {found_player1} vs {found_player2}**\n\n"
+            title = f"Head-to-Head: {found_player1} vs {found_player2}"
+            answer = Answer(query_type='head_to_head', title=title, data=h2h_data)
+            response = f"**{title}**\n\n"
             
             # Filter context
             filters_context = []
@@ -1257,70 +1810,101 @@ EXAMPLES:
             
             if filters_context:
                 response += f"**Filters**: {' • '.join(filters_context)}\n\n"
+            answer.add_text(response)
             
             # H2H Stats Table
-            response += "| Metric | Value |\n|--------|-------|\n"
-            response += f"| Deliveries | {deliveries} |\n"
-            response += f"| Runs | {runs} |\n"
-            response += f"| Strike Rate | {strike_rate:.2f} |\n"
-            response += f"| Dot Balls | {dot_balls} ({dot_percentage:.1f}%) |\n"
-            
+            rows = [['Deliveries', deliveries], ['Runs', runs], ['Strike Rate', strike_rate],
+                    ['Dot Balls', f"{dot_balls} ({dot_percentage:.1f}%)" if deliveries > 0 else dot_balls]]
             if venue:
-                response += f"| Venue | {venue} |\n"
-            
-            response += "\n"
+                rows.append(['Venue', venue])
+            answer.add_table('head_to_head', ['Metric', 'Value'], rows, formats={'Strike Rate': '{:.2f}'})
             
             # Add insights section
+            response = ""
             if insights:
                 response += f"**Key Insights:**\n"
                 for insight in insights:
                     response += f"• {insight}\n"
             
             response += f"\n{h2h_data.get('summary', '')}"
-            
-            return response
+            return answer.add_text(response)
         
         except Exception as e:
-            return f"Error getting head-to-head data: {str(e)}"
+            return Answer.failure(f"Error getting head-to-head data: {str(e)}", 'head_to_head')
     
-    def _get_player_stats_response(self, player: str, seasons: List[int] = None, 
-                                    match_phase: Optional[str] = None, match_situation: Optional[str] = None,
-                                    bowler_type: Optional[str] = None, opposition_team: Optional[str] = None,
-                                    batter_role: Optional[str] = None, vs_conditions: Optional[str] = None,
-                                    ground: Optional[str] = None, handedness: Optional[str] = None,
-                                    inning: Optional[int] = None, match_type: Optional[str] = None) -> str:
+    @staticmethod
+    def _player_filters(seasons: List[int] = None, match_phase: Optional[str] = None,
+                        match_situation: Optional[str] = None, bowler_type: Optional[str] = None,
+                        opposition_team: Optional[str] = None, batter_role: Optional[str] = None,
+                        vs_conditions: Optional[str] = None, ground: Optional[str] = None,
+                        handedness: Optional[str] = None, inning: Optional[int] = None,
+                        match_type: Optional[str] = None) -> Dict:
+        """Stats engine filters for the parsed filter fields that are set"""
+        filters = {}
+        if seasons:
+            filters['seasons'] = seasons
+        if match_phase:
+            filters['match_phase'] = match_phase
+        if match_situation:
+            filters['match_situation'] = match_situation
+        if bowler_type:
+            filters['bowler_type'] = bowler_type
+        if opposition_team:
+            filters['opposition_team'] = opposition_team
+        if batter_role:
+            filters['batter_role'] = batter_role
+        if vs_conditions:
+            filters['vs_conditions'] = vs_conditions
+        if ground:
+            filters['ground'] = ground
+        if handedness:
+            filters['handedness'] = handedness
+        if inning:
+            filters['innings_order'] = inning  # stats_engine uses 'innings_order'
+        if match_type:
+            filters['match_type'] = match_type
+        return filters
+    
+    # Rows of the player profile tables: (label, stats key, default, row template)
+    BATTING_ROWS = (('Matches', 'matches', 0, None), ('Innings', 'innings', 0, None), ('Balls', 'balls', 0, None),
+                    ('Runs', 'runs', 0, None), ('Average', 'average', 0, '{:.2f}'),
+                    ('Strike Rate', 'strike_rate', 0, '{:.2f}'), ('Highest Score', 'highest_score', 0, None),
+                    ('Centuries', 'centuries', 0, None), ('Fifties', 'fifties', 0, None),
+                    ('Fours', 'fours', 0, None), ('Sixes', 'sixes', 0, None))
+    BOWLING_ROWS = (('Matches', 'matches', 0, None), ('Innings', 'innings', 0, None), ('Balls', 'balls', 0, None),
+                    ('Wickets', 'wickets', 0, None), ('Runs Conceded', 'runs_conceded', 0, None),
+                    ('Average', 'average', 0, '{:.2f}'), ('Economy', 'economy', 0, '{:.2f}'),
+                    ('Best Figures', 'best_figures', 'N/A', None), ('Maiden Overs', 'maiden_overs', 0, None))
+    
+    @staticmethod
+    def _metric_table(stats: Dict, row_specs, labels: Optional[List[str]] = None) -> Tuple[List[List], Dict[str, str]]:
+        """Metric/value rows (and their formats) for the given labels of a row spec, in spec order"""
+        rows, formats = [], {}
+        for label, key, default, template in row_specs:
+            if labels is None or label in labels:
+                rows.append([label, stats.get(key, default)])
+                if template:
+                    formats[label] = template
+        return rows, formats
+    
+    def _player_stats_answer(self, player: str, seasons: List[int] = None, 
+                             match_phase: Optional[str] = None, match_situation: Optional[str] = None,
+                             bowler_type: Optional[str] = None, opposition_team: Optional[str] = None,
+                             batter_role: Optional[str] = None, vs_conditions: Optional[str] = None,
+                             ground: Optional[str] = None, handedness: Optional[str] = None,
+                             inning: Optional[int] = None, match_type: Optional[str] = None) -> Answer:
         """Get player statistics with comprehensive filters: phases, situations, grounds, years, handedness, etc."""
         
         try:
             # Find player with fuzzy matching
             found_player = self.stats_engine.find_player(player)
             if not found_player:
-                return f"Player '{player}' not found in IPL dataset. Try searching for similar names."
+                return Answer.from_markdown(f"Player '{player}' not found in IPL dataset. Try searching for similar names.", 'player_stats')
             
-            # Build filters
-            filters = {}
-            if seasons:
-                filters['seasons'] = seasons
-            if match_phase:
-                filters['match_phase'] = match_phase
-            if match_situation:
-                filters['match_situation'] = match_situation
-            if bowler_type:
-                filters['bowler_type'] = bowler_type
-            if opposition_team:
-                filters['opposition_team'] = opposition_team
-            if batter_role:
-                filters['batter_role'] = batter_role
-            if vs_conditions:
-                filters['vs_conditions'] = vs_conditions
-            if ground:
-                filters['ground'] = ground
-            if handedness:
-                filters['handedness'] = handedness
-            if inning:
-                filters['innings_order'] = inning  # stats_engine uses 'innings_order'
-            if match_type:
-                filters['match_type'] = match_type
+            filters = self._player_filters(seasons=seasons, match_phase=match_phase, match_situation=match_situation,
+                                           bowler_type=bowler_type, opposition_team=opposition_team,
+                                           batter_role=batter_role, vs_conditions=vs_conditions, ground=ground,
+                                           handedness=handedness, inning=inning, match_type=match_type)
             
             # Get stats with optional filters
             stats = self.stats_engine.get_player_stats(found_player, filters if filters else None)
@@ -1328,8 +1912,9 @@ EXAMPLES:
             if not stats or 'error' in stats:
                 season_text = f" in {seasons}" if seasons else ""
                 filter_text = f" {match_phase}" if match_phase else ""
-                return f"Player '{found_player}' has no data{season_text}{filter_text} in IPL dataset."
+                return Answer.from_markdown(f"Player '{found_player}' has no data{season_text}{filter_text} in IPL dataset.", 'player_stats')
             
+            answer = Answer(query_type='player_stats', title=f"Player Profile: {found_player}", data=stats)
             response = f"**Player Profile: {found_player}**"
             if seasons:
                 response += f" **({', '.join(str(s) for s in seasons)})**"
@@ -1341,95 +1926,62 @@ EXAMPLES:
                 response += f" - **vs {opposition_team}**"
             if vs_conditions:
                 response += f" - **{vs_conditions.replace('_', ' ').title()}**"
-            response += "\n\n"
+            answer.add_text(response + "\n\n")
             
             if 'batting' in stats and stats['batting']:
                 bat = stats['batting']
                 
                 # Use table format for vs_conditions filters
                 if vs_conditions and vs_conditions in ['vs_spin', 'vs_pace']:
-                    response += f"🏏 **Batting Stats - {vs_conditions.replace('_', ' ').title()}**\n\n"
-                    # Overall stats
-                    response += "**TOTAL**\n"
-                    response += "| Metric | Value |\n|--------|-------|\n"
-                    response += f"| Matches | {bat.get('matches', 0)} |\n"
-                    response += f"| Balls | {bat.get('balls', 0)} |\n"
-                    response += f"| Runs | {bat.get('runs', 0)} |\n"
-                    response += f"| Average | {bat.get('average', 0):.2f} |\n"
-                    response += f"| Strike Rate | {bat.get('strike_rate', 0):.2f} |\n\n"
+                    answer.add_text(f"🏏 **Batting Stats - {vs_conditions.replace('_', ' ').title()}**\n\n")
+                    rows, formats = self._metric_table(bat, self.BATTING_ROWS,
+                                                       ['Matches', 'Balls', 'Runs', 'Average', 'Strike Rate'])
+                    answer.add_table('batting', ['Metric', 'Value'], rows, title='TOTAL', formats=formats)
                     
                     # Get breakdown by sub-types
                     breakdown = self.stats_engine.get_bowling_subtype_breakdown(found_player, vs_conditions, filters)
                     if breakdown:
-                        response += "**BREAKDOWN BY BOWLING TYPE**\n\n"
-                        response += "| Bowling Type | Balls | Runs | Avg | SR |\n|---|---|---|---|---|\n"
-                        for sub_type, sub_stats in breakdown.items():
-                            type_label = sub_type.replace('vs_', '').replace('_', ' ').title()
-                            balls = sub_stats.get('balls', 0)
-                            runs = sub_stats.get('runs', 0)
-                            avg = sub_stats.get('average', 0)
-                            sr = sub_stats.get('strike_rate', 0)
-                            response += f"| {type_label} | {balls} | {runs} | {avg:.2f} | {sr:.1f} |\n"
-                    response += "\n"
+                        answer.data['bowling_type_breakdown'] = breakdown
+                        rows = [[sub_type.replace('vs_', '').replace('_', ' ').title(), sub_stats.get('balls', 0),
+                                 sub_stats.get('runs', 0), sub_stats.get('average', 0), sub_stats.get('strike_rate', 0)]
+                                for sub_type, sub_stats in breakdown.items()]
+                        answer.add_table('bowling_type_breakdown', ['Bowling Type', 'Balls', 'Runs', 'Avg', 'SR'], rows,
+                                         title='BREAKDOWN BY BOWLING TYPE', formats={'Avg': '{:.2f}', 'SR': '{:.1f}'},
+                                         chart=True)
                 elif vs_conditions:
-                    response += f"🏏 **Batting Stats - {vs_conditions.replace('_', ' ').title()}**\n\n"
-                    response += "| Metric | Value |\n|--------|-------|\n"
-                    response += f"| Matches | {bat.get('matches', 0)} |\n"
-                    response += f"| Balls | {bat.get('balls', 0)} |\n"
-                    response += f"| Runs | {bat.get('runs', 0)} |\n"
-                    response += f"| Average | {bat.get('average', 0):.2f} |\n"
-                    response += f"| Strike Rate | {bat.get('strike_rate', 0):.2f} |\n"
-                    response += f"| Hundreds | {bat.get('centuries', 0)} |\n"
-                    response += f"| Fifties | {bat.get('fifties', 0)} |\n"
-                    response += f"| Fours | {bat.get('fours', 0)} |\n"
-                    response += f"| Sixes | {bat.get('sixes', 0)} |\n\n"
+                    answer.add_text(f"🏏 **Batting Stats - {vs_conditions.replace('_', ' ').title()}**\n\n")
+                    rows, formats = self._metric_table(bat, self.BATTING_ROWS,
+                                                       ['Matches', 'Balls', 'Runs', 'Average', 'Strike Rate',
+                                                        'Centuries', 'Fifties', 'Fours', 'Sixes'])
+                    rows[5][0] = 'Hundreds'
+                    answer.add_table('batting', ['Metric', 'Value'], rows, formats=formats)
                 else:
-                    response += f"🏏 **Batting Stats**\n\n"
-                    response += "| Metric | Value |\n|--------|-------|\n"
-                    response += f"| Matches | {bat.get('matches', 0)} |\n"
-                    response += f"| Innings | {bat.get('innings', 0)} |\n"
-                    response += f"| Balls | {bat.get('balls', 0)} |\n"
-                    response += f"| Runs | {bat.get('runs', 0)} |\n"
-                    response += f"| Average | {bat.get('average', 0):.2f} |\n"
-                    response += f"| Strike Rate | {bat.get('strike_rate', 0):.2f} |\n"
-                    response += f"| Highest Score | {bat.get('highest_score', 0)} |\n"
-                    response += f"| Centuries | {bat.get('centuries', 0)} |\n"
-                    response += f"| Fifties | {bat.get('fifties', 0)} |\n"
-                    response += f"| Fours | {bat.get('fours', 0)} |\n"
-                    response += f"| Sixes | {bat.get('sixes', 0)} |\n\n"
+                    rows, formats = self._metric_table(bat, self.BATTING_ROWS)
+                    answer.add_table('batting', ['Metric', 'Value'], rows, title='Batting Stats', icon='🏏',
+                                     formats=formats)
             
             if 'bowling' in stats and stats['bowling']:
-                bowl = stats['bowling']
-                response += f"🎳 **Bowling Stats**\n\n"
-                response += "| Metric | Value |\n|--------|-------|\n"
-                response += f"| Matches | {bowl.get('matches', 0)} |\n"
-                response += f"| Innings | {bowl.get('innings', 0)} |\n"
-                response += f"| Balls | {bowl.get('balls', 0)} |\n"
-                response += f"| Wickets | {bowl.get('wickets', 0)} |\n"
-                response += f"| Runs Conceded | {bowl.get('runs_conceded', 0)} |\n"
-                response += f"| Average | {bowl.get('average', 0):.2f} |\n"
-                response += f"| Economy | {bowl.get('economy', 0):.2f} |\n"
-                response += f"| Best Figures | {bowl.get('best_figures', 'N/A')} |\n"
-                response += f"| Maiden Overs | {bowl.get('maiden_overs', 0)} |\n\n"
+                rows, formats = self._metric_table(stats['bowling'], self.BOWLING_ROWS)
+                answer.add_table('bowling', ['Metric', 'Value'], rows, title='Bowling Stats', icon='🎳',
+                                 formats=formats)
                 
                 # Only show bowling breakdown by batter handedness if explicitly asked
                 if filters.get('handedness'):
                     breakdown = self.stats_engine.get_bowling_handedness_breakdown(found_player, filters)
                     if breakdown and len(breakdown) > 0:
-                        response += "**BREAKDOWN BY BATTER HANDEDNESS**\n\n"
-                        response += "| Batter Type | Balls | Wickets | Runs | Economy |\n|---|---|---|---|---|\n"
-                        for hand_type, hand_stats in breakdown.items():
-                            hand_label = hand_type.replace('vs_', '').replace('_', ' ').title()
-                            balls = hand_stats.get('balls', 0)
-                            wickets = hand_stats.get('wickets', 0)
-                            runs = hand_stats.get('runs_conceded', 0)
-                            economy = hand_stats.get('economy', 0)
-                            response += f"| {hand_label} | {balls} | {wickets} | {runs} | {economy:.2f} |\n"
+                        answer.data['handedness_breakdown'] = breakdown
+                        rows = [[hand_type.replace('vs_', '').replace('_', ' ').title(), hand_stats.get('balls', 0),
+                                 hand_stats.get('wickets', 0), hand_stats.get('runs_conceded', 0),
+                                 hand_stats.get('economy', 0)]
+                                for hand_type, hand_stats in breakdown.items()]
+                        answer.add_table('handedness_breakdown', ['Batter Type', 'Balls', 'Wickets', 'Runs', 'Economy'],
+                                         rows, title='BREAKDOWN BY BATTER HANDEDNESS', formats={'Economy': '{:.2f}'},
+                                         chart=True)
             
-            return response
+            return answer
         
         except Exception as e:
-            return f"Error getting player stats: {str(e)}"
+            return Answer.failure(f"Error getting player stats: {str(e)}", 'player_stats')
     
     def _get_player_primary_skill(self, player: str) -> str:
         """Determine if player is primarily a batter, bowler, or all-rounder"""
@@ -1801,17 +2353,13 @@ EXAMPLES:
                 rankings = self.stats_engine.get_league_rankings(metric='wickets', seasons=seasons, limit=10)
                 record_display = "Most Wickets"
             elif record_type == 'highest_team_score':
-                # Highest team total - group deliveries by match and batting team to calculate runs
-                team_runs = self.stats_engine.deliveries_df.groupby(['match_id', 'batting_team'])['total_runs'].sum().reset_index()
-                team_runs.columns = ['match_id', 'team', 'runs']
-                
-                # Get top 10 team performances
-                top_team_scores = team_runs.nlargest(10, 'runs')
+                # Highest team total from the precomputed team-innings table
+                top_team_scores = self.stats_engine.team_tables.highest_totals(10, seasons=seasons)
                 
                 rankings = []
                 for _, row in top_team_scores.iterrows():
                     rankings.append({
-                        'player': row['team'],
+                        'player': row['batting_team'],
                         'value': int(row['runs']),
                         'metric': 'Highest Team Score'
                     })
@@ -1884,9 +2432,9 @@ EXAMPLES:
         except Exception as e:
             return f"Error retrieving overall records: {str(e)}"
     
-    def _get_rankings_response(self, metric: Optional[str] = None, seasons: Optional[List[int]] = None,
-                               match_phase: Optional[str] = None, ground: Optional[str] = None,
-                               limit: int = 10) -> str:
+    def _rankings_answer(self, metric: Optional[str] = None, seasons: Optional[List[int]] = None,
+                         match_phase: Optional[str] = None, ground: Optional[str] = None,
+                         limit: int = 10) -> Answer:
         """Get rankings of players by various metrics"""
         try:
             if not metric:
@@ -1904,30 +2452,25 @@ EXAMPLES:
             )
             
             if not rankings:
-                return f"No ranking data available for metric: {metric}"
+                return Answer.from_markdown(f"No ranking data available for metric: {metric}", 'rankings')
             
             metric_display = rankings[0]['metric'] if rankings else metric.replace('_', ' ').title()
-            response = f"🏅 **IPL Rankings - Top {limit} by {metric_display}**\n\n"
-            response += "| Rank | Player | Value |\n|------|--------|-------|\n"
-            
-            for i, ranking in enumerate(rankings, 1):
-                value = ranking['value']
-                if isinstance(value, float):
-                    response += f"| {i} | {ranking['player']} | {value:.2f} |\n"
-                else:
-                    response += f"| {i} | {ranking['player']} | {value} |\n"
+            title = f"IPL Rankings - Top {limit} by {metric_display}"
+            answer = Answer(query_type='rankings', title=title, data={'metric': metric, 'rankings': rankings})
+            rows = [[i, ranking['player'], ranking['value']] for i, ranking in enumerate(rankings, 1)]
+            answer.add_table('rankings', ['Rank', 'Player', 'Value'], rows, title=title, icon='🏅',
+                             chart=True, label='Player')
             
-            response += f"\n📊 *Ranking metric: {metric_display}"
+            response = f"📊 *Ranking metric: {metric_display}"
             if seasons:
                 response += f" | Seasons: {', '.join(map(str, seasons))}"
             if match_phase:
                 response += f" | Phase: {match_phase.replace('_', ' ').title()}"
             response += "*"
-            
-            return response
+            return answer.add_text(response)
         
         except Exception as e:
-            return f"Error retrieving rankings: {str(e)}"
+            return Answer.failure(f"Error retrieving rankings: {str(e)}", 'rankings')
     
     def _get_ground_insights_response(self, player: str, ground: str) -> str:
         """Get performance insights for a player at a specific ground"""
@@ -2066,94 +2609,135 @@ EXAMPLES:
         except Exception as e:
             return f"Error analyzing form: {str(e)}"
     
-    def _get_comparative_analysis_response(self, player1: Optional[str] = None, player2: Optional[str] = None,
-                                          player_list: Optional[List[str]] = None,
-                                          comparison_type: Optional[str] = None,
-                                          match_phase: Optional[str] = None) -> str:
-        """Compare multiple players or player vs league average"""
+    def _comparative_analysis_answer(self, player1: Optional[str] = None, player2: Optional[str] = None,
+                                     player_list: Optional[List[str]] = None,
+                                     team_list: Optional[List[str]] = None,
+                                     comparison_type: Optional[str] = None,
+                                     match_phase: Optional[str] = None, seasons: List[int] = None,
+                                     match_situation: Optional[str] = None, bowler_type: Optional[str] = None,
+                                     opposition_team: Optional[str] = None, batter_role: Optional[str] = None,
+                                     vs_conditions: Optional[str] = None, ground: Optional[str] = None,
+                                     handedness: Optional[str] = None, inning: Optional[int] = None,
+                                     match_type: Optional[str] = None) -> Answer:
+        """Compare multiple players or teams; all of them are computed in one batched pass"""
         try:
-            if not player1 and not player_list:
-                return "Please specify players to compare (e.g., 'kohli vs sharma' or 'top batters')."
+            if not player1 and not player_list and not team_list:
+                return Answer.from_markdown("Please specify players to compare (e.g., 'kohli vs sharma' or 'top batters').", 'comparative_analysis')
+            
+            filters = self._player_filters(seasons=seasons, match_phase=match_phase, match_situation=match_situation,
+                                           bowler_type=bowler_type, opposition_team=opposition_team,
+                                           batter_role=batter_role, vs_conditions=vs_conditions, ground=ground,
+                                           handedness=handedness, inning=inning, match_type=match_type)
+            filter_text = ""
+            if seasons:
+                filter_text += f" ({', '.join(str(s) for s in seasons)})"
+            if match_phase:
+                filter_text += f" - {match_phase.replace('_', ' ').title()}"
+            if match_situation:
+                filter_text += f" - {match_situation.replace('_', ' ').title()}"
+            if vs_conditions:
+                filter_text += f" - {vs_conditions.replace('_', ' ').title()}"
+            if handedness:
+                filter_text += f" - vs {handedness.replace('_', ' ').title()}"
+            if ground:
+                filter_text += f" - at {ground}"
             
             response = f"⚖️ **Comparative Analysis**\n\n"
             
-            if player1 and player2:
-                p1 = self.stats_engine.find_player(player1)
-                p2 = self.stats_engine.find_player(player2)
+            if team_list:
+                role = 'bowling' if comparison_type == 'bowling' else 'batting'
+                team_stats = self.stats_engine.get_teams_stats_batch(team_list, filters, role=role)
+                if not team_stats:
+                    return Answer.from_markdown("No teams found for comparison.", 'comparative_analysis')
+                
+                title = f"Comparing {len(team_stats)} Teams - {role.title()}{filter_text}"
+                answer = Answer(query_type='comparative_analysis', title=title, data={'teams': team_stats})
+                answer.add_text(response + f"**{title}**\n\n")
+                rate = 'Economy' if role == 'bowling' else 'Run Rate'
+                rows = [[team, stats['innings'], stats['runs'], stats['wickets'],
+                         stats['economy' if role == 'bowling' else 'run_rate'], stats['runs_per_innings']]
+                        for team, stats in team_stats.items()]
+                return answer.add_table('teams', ['Team', 'Innings', 'Runs', 'Wickets', rate, 'Runs/Inns'], rows,
+                                        formats={rate: '{:.2f}', 'Runs/Inns': '{:.2f}'}, chart=True)
+            
+            names = player_list or [player1, player2]
+            players_stats = self.stats_engine.get_players_stats_batch([p for p in names if p], filters or None)
+            
+            if player1 and player2 and not player_list:
+                if len(players_stats) < 2:
+                    return Answer.from_markdown("One or both players not found.", 'comparative_analysis')
                 
-                if not p1 or not p2:
-                    return "One or both players not found."
+                (p1, stats1), (p2, stats2) = players_stats.items()
+                answer = Answer(query_type='comparative_analysis', title=f"{p1} vs {p2}{filter_text}",
+                                data={'players': players_stats})
+                answer.add_text(response + f"**{p1} vs {p2}**{filter_text}\n\n")
                 
-                # Get full stats for both players
-                stats1 = self.stats_engine.get_player_stats(p1)
-                stats2 = self.stats_engine.get_player_stats(p2)
+                def advantage(value1, value2, lower_is_better: bool = False) -> str:
+                    if value1 == value2:
+                        return "Equal"
+                    return p1 if (value1 > value2) != lower_is_better else p2
                 
-                response += f"**{p1} vs {p2}**\n\n"
-                response += "| Metric | " + p1 + " | " + p2 + " | Advantage |\n"
-                response += "|--------|--------|--------|----------|\n"
+                rows = []
                 
                 # Batting comparison
                 bat1 = stats1.get('batting', {})
                 bat2 = stats2.get('batting', {})
                 
                 if bat1.get('runs', 0) > 0 or bat2.get('runs', 0) > 0:
-                    response += f"| Runs | {bat1.get('runs', 0)} | {bat2.get('runs', 0)} | "
-                    response += (p1 if bat1.get('runs', 0) > bat2.get('runs', 0) else (p2 if bat2.get('runs', 0) > bat1.get('runs', 0) else "Equal")) + " |\n"
-                    
-                    avg1 = bat1.get('average', 0)
-                    avg2 = bat2.get('average', 0)
-                    response += f"| Batting Average | {avg1:.2f} | {avg2:.2f} | "
-                    response += (p1 if avg1 > avg2 else (p2 if avg2 > avg1 else "Equal")) + " |\n"
-                    
-                    sr1 = bat1.get('strike_rate', 0)
-                    sr2 = bat2.get('strike_rate', 0)
-                    response += f"| Strike Rate | {sr1:.2f} | {sr2:.2f} | "
-                    response += (p1 if sr1 > sr2 else (p2 if sr2 > sr1 else "Equal")) + " |\n"
+                    for label, key in (('Runs', 'runs'), ('Batting Average', 'average'), ('Strike Rate', 'strike_rate')):
+                        value1, value2 = bat1.get(key, 0), bat2.get(key, 0)
+                        rows.append([label, value1, value2, advantage(value1, value2)])
                 
                 # Bowling comparison
                 bowl1 = stats1.get('bowling', {})
                 bowl2 = stats2.get('bowling', {})
                 
                 if bowl1.get('wickets', 0) > 0 or bowl2.get('wickets', 0) > 0:
-                    response += f"| Wickets | {bowl1.get('wickets', 0)} | {bowl2.get('wickets', 0)} | "
-                    response += (p1 if bowl1.get('wickets', 0) > bowl2.get('wickets', 0) else (p2 if bowl2.get('wickets', 0) > bowl1.get('wickets', 0) else "Equal")) + " |\n"
-                    
-                    econ1 = bowl1.get('economy', 0)
-                    econ2 = bowl2.get('economy', 0)
-                    response += f"| Economy | {econ1:.2f} | {econ2:.2f} | "
-                    response += (p2 if econ1 > econ2 else (p1 if econ2 > econ1 else "Equal")) + " |\n"  # Lower economy is better
+                    wickets1, wickets2 = bowl1.get('wickets', 0), bowl2.get('wickets', 0)
+                    rows.append(['Wickets', wickets1, wickets2, advantage(wickets1, wickets2)])
+                    econ1, econ2 = bowl1.get('economy', 0), bowl2.get('economy', 0)
+                    rows.append(['Economy', econ1, econ2, advantage(econ1, econ2, lower_is_better=True)])
                 
-                response += "\n**Summary**: Direct comparison of career statistics between players.\n"
-            
-            elif player_list and len(player_list) > 0:
-                # Compare multiple players
-                players = [self.stats_engine.find_player(p) for p in player_list if self.stats_engine.find_player(p)]
-                
-                if not players:
-                    return "No players found for comparison."
-                
-                response += f"**Comparing {len(players)} Players**\n\n"
-                response += "| Player | Runs | Wickets | Strike Rate | Economy |\n"
-                response += "|--------|------|---------|-------------|----------|\n"
-                
-                for player in players:
-                    stats = self.stats_engine.get_player_stats(player)
-                    bat = stats.get('batting', {})
-                    bowl = stats.get('bowling', {})
-                    
-                    runs = bat.get('runs', 0)
-                    wickets = bowl.get('wickets', 0)
-                    sr = bat.get('strike_rate', 0)
-                    econ = bowl.get('economy', 0)
-                    
-                    response += f"| {player} | {runs} | {wickets} | {sr:.2f} | {econ:.2f} |\n"
-            
-            return response
+                formats = {label: '{:.2f}' for label in ('Batting Average', 'Strike Rate', 'Economy')}
+                answer.add_table('players', ['Metric', p1, p2, 'Advantage'], rows, formats=formats, chart=True)
+                return answer.add_text(f"**Summary**: Direct comparison of {'filtered' if filters else 'career'} statistics between players.\n")
+            
+            # Compare multiple players
+            if not players_stats:
+                return Answer.from_markdown("No players found for comparison.", 'comparative_analysis')
+            
+            title = f"Comparing {len(players_stats)} Players{filter_text}"
+            answer = Answer(query_type='comparative_analysis', title=title, data={'players': players_stats})
+            answer.add_text(response + f"**Comparing {len(players_stats)} Players**{filter_text}\n\n")
+            rows = [[player, stats.get('batting', {}).get('runs', 0), stats.get('bowling', {}).get('wickets', 0),
+                     stats.get('batting', {}).get('strike_rate', 0), stats.get('bowling', {}).get('economy', 0)]
+                    for player, stats in players_stats.items()]
+            return answer.add_table('players', ['Player', 'Runs', 'Wickets', 'Strike Rate', 'Economy'], rows,
+                                    formats={'Strike Rate': '{:.2f}', 'Economy': '{:.2f}'}, chart=True)
         
         except Exception as e:
-            return f"Error in comparative analysis: {str(e)}"
+            return Answer.failure(f"Error in comparative analysis: {str(e)}", 'comparative_analysis')
+    
+    # Words that make the team named in a selection query the opponent ("best bowlers against MI")
+    SELECTION_OPPOSITION_WORDS = re.compile(r'\b(?:against|vs|versus|v|facing)\b')
+    
+    def _selection_sides(self, query: str, named_team: Optional[str],
+                         team_list: Optional[List[str]] = None) -> Tuple[Optional[str], Optional[str]]:
+        """(team to pick players from, opponent) for a selection query
+        
+        Two teams are read as "for the first, against the second". A single team is the
+        opponent only when the query says so ("against CSK"); "who should bat for CSK"
+        picks from CSK's own players.
+        """
+        teams = [self._get_canonical_team_name(team) or team for team in (team_list or [])]
+        if len(teams) >= 2:
+            return teams[0], teams[1]
+        named_team = named_team or (teams[0] if teams else None)
+        if named_team and self.SELECTION_OPPOSITION_WORDS.search(query.lower()):
+            return None, named_team
+        return named_team, None
     
-    def _get_predictions_response(self, opposition_team: Optional[str] = None,
+    def _get_predictions_response(self, team: Optional[str] = None, opposition_team: Optional[str] = None,
                                  match_phase: Optional[str] = None) -> str:
         """Provide data-driven recommendations and predictions"""
         try:
@@ -2165,20 +2749,30 @@ EXAMPLES:
             else:
                 phase_display = "All Phases"
             
-            # Get top run scorers
-            top_batters = self.stats_engine.get_league_rankings(metric='runs', limit=5)
+            own_team = self._normalize_team_name(team) if team else None
+            opposition = self._normalize_team_name(opposition_team) if opposition_team else None
+            for_text = f" for {own_team}" if own_team else ""
+            vs_text = f" vs {opposition}" if opposition else ""
+            
+            # Score the candidates (the named team's players, or every active player) against
+            # the opposition's likely attack in this phase when an opponent is named
+            top_batters = self.stats_engine.recommender.recommend_batters(opposition, match_phase, team=own_team, k=5)
             if top_batters:
-                response += f"📈 **Top Scorers (for {phase_display})**\n\n"
+                response += f"📈 **Recommended Batters{for_text}{vs_text} ({phase_display})**\n\n"
+                response += "| Rank | Player | Exp. SR | Balls/Dismissal | Phase Balls |\n|---|---|---|---|---|\n"
                 for i, batter in enumerate(top_batters, 1):
-                    response += f"{i}. **{batter['player']}** - {batter['value']} runs\n"
+                    bpd = batter['balls_per_dismissal'] if batter['balls_per_dismissal'] else '—'
+                    response += f"| {i} | **{batter['player']}** | {batter['strike_rate']:.1f} | {bpd} | {batter['phase_balls']} |\n"
                 response += "\n"
             
-            # Get top bowlers
-            top_bowlers = self.stats_engine.get_league_rankings(metric='wickets', limit=5)
+            # Score every active bowler against the opposition's likely batting line-up
+            top_bowlers = self.stats_engine.recommender.recommend_bowlers(opposition, match_phase, team=own_team, k=5)
             if top_bowlers:
-                response += f"🎳 **Top Bowlers (for {phase_display})**\n\n"
+                response += f"🎳 **Recommended Bowlers{for_text}{vs_text} ({phase_display})**\n\n"
+                response += "| Rank | Player | Exp. Economy | Balls/Wicket | Phase Balls |\n|---|---|---|---|---|\n"
                 for i, bowler in enumerate(top_bowlers, 1):
-                    response += f"{i}. **{bowler['player']}** - {bowler['value']} wickets\n"
+                    bpd = bowler['balls_per_dismissal'] if bowler['balls_per_dismissal'] else '—'
+                    response += f"| {i} | **{bowler['player']}** | {bowler['economy']:.2f} | {bpd} | {bowler['phase_balls']} |\n"
                 response += "\n"
             
             # Strategic recommendations
@@ -2198,7 +2792,12 @@ EXAMPLES:
                 response += "| Bowling | Control & Variation | Vary pace and spin - contain opposition |\n"
                 response += "| Strategy | Flexible Approach | Adapt to match situation |\n"
             
-            response += "\n📊 **Data-Driven Insight**: Recommendations based on IPL historical analysis and statistical trends."
+            if opposition:
+                response += f"\n📊 **Data-Driven Insight**: Players ranked on head-to-head matchups against the most recent {opposition} attack and line-up, blended with their overall {phase_display.lower()} record."
+            elif own_team:
+                response += f"\n📊 **Data-Driven Insight**: {own_team} players from the latest season, ranked on their overall {phase_display.lower()} record."
+            else:
+                response += "\n📊 **Data-Driven Insight**: Recommendations based on IPL historical analysis and statistical trends."
             
             return response
         
@@ -2235,22 +2834,11 @@ EXAMPLES:
             response += f"- **Losses**: {losses}\n"
             response += f"- **Win Percentage**: {win_pct:.2f}%\n\n"
             
-            # Get IPL titles - count championship wins (final match of each season)
-            ipl_titles = 0
-            all_seasons = self.matches_df['season'].unique()
-            championship_years = []
-            
-            for season in all_seasons:
-                season_matches = self.matches_df[self.matches_df['season'] == season]
-                if len(season_matches) > 0:
-                    # Get the last match of the season (highest match date for finals)
-                    season_matches_copy = season_matches.copy()
-                    season_matches_copy['date'] = pd.to_datetime(season_matches_copy['date'])
-                    final_match = season_matches_copy.loc[season_matches_copy['date'].idxmax()]
-                    # Check if our team won this final match
-                    if final_match['winner'] == found_team:
-                        ipl_titles += 1
-                        championship_years.append(season)
+            tables = self.stats_engine.team_tables
+            
+            # IPL titles from the per-season champions table
+            championship_years = tables.get_titles(found_team)
+            ipl_titles = len(championship_years)
             
             response += f"**🏅 IPL Championships**\n"
             response += f"- **Total Titles Won**: {ipl_titles}\n"
@@ -2259,38 +2847,21 @@ EXAMPLES:
             else:
                 response += "\n"
             
-            # Get win/loss trends by season
-            team_matches = self.matches_df[
-                (self.matches_df['team1'] == found_team) | (self.matches_df['team2'] == found_team)
-            ]
-            
             # Season performance
-            season_stats = []
-            for season in sorted(self.matches_df['season'].unique()):
-                season_matches = team_matches[team_matches['season'] == season]
-                if len(season_matches) > 0:
-                    season_wins = len(season_matches[season_matches['winner'] == found_team])
-                    season_matches_count = len(season_matches)
-                    season_stats.append({
-                        'season': season,
-                        'matches': season_matches_count,
-                        'wins': season_wins,
-                        'win_pct': (season_wins / season_matches_count * 100) if season_matches_count > 0 else 0
-                    })
+            team_seasons = tables.get_team_seasons(found_team)
+            season_stats = [{
+                'season': row['season'],
+                'matches': int(row['matches']),
+                'wins': int(row['wins']),
+                'win_pct': float(row['win_percentage'])
+            } for _, row in team_seasons.iterrows()]
             
             # Ranking comparison
-            all_teams = self.all_teams
-            team_stats_list = []
-            for team_name in all_teams:
-                t_stats = self.stats_engine.get_team_stats(team_name)
-                if t_stats and 'error' not in t_stats:
-                    team_stats_list.append(t_stats)
-            
-            team_stats_list.sort(key=lambda x: x.get('win_percentage', 0), reverse=True)
-            rank = next((i+1 for i, t in enumerate(team_stats_list) if t['team'] == found_team), 0)
+            overall = tables.get_team_overall(found_team)
+            rank = int(overall['rank']) if overall else 0
             
             response += f"**📈 Rankings & Position**\n"
-            response += f"- **Overall Rank**: #{rank} out of {len(team_stats_list)} teams (by Win %)\n\n"
+            response += f"- **Overall Rank**: #{rank} out of {len(tables.team_overall)} teams (by Win %)\n\n"
             
             # Recent performance
             if len(season_stats) > 0:
@@ -2306,15 +2877,12 @@ EXAMPLES:
                 response += "\n"
             
             # Home vs Away performance
-            home_matches = team_matches[team_matches['team1'] == found_team]
-            away_matches = team_matches[team_matches['team2'] == found_team]
-            
-            if len(home_matches) > 0 or len(away_matches) > 0:
-                home_wins = len(home_matches[home_matches['winner'] == found_team])
-                home_total = len(home_matches)
-                away_wins = len(away_matches[away_matches['winner'] == found_team])
-                away_total = len(away_matches)
-                
+            home_total = int(team_seasons['home_matches'].sum())
+            home_wins = int(team_seasons['home_wins'].sum())
+            away_total = int(team_seasons['matches'].sum()) - home_total
+            away_wins = int(team_seasons['wins'].sum()) - home_wins
+            
+            if home_total > 0 or away_total > 0:
                 response += f"**🏟️ Home vs Away**\n"
                 if home_total > 0:
                     response += f"- **Home**: {home_wins}/{home_total} wins ({home_wins/home_total*100:.1f}%)\n"
@@ -2333,49 +2901,39 @@ EXAMPLES:
         except Exception as e:
             return f"❌ Error getting team summary: {str(e)}"
     
-    def _get_team_stats_response(self, team: str, metric: str = None) -> str:
+    def _team_stats_answer(self, team: str, metric: str = None, seasons: Optional[List[int]] = None,
+                           match_phase: Optional[str] = None) -> Answer:
         """Get comprehensive team statistics"""
         
         try:
             # Handle "best_team" queries (comparing all teams)
             if metric == 'best_team':
-                # Get stats for all teams and rank them
-                all_teams = self.all_teams
-                team_stats_list = []
-                
-                for team_name in all_teams:
-                    stats = self.stats_engine.get_team_stats(team_name)
-                    if stats and 'error' not in stats:
-                        team_stats_list.append(stats)
-                
-                # Sort by win percentage
-                team_stats_list.sort(key=lambda x: x.get('win_percentage', 0), reverse=True)
-                
-                response = "**🏆 IPL Team Rankings (by Win Percentage)**\n\n"
-                response += "| Rank | Team | Matches | Wins | Losses | Win % |\n"
-                response += "|------|------|---------|------|--------|-------|\n"
+                # All-time team table, already sorted by win percentage
+                team_stats_list = self.stats_engine.team_tables.team_overall.to_dict('records')
                 
+                title = "IPL Team Rankings (by Win Percentage)"
+                answer = Answer(query_type='team_stats', title=title, data={'teams': team_stats_list[:5]})
+                rows = []
                 for i, stats in enumerate(team_stats_list[:5], 1):
                     wins = stats.get('wins', 0)
                     matches = stats.get('matches', 0)
-                    losses = matches - wins
-                    win_pct = stats.get('win_percentage', 0)
                     # Normalize team name for display
-                    normalized_team = self._normalize_team_name(stats['team'])
-                    response += f"| {i} | **{normalized_team}** | {matches} | {wins} | {losses} | {win_pct:.1f}% |\n"
-                
-                response += "\n📊 **Top Performer**: " + team_stats_list[0]['team'] + f" with {team_stats_list[0]['win_percentage']:.1f}% win rate"
-                return response
+                    rows.append([i, self._normalize_team_name(stats['team']), matches, wins, matches - wins,
+                                 stats.get('win_percentage', 0)])
+                answer.add_table('team_rankings', ['Rank', 'Team', 'Matches', 'Wins', 'Losses', 'Win %'], rows,
+                                 title=f"🏆 {title}", formats={'Team': '**{}**', 'Win %': '{:.1f}%'},
+                                 chart=True, label='Team')
+                return answer.add_text("📊 **Top Performer**: " + team_stats_list[0]['team'] + f" with {team_stats_list[0]['win_percentage']:.1f}% win rate")
             
             # Find team with fuzzy matching
             found_team = self.stats_engine.find_team(team)
             if not found_team:
-                return f"❌ Team '{team}' not found in IPL dataset."
+                return Answer.failure(f"❌ Team '{team}' not found in IPL dataset.", 'team_stats')
             
-            stats = self.stats_engine.get_team_stats(found_team)
+            stats = self.stats_engine.get_team_stats(found_team, {'seasons': seasons} if seasons else None)
             
             if not stats or 'error' in stats:
-                return f"❌ Team '{found_team}' not found in IPL dataset."
+                return Answer.failure(f"❌ Team '{found_team}' not found in IPL dataset.", 'team_stats')
             
             wins = stats.get('wins', 0)
             matches = stats.get('matches', 0)
@@ -2384,7 +2942,11 @@ EXAMPLES:
             
             # Normalize team name for display
             display_team = self._normalize_team_name(found_team)
-            response = f"**🏏 Team Statistics: {display_team}**\n\n"
+            answer = Answer(query_type='team_stats', title=f"Team Statistics: {display_team}", data=dict(stats))
+            response = f"**🏏 Team Statistics: {display_team}**"
+            if seasons:
+                response += f" ({', '.join(map(str, seasons))})"
+            response += "\n\n"
             
             # Core statistics
             response += f"**📈 Overall Performance**\n"
@@ -2393,48 +2955,40 @@ EXAMPLES:
             response += f"- Total Losses: **{losses}**\n"
             response += f"- Win Percentage: **{win_pct:.2f}%**\n\n"
             
-            # Get IPL titles - count championship wins (final match of each season)
-            # Find the final match of each season (last match ID for that season)
-            ipl_titles = 0
-            all_seasons = self.matches_df['season'].unique()
-            
-            for season in all_seasons:
-                season_matches = self.matches_df[self.matches_df['season'] == season]
-                if len(season_matches) > 0:
-                    # Get the last match of the season (highest match ID)
-                    final_match = season_matches.loc[season_matches['id'].idxmax()]
-                    # Check if our team won this final match
-                    if final_match['winner'] == found_team:
-                        ipl_titles += 1
+            tables = self.stats_engine.team_tables
+            ipl_titles = len(tables.get_titles(found_team))
             
             response += f"**🏆 IPL Titles**\n"
             response += f"- IPL Championships Won: **{ipl_titles}**\n\n"
             
-            # Get win/loss trends by season
-            final_matches = self.matches_df[
-                (self.matches_df['team1'] == found_team) | (self.matches_df['team2'] == found_team)
-            ]
-            season_stats = final_matches.groupby('season').apply(
-                lambda x: {
-                    'season': x['season'].iloc[0],
-                    'matches': len(x),
-                    'wins': len(x[x['winner'] == found_team])
-                }
-            ).values
+            # Batting and bowling rates, by phase when one is asked for
+            phases = [match_phase] if match_phase in tables.PHASES else tables.PHASES
+            phase_filters = {'seasons': seasons}
+            rows = []
+            for phase in phases:
+                phase_filters['match_phase'] = phase
+                batting = self.stats_engine.get_team_phase_stats(found_team, phase_filters, role='batting')
+                bowling = self.stats_engine.get_team_phase_stats(found_team, phase_filters, role='bowling')
+                rows.append([phase.replace('_', ' ').title(), batting['run_rate'], batting['wickets_per_innings'],
+                             bowling['economy'], bowling['wickets_per_innings']])
+            answer.add_text(response)
+            answer.add_table('phases', ['Phase', 'Run Rate', 'Wkts Lost/Inns', 'Economy', 'Wkts Taken/Inns'], rows,
+                             title='⏱️ Phase Breakdown', chart=True)
+            response = ""
+            
+            # Win/loss trends by season
+            season_stats = [{
+                'season': row['season'],
+                'matches': int(row['matches']),
+                'wins': int(row['wins'])
+            } for _, row in tables.get_team_seasons(found_team).iterrows()]
             
             # Ranking comparison
-            all_teams = self.all_teams
-            team_stats_list = []
-            for team_name in all_teams:
-                t_stats = self.stats_engine.get_team_stats(team_name)
-                if t_stats and 'error' not in t_stats:
-                    team_stats_list.append(t_stats)
-            
-            team_stats_list.sort(key=lambda x: x.get('win_percentage', 0), reverse=True)
-            rank = next((i+1 for i, t in enumerate(team_stats_list) if t['team'] == found_team), 0)
+            overall = tables.get_team_overall(found_team)
+            rank = int(overall['rank']) if overall else 0
             
             response += f"**📊 Rankings**\n"
-            response += f"- Overall Rank (by Win %): **#{rank}** out of {len(team_stats_list)} teams\n\n"
+            response += f"- Overall Rank (by Win %): **#{rank}** out of {len(tables.team_overall)} teams\n\n"
             
             if len(season_stats) > 0:
                 response += f"**📅 Recent Performance (Last 3 Seasons)**\n"
@@ -2447,11 +3001,11 @@ EXAMPLES:
                 response += "\n"
             
             response += f"💡 **Data Source**: IPL dataset with {len(self.matches_df)} matches analyzed"
-            
-            return response
+            answer.data['seasons'] = season_stats
+            return answer.add_text(response)
         
         except Exception as e:
-            return f"❌ Error getting team stats: {str(e)}"
+            return Answer.failure(f"❌ Error getting team stats: {str(e)}", 'team_stats')
     
     def _season_number_to_year(self, season_num: int) -> Optional[int]:
         """Convert IPL season number to year (1=2008, 2=2009, ..., 18=2025)"""
@@ -2476,38 +3030,15 @@ EXAMPLES:
     def _get_ipl_winner_response(self, year: int) -> str:
         """Get IPL champion for a specific year"""
         try:
-            season_matches = None
-            
-            # Special handling for specific years
-            if year == 2008:
-                # IPL 1 is stored as '2007/08'
-                season_matches = self.matches_df[self.matches_df['season'] == '2007/08']
-            elif year == 2009:
-                # IPL 2 is stored as '2009' (not '2009/10' which is 2010)
-                season_matches = self.matches_df[self.matches_df['season'] == '2009']
-            elif year == 2010:
-                # IPL 3 is stored as '2009/10'
-                season_matches = self.matches_df[self.matches_df['season'] == '2009/10']
-            elif year == 2020:
-                # IPL 13 is stored as '2020/21'
-                season_matches = self.matches_df[self.matches_df['season'] == '2020/21']
-            else:
-                # For other years, match directly
-                season_matches = self.matches_df[self.matches_df['season'] == str(year)]
+            final_match = self.stats_engine.team_tables.get_champion(year)
             
-            if len(season_matches) == 0:
+            if final_match is None:
                 # Get available seasons
                 available_seasons = sorted(self.matches_df['season'].unique())
                 season_str = ", ".join([str(s) for s in available_seasons])
                 return f"❌ No IPL data found for {year}. Available seasons: {season_str}"
             
-            # Get the last match of the season by DATE (not ID, as IDs can be out of order)
-            # Convert date column to datetime for proper comparison
-            season_matches_copy = season_matches.copy()
-            season_matches_copy['date'] = pd.to_datetime(season_matches_copy['date'])
-            final_match = season_matches_copy.loc[season_matches_copy['date'].idxmax()]
-            winner = final_match['winner']
-            
+            winner = final_match['champion']
             if not winner or pd.isna(winner):
                 return f"❌ Could not determine winner for IPL {year}."
             
@@ -2524,4 +3055,34 @@ EXAMPLES:
             return response
         
         except Exception as e:
-            return f"❌ Error getting IPL winner for {year}: {str(e)}"
\ No newline at end of file
+            return f"❌ Error getting IPL winner for {year}: {str(e)}"
+    
+    def _points_table_answer(self, year: Optional[int] = None) -> Answer:
+        """Get the league-stage points table for a season (latest season by default)"""
+        try:
+            tables = self.stats_engine.team_tables
+            if year is None:
+                year = int(tables.points_table['year'].max())
+            
+            standings = tables.get_points_table(year)
+            if len(standings) == 0:
+                available = ", ".join(str(y) for y in sorted(tables.points_table['year'].unique()))
+                return Answer.failure(f"❌ No points table available for {year}. Available seasons: {available}", 'points_table')
+            
+            title = f"IPL {year} Points Table"
+            answer = Answer(query_type='points_table', title=title, data={'year': year})
+            rows = [[row['position'], self._normalize_team_name(row['team']), row['played'], row['won'], row['lost'],
+                     row['no_result'], row['points'], row['net_run_rate']]
+                    for _, row in standings.iterrows()]
+            answer.add_table('points_table', ['Pos', 'Team', 'P', 'W', 'L', 'NR', 'Pts', 'NRR'], rows,
+                             title=f"📋 {title}", formats={'Team': '**{}**', 'NRR': '{:+.3f}'}, chart=True, label='Team')
+            
+            champion = tables.get_champion(year)
+            if champion and pd.notna(champion['champion']):
+                answer.data['champion'] = self._normalize_team_name(champion['champion'])
+                answer.add_text(f"🏆 **Champion**: {answer.data['champion']}")
+            
+            return answer
+        
+        except Exception as e:
+            return Answer.failure(f"❌ Error getting points table: {str(e)}", 'points_table')
\ No newline at end of file
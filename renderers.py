@@ -0,0 +1,130 @@
+"""
+Renderers for computed chatbot answers
+
+The chatbot computes an Answer once (and caches it); the chat UI renders it
+as markdown, the API as JSON, and Streamlit charts read its tables as
+label/series pairs.
+"""
+
+import numbers
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from models import Answer, AnswerBlock
+
+
+def _plain(value: Any) -> Any:
+    """numpy scalars and arrays as JSON-serializable Python values"""
+    if isinstance(value, dict):
+        return {str(k): _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return _plain(value.tolist())
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, numbers.Number) and not isinstance(value, bool)
+
+
+def format_cell(value: Any, template: Optional[str] = None) -> str:
+    """A table cell as text: the column/row template if given, two decimals for floats"""
+    if value is None:
+        return 'N/A'
+    if template:
+        return template.format(value)
+    if isinstance(value, numbers.Real) and not isinstance(value, numbers.Integral):
+        return f"{value:.2f}"
+    return str(value)
+
+
+# ===== MARKDOWN =====
+
+def _table_markdown(block: AnswerBlock) -> str:
+    text = ""
+    if block.title:
+        text += f"{block.icon} **{block.title}**\n\n" if block.icon else f"**{block.title}**\n\n"
+    text += "| " + " | ".join(block.columns) + " |\n"
+    text += "|" + "|".join('-' * (len(column) + 2) for column in block.columns) + "|\n"
+    for row in block.rows:
+        # Metric/value tables format numbers by row label, entity tables by column
+        row_format = block.formats.get(str(row[0])) if row else None
+        cells = [format_cell(value, (row_format if i and _is_number(value) else None) or block.formats.get(column))
+                 for i, (column, value) in enumerate(zip(block.columns, row))]
+        text += "| " + " | ".join(cells) + " |\n"
+    return text + "\n"
+
+
+def block_markdown(block: AnswerBlock) -> str:
+    """One block's share of the chat text, for streaming an answer block by block"""
+    return block.text if block.kind == 'text' else _table_markdown(block)
+
+
+def render_markdown(answer: Answer) -> str:
+    """The chat text of an answer"""
+    return "".join(block_markdown(block) for block in answer.blocks)
+
+
+# ===== JSON =====
+
+def render_json(answer: Answer) -> Dict:
+    """An answer as plain JSON: raw stats, tables with unformatted values, and the markdown"""
+    blocks = []
+    for block in answer.blocks:
+        if block.kind == 'text':
+            blocks.append({'kind': 'text', 'text': block.text})
+        else:
+            blocks.append({'kind': 'table', 'key': block.key, 'title': block.title,
+                           'columns': block.columns, 'rows': _plain(block.rows)})
+    return {
+        'query_type': answer.query_type,
+        'title': answer.title,
+        'error': answer.error,
+        'data': _plain(answer.data),
+        'blocks': blocks,
+        'markdown': render_markdown(answer),
+    }
+
+
+# ===== CHART SERIES =====
+
+def chart_series(answer: Answer, key: Optional[str] = None) -> Dict[str, Dict]:
+    """{table key: {'title', 'labels', 'series': {column: values}}} for the answer's chartable tables
+
+    Labels are the table's label column (the first by default); every
+    all-numeric column after it is a series. With a key, that table is
+    returned even if it is not marked chartable.
+    """
+    charts = {}
+    for block in answer.blocks:
+        if block.kind != 'table' or not block.rows:
+            continue
+        if (key is None and not block.chart) or (key is not None and block.key != key):
+            continue
+        label = block.columns.index(block.label) if block.label in block.columns else 0
+        series: Dict[str, List] = {}
+        for i in range(label + 1, len(block.columns)):
+            values = [row[i] for row in block.rows]
+            if all(_is_number(value) for value in values):
+                series[block.columns[i]] = _plain(values)
+        if series:
+            charts[block.key] = {'title': block.title, 'labels': [str(row[label]) for row in block.rows],
+                                 'series': series}
+    return charts
+
+
+RENDERERS = {
+    'markdown': render_markdown,
+    'json': render_json,
+    'chart': chart_series,
+}
+
+
+def render(answer: Answer, fmt: str = 'markdown'):
+    if fmt not in RENDERERS:
+        raise ValueError(f"Unknown answer format '{fmt}' (expected one of {', '.join(RENDERERS)})")
+    return RENDERERS[fmt](answer)
@@ -0,0 +1,339 @@
+import asyncio
+import copy
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import pandas as pd
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from tracing import record_cache
+
+
+def normalize_filters(filters: Optional[Dict]) -> Tuple:
+    """Canonical, hashable form of a filter dict
+
+    Empty values are dropped (every filter check in StatsEngine is a truthiness
+    test), keys are sorted and lists become sorted tuples, so {'seasons': [2024, 2023]}
+    and {'seasons': [2023, 2024], 'venue': None} produce the same key.
+    """
+    if not filters:
+        return ()
+    items = []
+    for key in sorted(filters):
+        value = filters[key]
+        if value is None or value == '' or value == [] or value == ():
+            continue
+        items.append((key, _normalize_value(value)))
+    return tuple(items)
+
+
+def _normalize_value(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return normalize_filters(value)
+    if isinstance(value, (list, tuple, set)):
+        values = [_normalize_value(v) for v in value]
+        try:
+            return tuple(sorted(values))
+        except TypeError:
+            return tuple(values)
+    return value
+
+
+def dataset_version(*frames: pd.DataFrame) -> str:
+    """Content hash of the loaded data, so cached results never outlive a reload"""
+    digest = hashlib.sha1()
+    for frame in frames:
+        digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one execution
+
+    The first caller runs the function; callers arriving while it is in
+    flight wait for it and receive the same result (or exception). Nothing is
+    remembered once the call finishes - that is the cache's job.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Return (value, shared); shared is True for callers that waited on another's call"""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value, True
+
+        try:
+            flight.value = fn()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.value, False
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines running on one event loop"""
+
+    def __init__(self):
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.coalesced += 1
+            # shield: a cancelled follower must not cancel the leader's work
+            return await asyncio.shield(flight), True
+
+        flight = self._flights[key] = asyncio.get_running_loop().create_future()
+        try:
+            value = await fn()
+        except BaseException as e:
+            flight.set_exception(e)
+            # Retrieve it so an exception nobody waited for isn't logged as unhandled
+            flight.exception()
+            raise
+        else:
+            flight.set_result(value)
+            return value, False
+        finally:
+            del self._flights[key]
+
+
+class DiskCache:
+    """SQLite-backed key/value store that survives restarts
+
+    Every row is tagged with the dataset version it was computed from; rows
+    from any other version are purged on open, so refreshing the data
+    invalidates the whole tier.
+    """
+
+    # Writes prune down to this share of max_entries, so a full cache is not pruned on every set
+    PRUNE_TO = 0.9
+
+    def __init__(self, path: str, dataset_version: str, namespace: str = 'stats', max_entries: int = 50000,
+                 ttl: Optional[float] = None):
+        self.path = path
+        self.dataset_version = dataset_version
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._rows = 0  # upper bound on this namespace's rows: replaced keys are counted as new
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'namespace TEXT, key TEXT, version TEXT, value BLOB, stored_at REAL, '
+                'PRIMARY KEY (namespace, key))'
+            )
+            self._conn.execute('DELETE FROM results WHERE namespace = ? AND version != ?',
+                               (namespace, dataset_version))
+            self._prune(max_entries)
+
+    def reopen(self):
+        """Fresh connection and lock for a forked child; SQLite handles must not cross fork()"""
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+
+    def _prune(self, keep: int):
+        """Keep only the newest keep rows of this namespace"""
+        self._conn.execute(
+            'DELETE FROM results WHERE namespace = ? AND key NOT IN ('
+            'SELECT key FROM results WHERE namespace = ? ORDER BY stored_at DESC LIMIT ?)',
+            (self.namespace, self.namespace, keep)
+        )
+        self._rows = self._conn.execute('SELECT COUNT(*) FROM results WHERE namespace = ?',
+                                        (self.namespace,)).fetchone()[0]
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (hit, value); rows older than the disk TTL are misses"""
+        oldest = time.time() - self.ttl if self.ttl is not None else 0.0
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value FROM results WHERE namespace = ? AND key = ? AND version = ? AND stored_at >= ?',
+                (self.namespace, repr(key), self.dataset_version, oldest)
+            ).fetchone()
+        if row is None:
+            return False, None
+        try:
+            return True, pickle.loads(row[0])
+        except Exception as e:
+            print(f"Warning: Could not read cached result: {e}")
+            return False, None
+
+    def set(self, key: Hashable, value: Any, stored_at: float):
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            print(f"Warning: Could not persist cached result: {e}")
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO results (namespace, key, version, value, stored_at) VALUES (?, ?, ?, ?, ?)',
+                (self.namespace, repr(key), self.dataset_version, blob, stored_at)
+            )
+            self._rows += 1
+            if self._rows > self.max_entries:
+                self._prune(max(1, int(self.max_entries * self.PRUNE_TO)))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM results WHERE namespace = ?',
+                                      (self.namespace,)).fetchone()[0]
+
+
+class ResultCache:
+    """Thread-safe LRU cache with per-entry TTL and hit/miss counters
+
+    Values are deep-copied on the way in and out so callers can mutate the
+    dicts they get back without corrupting the cache. An optional DiskCache
+    backs the in-memory tier: memory misses fall through to disk (which keeps
+    its own TTL), and every stored value is written to both. Concurrent
+    get_or_compute() misses on one key share a single computation.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl: Optional[float] = 3600, enabled: bool = True,
+                 backing: Optional[DiskCache] = None, name: str = 'results'):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self.backing = backing
+        self.disk_hits = 0
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._flight = SingleFlight()
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (hit, value); expired entries count as misses"""
+        if not self.enabled:
+            return False, None
+        hit, value = self._lookup(key)
+        record_cache(self.name, key, hit)
+        return hit, value
+
+    def _lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if self._expired(stored_at):
+                    del self._entries[key]
+                    self.expirations += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, copy.deepcopy(value)
+
+        if self.backing is not None:
+            hit, value = self.backing.get(key)
+            if hit:
+                with self._lock:
+                    self._store(key, value, time.time())
+                    self.hits += 1
+                    self.disk_hits += 1
+                return True, copy.deepcopy(value)
+
+        with self._lock:
+            self.misses += 1
+        return False, None
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl is not None and time.time() - stored_at > self.ttl
+
+    def _store(self, key: Hashable, value: Any, stored_at: float):
+        self._entries[key] = (stored_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def set(self, key: Hashable, value: Any):
+        if not self.enabled:
+            return
+        value = copy.deepcopy(value)
+        stored_at = time.time()
+        with self._lock:
+            self._store(key, value, stored_at)
+        if self.backing is not None:
+            self.backing.set(key, value, stored_at)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Cached value for key, computing and storing it on a miss"""
+        hit, value = self.get(key)
+        if hit:
+            return value
+
+        def compute_and_store():
+            value = compute()
+            self.set(key, value)
+            return value
+
+        # The computed value is handed to every waiter as well, so each caller gets its own copy
+        value, _ = self._flight.do(key, compute_and_store)
+        return copy.deepcopy(value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def after_fork(self):
+        """Reset locks, in-flight calls and the disk connection inherited by a forked child"""
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        if self.backing is not None:
+            self.backing.reopen()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'size': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'disk_entries': len(self.backing) if self.backing is not None else None,
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'coalesced': self._flight.coalesced,
+            'hit_rate': round(self.hits / lookups, 4) if lookups > 0 else 0.0,
+        }
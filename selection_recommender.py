@@ -0,0 +1,151 @@
+import heapq
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional
+from cricket_conventions import normalize_team, phase_codes
+from matchup_matrix import MatchupMatrix
+
+
+class SelectionRecommender:
+    """Opposition-aware batting and bowling selection from phase-sliced matchup aggregates
+
+    A batter is scored against the opposition's likely attack (the bowlers who
+    bowled for them in their latest season, weighted by share of balls in the
+    phase) and a bowler against their likely line-up. Head-to-head rates are
+    shrunk toward the player's own phase baseline so thin samples don't dominate.
+    """
+
+    # Approximate runs a wicket is worth in each phase of a T20 innings
+    WICKET_RUN_VALUE = {'powerplay': 8.0, 'middle_overs': 7.0, 'death_overs': 4.0, None: 6.5}
+
+    SHRINKAGE_BALLS = 30      # Pseudo-balls of baseline mixed into every head-to-head rate
+    MIN_PHASE_BALLS = 60      # Minimum career balls in the phase to be a candidate
+
+    # Sub-phases are scored with the matchup slice that contains them
+    PHASE_ALIASES = {'opening': 'powerplay', 'closing': 'death_overs'}
+
+    def __init__(self, matchups: MatchupMatrix, deliveries_df: pd.DataFrame, matches_df: pd.DataFrame):
+        self.matchups = matchups
+        self.squads = self._build_squads(deliveries_df, matches_df)
+        self.latest_year = int(self.squads['year'].max()) if len(self.squads) else None
+
+    def _normalize_team(self, team: Optional[str]) -> Optional[str]:
+        return normalize_team(team)
+
+    def _build_squads(self, deliveries_df: pd.DataFrame, matches_df: pd.DataFrame) -> pd.DataFrame:
+        """Balls per (year, team, player, role, phase) - who bats and bowls for whom"""
+        years = matches_df.set_index('id')['year']
+        phase = phase_codes(deliveries_df['over'].to_numpy())
+        year = deliveries_df['match_id'].map(years).fillna(0).astype(int).to_numpy()
+
+        batting = pd.DataFrame({
+            'year': year,
+            'team': deliveries_df['batting_team'].map(normalize_team).to_numpy(),
+            'player_id': deliveries_df['batter'].map(self.matchups._batter_ids).to_numpy(),
+            'role': 'batter',
+            'phase': phase,
+        })
+        bowling = pd.DataFrame({
+            'year': year,
+            'team': deliveries_df['bowling_team'].map(normalize_team).to_numpy(),
+            'player_id': deliveries_df['bowler'].map(self.matchups._bowler_ids).to_numpy(),
+            'role': 'bowler',
+            'phase': phase,
+        })
+        squads = pd.concat([batting, bowling], ignore_index=True)
+        return squads.groupby(['year', 'team', 'role', 'phase', 'player_id']).size().rename('balls').reset_index()
+
+    def _team_weights(self, team: str, role: str, phase: Optional[str]) -> pd.Series:
+        """Share of a team's balls in the phase taken by each player in their latest season"""
+        team = self._normalize_team(team)
+        rows = self.squads[(self.squads['team'] == team) & (self.squads['role'] == role)]
+        if len(rows) == 0:
+            return pd.Series(dtype=float)
+        rows = rows[rows['year'] == rows['year'].max()]
+        phase_code = self.matchups._phase_code(phase)
+        if phase_code is not None:
+            rows = rows[rows['phase'] == phase_code]
+        balls = rows.groupby('player_id')['balls'].sum()
+        return balls / balls.sum() if balls.sum() > 0 else balls.astype(float)
+
+    def _candidates(self, role: str, team: Optional[str] = None, exclude_team: Optional[str] = None) -> np.ndarray:
+        """Players active in the latest season, optionally restricted to one team"""
+        rows = self.squads[(self.squads['role'] == role) & (self.squads['year'] == self.latest_year)]
+        if team:
+            rows = rows[rows['team'] == self._normalize_team(team)]
+        if exclude_team:
+            rows = rows[rows['team'] != self._normalize_team(exclude_team)]
+        return rows['player_id'].unique()
+
+    def _expected_rates(self, role: str, phase: Optional[str], weights: pd.Series) -> pd.DataFrame:
+        """Expected runs and dismissals per ball for every player against a weighted opposition"""
+        own, other = ('batter_id', 'bowler_id') if role == 'batter' else ('bowler_id', 'batter_id')
+        cells = self.matchups._select(self.matchups.cells, phase=phase)
+
+        base = cells.groupby(own)[['balls', 'runs', 'dismissals']].sum()
+        base = base[base['balls'] > 0]
+        base_rpb = base['runs'] / base['balls']
+        base_dpb = base['dismissals'] / base['balls']
+
+        rates = pd.DataFrame({'balls': base['balls'], 'rpb': base_rpb, 'dpb': base_dpb})
+        if len(weights) == 0:
+            return rates
+
+        # Head-to-head rates against the weighted opposition, shrunk toward each player's baseline
+        pairs = cells[cells[other].isin(weights.index)]
+        pairs = pairs.groupby([own, other])[['balls', 'runs', 'dismissals']].sum().reset_index()
+        pairs = pairs[pairs[own].isin(base.index)]
+        pairs['weight'] = pairs[other].map(weights).to_numpy()
+        k = self.SHRINKAGE_BALLS
+        prior_rpb = pairs[own].map(base_rpb).to_numpy()
+        prior_dpb = pairs[own].map(base_dpb).to_numpy()
+        pairs['w_rpb'] = pairs['weight'] * (pairs['runs'] + k * prior_rpb) / (pairs['balls'] + k)
+        pairs['w_dpb'] = pairs['weight'] * (pairs['dismissals'] + k * prior_dpb) / (pairs['balls'] + k)
+        faced = pairs.groupby(own)[['weight', 'w_rpb', 'w_dpb']].sum().reindex(base.index, fill_value=0)
+
+        # Opposition players never faced contribute the player's baseline rate
+        unseen = 1 - faced['weight']
+        rates['rpb'] = faced['w_rpb'] + unseen * base_rpb
+        rates['dpb'] = faced['w_dpb'] + unseen * base_dpb
+        return rates
+
+    def _top_k(self, role: str, opposition_team: Optional[str], phase: Optional[str],
+               team: Optional[str], k: int) -> List[Dict]:
+        phase = self.PHASE_ALIASES.get(phase, phase)
+        if phase not in MatchupMatrix.PHASES:
+            phase = None
+        opposing_role = 'bowler' if role == 'batter' else 'batter'
+        weights = self._team_weights(opposition_team, opposing_role, phase) if opposition_team else pd.Series(dtype=float)
+        rates = self._expected_rates(role, phase, weights)
+
+        candidates = self._candidates(role, team, exclude_team=opposition_team)
+        rates = rates[rates.index.isin(candidates) & (rates['balls'] >= self.MIN_PHASE_BALLS)]
+        if len(rates) == 0:
+            return []
+
+        # Net runs per 100 balls: runs minus the run value of wickets lost (batting) or taken (bowling)
+        wicket_value = self.WICKET_RUN_VALUE.get(phase, self.WICKET_RUN_VALUE[None])
+        net = (rates['rpb'] - wicket_value * rates['dpb']).to_numpy() * 100
+        scores = net if role == 'batter' else -net
+
+        names = self.matchups.batters if role == 'batter' else self.matchups.bowlers
+        ids = rates.index.to_numpy()
+        best = heapq.nlargest(k, range(len(scores)), key=scores.__getitem__)
+        return [{
+            'player': names[int(ids[i])],
+            'score': round(float(scores[i]), 2),
+            'strike_rate' if role == 'batter' else 'economy':
+                round(float(rates['rpb'].iloc[i]) * (100 if role == 'batter' else 6), 2),
+            'balls_per_dismissal': round(1 / float(rates['dpb'].iloc[i]), 1) if rates['dpb'].iloc[i] > 0 else None,
+            'phase_balls': int(rates['balls'].iloc[i]),
+        } for i in best]
+
+    def recommend_batters(self, opposition_team: Optional[str] = None, phase: Optional[str] = None,
+                          team: Optional[str] = None, k: int = 5) -> List[Dict]:
+        """Top-k batters against the opposition's likely attack in a phase"""
+        return self._top_k('batter', opposition_team, phase, team, k)
+
+    def recommend_bowlers(self, opposition_team: Optional[str] = None, phase: Optional[str] = None,
+                          team: Optional[str] = None, k: int = 5) -> List[Dict]:
+        """Top-k bowlers against the opposition's likely batting line-up in a phase"""
+        return self._top_k('bowler', opposition_team, phase, team, k)
@@ -0,0 +1,240 @@
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set
+
+
+# Cricket terms the parsers key on, and everyday question words that must never be "corrected" into names
+CRICKET_WORDS = {
+    'powerplay', 'power', 'play', 'middle', 'overs', 'over', 'death', 'opening', 'closing', 'chasing', 'chase',
+    'defending', 'batting', 'bowling', 'first', 'second', 'innings', 'inning', 'pace', 'pacer', 'pacers', 'fast',
+    'spin', 'spinner', 'spinners', 'left', 'right', 'arm', 'handed', 'hander', 'handers', 'opener', 'finisher',
+    'home', 'away', 'recent', 'last', 'matches', 'match', 'games', 'game', 'stadium', 'ground', 'venue',
+    'runs', 'run', 'wickets', 'wicket', 'average', 'strike', 'rate', 'economy', 'sixes', 'fours', 'boundaries',
+    'centuries', 'century', 'fifties', 'fifty', 'highest', 'score', 'scores', 'scorer', 'scorers', 'takers',
+    'figures', 'record', 'records', 'stats', 'statistics', 'performance', 'form', 'trend', 'trends', 'career',
+    'season', 'seasons', 'ranking', 'rankings', 'batter', 'batters', 'batsman', 'batsmen', 'bowler', 'bowlers',
+    'allrounder', 'allrounders', 'captain', 'team', 'teams', 'player', 'players', 'points', 'table', 'standings',
+    'league', 'final', 'finals', 'playoff', 'playoffs', 'qualifier', 'eliminator', 'champion', 'champions',
+    'title', 'titles', 'toss', 'won', 'win', 'wins', 'winner', 'winners', 'lost', 'loss', 'losses', 'versus',
+    'against', 'compare', 'comparison', 'head', 'prediction', 'predictions', 'strategy', 'analysis',
+    'recommendations', 'dismissals', 'dismissed', 'balls', 'deliveries', 'dot', 'dots', 'maiden', 'maidens',
+    'extras', 'wides', 'total', 'totals', 'margin', 'partnership', 'partnerships', 'yorker', 'leg', 'off',
+    'about', 'after', 'again', 'all', 'also', 'and', 'any', 'are', 'been', 'before', 'best', 'better', 'between',
+    'both', 'can', 'could', 'current', 'currently', 'does', 'doing', 'done', 'during', 'each', 'ever', 'every',
+    'fare', 'fared', 'from', 'give', 'good', 'great', 'has', 'have', 'how', 'into', 'list', 'many', 'more',
+    'most', 'much', 'only', 'open', 'other', 'overall', 'should', 'show', 'since', 'some', 'than', 'that',
+    'their', 'them', 'then', 'there', 'these', 'they', 'this', 'those', 'time', 'times', 'top', 'tell', 'under',
+    'was', 'were', 'what', 'when', 'where', 'which', 'while', 'who', 'whom', 'whose', 'why', 'will',
+    'with', 'without', 'would', 'year', 'years', 'latest', 'least', 'lowest', 'longest', 'fastest', 'worst',
+    'played', 'playing', 'plays', 'scored', 'took', 'take', 'taken', 'made', 'make', 'number',
+    'phase', 'phases', 'catch', 'catches', 'caught', 'catching', 'bowled', 'batted', 'captaincy', 'captains',
+    'captained', 'hit', 'hits', 'hitting', 'stumped', 'stumping', 'stumpings', 'keeper', 'keeping', 'fielding',
+    'fielder', 'fielders', 'scoring', 'bowl', 'bowls', 'bat', 'bats', 'chases', 'chased', 'defend', 'defended',
+}
+
+# Everyday English that is left as typed: not in the vocabulary, but never a misspelling of it either
+COMMON_WORDS = {
+    'able', 'above', 'across', 'actually', 'ago', 'ahead', 'almost', 'alone', 'along',
+    'already', 'although', 'always', 'among', 'another', 'anyone', 'anything', 'around', 'ask', 'asked', 'back',
+    'bad', 'because', 'become', 'becomes', 'being', 'below', 'beside', 'beyond', 'big', 'biggest', 'bit',
+    'bring', 'call', 'called', 'came', 'cannot', 'case', 'change', 'changed', 'check', 'clear', 'close', 'come',
+    'comes', 'coming', 'consider', 'count', 'data', 'day', 'days', 'decide', 'deep', 'detail', 'details',
+    'did', 'different', 'down', 'early', 'easy', 'eight', 'either', 'else', 'end', 'ended', 'ends',
+    'enough', 'even', 'event', 'everyone', 'everything', 'exactly', 'explain', 'fact', 'far', 'few', 'fewer',
+    'fewest', 'find', 'five', 'four', 'full', 'get', 'gets', 'getting', 'given', 'gives', 'goes', 'going',
+    'gone', 'got', 'half', 'happen', 'happened', 'hard', 'help', 'her', 'here', 'high', 'higher', 'him', 'his',
+    'hope', 'however', 'idea', 'important', 'including', 'instead', 'its', 'itself', 'just', 'keep', 'kept',
+    'kind', 'knew', 'know', 'known', 'large', 'larger', 'largest', 'late', 'later', 'less', 'let', 'like',
+    'likely', 'little', 'long', 'longer', 'look', 'looking', 'low', 'lower', 'main', 'mainly', 'mean', 'means',
+    'might', 'mine', 'mostly', 'must', 'near', 'nearly', 'need', 'needs', 'never', 'new', 'next', 'nine',
+    'none', 'not', 'nothing', 'now', 'often', 'once', 'one', 'ones', 'onto', 'order', 'others', 'our', 'out',
+    'own', 'part', 'past', 'per', 'perhaps', 'place', 'please', 'point', 'possible', 'pretty', 'probably',
+    'put', 'quite', 'rather', 'really', 'reason', 'result', 'results', 'same', 'say', 'says', 'see', 'seem',
+    'seems', 'seen', 'seven', 'several', 'she', 'short', 'side', 'sides', 'similar', 'six', 'small', 'smaller',
+    'something', 'sometimes', 'soon', 'sort', 'start', 'started', 'starting', 'still', 'such', 'sure', 'ten',
+    'thank', 'thanks', 'thing', 'things', 'think', 'third', 'though', 'three', 'through', 'thus', 'till', 'today',
+    'together', 'too', 'toward', 'towards', 'tried', 'true', 'try', 'turn', 'twice', 'two', 'until', 'upon',
+    'usually', 'very', 'want', 'wanted', 'way', 'ways', 'week', 'well', 'went', 'whether', 'whole', 'within',
+    'word', 'work', 'worked', 'works', 'worse', 'yes', 'yet', 'your', 'yours', 'zero',
+}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal-string-alignment (Damerau-Levenshtein) distance, giving up with limit + 1 once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+class SpellCorrector:
+    """Symmetric-delete spelling correction (SymSpell) over a fixed vocabulary
+
+    Every vocabulary word is indexed under all strings reachable by deleting up
+    to max_edit_distance characters from its prefix. A query token's own deletes
+    are then looked up in that index, so candidates are found with a handful of
+    dict lookups instead of a scan; the closest candidate (Damerau-Levenshtein,
+    then highest frequency) wins. Results are memoized per token.
+    """
+
+    MEMO_SIZE = 10000
+
+    def __init__(self, max_edit_distance: int = 2, prefix_length: int = 7, min_token_length: int = 4):
+        self.max_edit_distance = max_edit_distance
+        self.prefix_length = prefix_length
+        self.min_token_length = min_token_length
+        self.words: Dict[str, int] = {}
+        self._deletes: Dict[str, Set[str]] = {}
+        self.known: Set[str] = set()
+        self.guarded: Set[str] = set()
+        self._name_words: Set[str] = set()
+        self._memo: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    # ===== INDEX =====
+
+    def _delete_variants(self, word: str) -> Set[str]:
+        """word's prefix and every string reachable from it by up to max_edit_distance deletions"""
+        prefix = word[:self.prefix_length]
+        variants = {prefix}
+        frontier = {prefix}
+        for _ in range(self.max_edit_distance):
+            frontier = {w[:i] + w[i + 1:] for w in frontier if len(w) > 1 for i in range(len(w))}
+            variants |= frontier
+        return variants
+
+    def add_words(self, words: Iterable[str], frequency: int = 1):
+        """Add words (lowercased, 2+ letters), or a word -> frequency dict
+
+        A word added more than once keeps the highest frequency it was given.
+        """
+        items = words.items() if isinstance(words, dict) else ((word, frequency) for word in words)
+        with self._lock:
+            for word, frequency in items:
+                word = word.lower().strip()
+                if len(word) < 2 or not word.isalpha():
+                    continue
+                if word not in self.words:
+                    for variant in self._delete_variants(word):
+                        self._deletes.setdefault(variant, set()).add(word)
+                self.words[word] = max(self.words.get(word, 0), frequency)
+            self._memo.clear()
+
+    def add_known_words(self, words: Iterable[str]):
+        """Words left as typed without joining the vocabulary ('please' is no misspelling of 'least')"""
+        self.known |= {word.lower() for word in words}
+
+    def guard_words(self, words: Iterable[str]):
+        """Vocabulary words a token is only corrected into beside a name ('wankede stadum')
+
+        Keywords that switch a parser filter on would otherwise silently change the
+        question: 'phase' became 'chase', 'catches' became 'matches'.
+        """
+        self.guarded |= {word.lower() for word in words}
+
+    def add_aliases(self, aliases: Dict[str, List[str]], weights: Optional[Dict[str, int]] = None,
+                    default_weight: int = 1):
+        """Add the words of names and their alias lists, each at its name's weight
+
+        Alias lists mix nicknames with collected misspellings ('jasprit', 'jaspit',
+        'hardik sharmaa'). Names' own words go in first; then each list's words,
+        most used first, skipping any the index would correct to a word already
+        kept for the same name, or that is one letter off another name's word -
+        so lookups converge on 'jasprit bumrah' instead of memorizing typos.
+        """
+        weights = weights or {}
+        name_words = {}
+        for name in aliases:
+            words = re.findall(r'[a-z]+', name.lower())
+            self.add_words(words, max(weights.get(name, default_weight), 1))
+            name_words[name] = set(words)
+            self._name_words.update(words)
+        all_name_words = set().union(*name_words.values()) if name_words else set()
+
+        for name, alias_list in aliases.items():
+            weight = max(weights.get(name, default_weight), 1)
+            kept = set(name_words[name])
+            counts = Counter(word for alias in alias_list for word in re.findall(r'[a-z]+', alias.lower()))
+            for word, _ in counts.most_common():
+                if len(word) >= self.min_token_length and word not in self.words:
+                    match = self.lookup(word)
+                    if match in kept:
+                        continue
+                    # One letter off another name's word ('sharmaa') - but short names like rohit/mohit are distinct
+                    if match in all_name_words and len(word) >= 6 and edit_distance(word, match, 1) <= 1:
+                        continue
+                self.add_words([word], weight)
+                kept.add(word)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    # ===== LOOKUP =====
+
+    def _max_distance(self, token: str) -> int:
+        """Short tokens get one edit; two would reach too many unrelated words"""
+        return 1 if len(token) < 6 else self.max_edit_distance
+
+    def lookup(self, token: str) -> Optional[str]:
+        """Best vocabulary word for a token (itself when known), or None when nothing is close enough"""
+        token = token.lower()
+        if token in self.words:
+            return token
+        if token in self._memo:
+            return self._memo[token]
+
+        limit = self._max_distance(token)
+        candidates = set()
+        for variant in self._delete_variants(token):
+            candidates |= self._deletes.get(variant, set())
+
+        best, best_key = None, None
+        for candidate in candidates:
+            distance = edit_distance(token, candidate, limit)
+            if distance <= limit:
+                key = (distance, -self.words[candidate])
+                if best_key is None or key < best_key:
+                    best, best_key = candidate, key
+        if len(self._memo) >= self.MEMO_SIZE:
+            self._memo.clear()
+        self._memo[token] = best
+        return best
+
+    def correct(self, text: str) -> str:
+        """Text with unknown words replaced by their closest vocabulary word
+
+        Numbers, short tokens, everyday English and words with no close match are
+        left alone, and a guarded keyword is only reached beside a name word.
+        """
+        pieces = re.split(r'([A-Za-z]+)', text)
+        for i in range(1, len(pieces), 2):
+            token = pieces[i]
+            if (len(token) < self.min_token_length or token.lower() in self.words
+                    or token.lower() in self.known):
+                continue
+            match = self.lookup(token)
+            if match is None or (match in self.guarded and not self._beside_name(pieces, i)):
+                continue
+            pieces[i] = match
+        return ''.join(pieces)
+
+    def _beside_name(self, pieces: List[str], i: int) -> bool:
+        """Whether the word before or after pieces[i] is (a misspelling of) a name's own word"""
+        for j in (i - 2, i + 2):
+            if 0 < j < len(pieces) and len(pieces[j]) >= self.min_token_length:
+                word = self.lookup(pieces[j])
+                if word in self._name_words and word not in self.guarded and word not in CRICKET_WORDS:
+                    return True
+        return False
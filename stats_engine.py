@@ -1,10 +1,19 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from difflib import SequenceMatcher
 import json
 import os
 from data_loader import IPLDataLoader
+from matchup_matrix import MatchupMatrix
+from selection_recommender import SelectionRecommender
+from team_tables import TeamTables
+from cricket_conventions import normalize_team
+from result_cache import ResultCache, DiskCache, normalize_filters, dataset_version
+from spell_correction import SpellCorrector, CRICKET_WORDS, COMMON_WORDS
+from tracing import traced, record_entity, record_filters, record_rows
+from conversation import SliceStore, active_slices
+import config
 
 class StatsEngine:
     """Calculate cricket statistics from IPL data"""
@@ -14,9 +23,17 @@ class StatsEngine:
         self.deliveries_df = deliveries_df
         self._player_cache = None
         self._team_cache = None
+        self._matchups = None
+        self._recommender = None
+        self._spell_corrector = None
         self._aliases = self._load_aliases()
         self._bowler_types = self._load_bowler_types()
         self._batter_handedness = self._load_batter_handedness()
+        self.team_tables = TeamTables(matches_df, deliveries_df)
+        self.dataset_version = dataset_version(matches_df, deliveries_df)
+        self._result_cache = ResultCache(max_entries=config.CACHE_MAX_ENTRIES, ttl=config.CACHE_TTL,
+                                         enabled=config.CACHE_ENABLED, backing=self.open_disk_cache('stats'),
+                                         name='stats')
     
     def _load_aliases(self) -> Dict:
         """Load player and team aliases from JSON file"""
@@ -61,8 +78,72 @@ class StatsEngine:
             self._team_cache = teams.tolist()
         return self._team_cache
     
+    @property
+    def matchups(self) -> MatchupMatrix:
+        """Batter x bowler matchup matrix, built on first use"""
+        if self._matchups is None:
+            self._matchups = MatchupMatrix(self.deliveries_df, self.matches_df)
+        return self._matchups
+    
+    @property
+    def recommender(self) -> SelectionRecommender:
+        """Opposition-aware selection recommender, built on first use"""
+        if self._recommender is None:
+            self._recommender = SelectionRecommender(self.matchups, self.deliveries_df, self.matches_df)
+        return self._recommender
+    
+    @property
+    def spell_corrector(self) -> SpellCorrector:
+        """Spelling index over player, team and venue names plus cricket terms, built on first use"""
+        if self._spell_corrector is None:
+            corrector = SpellCorrector(max_edit_distance=config.SPELL_MAX_EDIT_DISTANCE)
+            appearances = pd.concat([self.deliveries_df['batter'], self.deliveries_df['bowler']]).value_counts()
+            players = {player: self._aliases.get(player, []) for player in self._get_all_players()
+                       if isinstance(player, str)}
+            corrector.add_aliases(players, appearances.to_dict())
+            
+            # Team, venue and cricket words outrank any single player's name at equal distance
+            common = int(appearances.max()) if len(appearances) else 1
+            places = [name for name in self._get_all_teams() + self.matches_df['venue'].unique().tolist()
+                      if isinstance(name, str)]
+            corrector.add_aliases({name: [] for name in places}, default_weight=common)
+            corrector.add_words(CRICKET_WORDS, common)
+            corrector.add_known_words(COMMON_WORDS)
+            self._spell_corrector = corrector
+        return self._spell_corrector
+    
+    def _cache_key(self, method: str, *parts) -> Tuple:
+        """Result cache key: method, canonical arguments, normalized filters and dataset version"""
+        return (method, self.dataset_version) + parts
+    
+    def open_disk_cache(self, namespace: str):
+        """Persistent cache tier for this dataset version, or None when disabled"""
+        if not config.DISK_CACHE_ENABLED:
+            return None
+        try:
+            return DiskCache(config.DISK_CACHE_PATH, self.dataset_version, namespace=namespace,
+                             max_entries=config.DISK_CACHE_MAX_ENTRIES, ttl=config.DISK_CACHE_TTL)
+        except Exception as e:
+            print(f"Warning: Could not open disk cache: {e}")
+            return None
+    
+    def after_fork(self):
+        """Make the result cache safe to use in a forked child process"""
+        self._result_cache.after_fork()
+    
+    def cache_stats(self) -> Dict:
+        """Hit/miss counters and size of the result cache"""
+        return self._result_cache.stats()
+    
+    @traced()
     def find_player(self, query: str) -> str:
         """Find player by fuzzy matching. Returns best match or None"""
+        key = self._cache_key('find_player', query.lower().strip())
+        found = self._result_cache.get_or_compute(key, lambda: self._find_player(query))
+        record_entity(query, found)
+        return found
+    
+    def _find_player(self, query: str) -> str:
         all_players = self._get_all_players()
         query_lower = query.lower().strip()
         
@@ -121,7 +202,13 @@ class StatsEngine:
             candidates.sort(key=lambda x: (-x[1], -x[2]))
             return candidates[0][0]
         
-        # 6. Fuzzy match with threshold
+        # 6. Misspelled name: retry with each word corrected against the spelling index
+        if config.SPELL_CORRECTION_ENABLED:
+            corrected = self.spell_corrector.correct(query_lower)
+            if corrected != query_lower:
+                return self._find_player(corrected)
+        
+        # 7. Fuzzy match with threshold
         best_matches = []
         for player in all_players:
             ratio = SequenceMatcher(None, query_lower, player.lower()).ratio()
@@ -135,12 +222,47 @@ class StatsEngine:
         
         return None
     
+    def _player_rows(self, player: str, role: str) -> pd.DataFrame:
+        """Deliveries with player as 'batter' or 'bowler'
+        
+        While a conversation session is being answered its slice store serves
+        repeat requests for the session's players, so follow-up refinements
+        skip the full-dataset scan.
+        Callers must not modify the returned frame in place.
+        """
+        slices = active_slices()
+        if slices is not None and player not in slices.players:
+            slices = None
+        key = (self.dataset_version, player, role)
+        if slices is not None:
+            rows = slices.get(key)
+            if rows is not None:
+                record_rows(f'{role}.session_slice', len(rows))
+                return rows
+        rows = self.deliveries_df[self.deliveries_df[role] == player]
+        if slices is not None:
+            slices.put(key, rows)
+        return rows
+    
+    def fill_slices(self, slices: SliceStore):
+        """Cut the batter and bowler slices of a session's focused players that it does not hold yet
+        
+        A turn answered from a cache never reaches _player_rows, so without this
+        its follow-ups would scan the full dataset.
+        """
+        for player in slices.players:
+            for role in ('batter', 'bowler'):
+                key = (self.dataset_version, player, role)
+                if key not in slices:
+                    slices.put(key, self.deliveries_df[self.deliveries_df[role] == player])
+    
     def _count_player_matches(self, player_name: str) -> int:
         """Count total deliveries for a player"""
         batter_count = len(self.deliveries_df[self.deliveries_df['batter'] == player_name])
         bowler_count = len(self.deliveries_df[self.deliveries_df['bowler'] == player_name])
         return batter_count + bowler_count
     
+    @traced()
     def find_team(self, query: str) -> str:
         """Find team by fuzzy matching"""
         all_teams = self._get_all_teams()
@@ -148,6 +270,7 @@ class StatsEngine:
         
         for team in all_teams:
             if team.lower() == query_lower or query_lower in team.lower():
+                record_entity(query, team)
                 return team
         
         best_match = None
@@ -158,8 +281,31 @@ class StatsEngine:
                 best_ratio = ratio
                 best_match = team
         
+        record_entity(query, best_match)
         return best_match
     
+    def find_venue(self, query: str) -> Optional[str]:
+        """Find a venue (as named in the loaded matches) by fuzzy matching"""
+        venues = [venue for venue in self.matches_df['venue'].unique() if isinstance(venue, str)]
+        query_lower = query.lower().strip()
+        
+        for venue in venues:
+            if venue.lower() == query_lower:
+                return venue
+        for venue in venues:
+            if query_lower in venue.lower():
+                return venue
+        
+        best_match = None
+        best_ratio = 0
+        for venue in venues:
+            ratio = SequenceMatcher(None, query_lower, venue.lower()).ratio()
+            if ratio > best_ratio and ratio > 0.6:
+                best_ratio = ratio
+                best_match = venue
+        return best_match
+    
+    @traced()
     def get_player_stats(self, player: str, filters: Dict = None) -> Dict:
         """Get comprehensive stats for a player with optional filters
         
@@ -176,6 +322,11 @@ class StatsEngine:
         if not found_player:
             return {'error': f'Player {player} not found'}
         
+        key = self._cache_key('player_stats', found_player, normalize_filters(filters))
+        return self._result_cache.get_or_compute(key, lambda: self._compute_player_stats(found_player, filters))
+    
+    @traced()
+    def _compute_player_stats(self, found_player: str, filters: Dict = None) -> Dict:
         # Calculate overall matches from batting OR bowling appearances
         total_matches = self._get_total_matches(found_player, filters)
         
@@ -188,6 +339,50 @@ class StatsEngine:
             'bowling': bowling_stats
         }
     
+    @traced()
+    def get_players_stats_batch(self, players: List[str], filters: Dict = None) -> Dict[str, Dict]:
+        """get_player_stats() for several players at once, keyed by resolved player name
+        
+        Players not already cached are computed together: their deliveries are
+        filtered once and aggregated in one grouped pass keyed on the player.
+        Results share the get_player_stats cache entries. Unknown names are left out.
+        """
+        found_players = []
+        for player in players:
+            found_player = self.find_player(player)
+            if found_player and found_player not in found_players:
+                found_players.append(found_player)
+        
+        normalized = normalize_filters(filters)
+        results, missing = {}, []
+        for player in found_players:
+            hit, stats = self._result_cache.get(self._cache_key('player_stats', player, normalized))
+            if hit:
+                results[player] = stats
+            else:
+                missing.append(player)
+        
+        if missing:
+            computed = self._compute_players_stats_batch(missing, filters)
+            for player in missing:
+                self._result_cache.set(self._cache_key('player_stats', player, normalized), computed[player])
+                results[player] = computed[player]
+        return {player: results[player] for player in found_players}
+    
+    @traced()
+    def _compute_players_stats_batch(self, players: List[str], filters: Dict = None) -> Dict[str, Dict]:
+        # One scan of the deliveries per role, shared by the match counts and the stats
+        batter_rows = self.deliveries_df[self.deliveries_df['batter'].isin(players)]
+        bowler_rows = self.deliveries_df[self.deliveries_df['bowler'].isin(players)]
+        total_matches = self._get_total_matches_batch(batter_rows, bowler_rows, filters)
+        batting = self._get_batting_stats_batch(batter_rows, filters, total_matches)
+        bowling = self._get_bowling_stats_batch(bowler_rows, filters, total_matches)
+        return {
+            player: {'player': player, 'batting': batting.get(player, {}), 'bowling': bowling.get(player, {})}
+            for player in players
+        }
+    
+    @traced()
     def get_last_n_innings(self, player: str, n: int = 5) -> List[Dict]:
         """Get last N batting innings for a batter"""
         found_player = self.find_player(player)
@@ -195,7 +390,7 @@ class StatsEngine:
             return []
         
         # Get all innings where player batted
-        bat_deliveries = self.deliveries_df[self.deliveries_df['batter'] == found_player].copy()
+        bat_deliveries = self._player_rows(found_player, 'batter').copy()
         
         if len(bat_deliveries) == 0:
             return []
@@ -251,6 +446,7 @@ class StatsEngine:
         
         return innings_list
     
+    @traced()
     def get_last_n_matches(self, player: str, n: int = 5) -> List[Dict]:
         """Get match-by-match data for player's last N appearances"""
         found_player = self.find_player(player)
@@ -258,8 +454,8 @@ class StatsEngine:
             return []
         
         # Get all matches where player appeared (batting or bowling)
-        batter_matches = self.deliveries_df[self.deliveries_df['batter'] == found_player][['match_id']].drop_duplicates()
-        bowler_matches = self.deliveries_df[self.deliveries_df['bowler'] == found_player][['match_id']].drop_duplicates()
+        batter_matches = self._player_rows(found_player, 'batter')[['match_id']].drop_duplicates()
+        bowler_matches = self._player_rows(found_player, 'bowler')[['match_id']].drop_duplicates()
         
         # Union of all matches
         all_matches = set(batter_matches['match_id'].unique()) | set(bowler_matches['match_id'].unique())
@@ -354,10 +550,13 @@ class StatsEngine:
         
         return results
     
+    @traced()
     def _apply_filters(self, deliveries_df: pd.DataFrame, filters: Dict) -> pd.DataFrame:
         """Apply filters to deliveries dataframe"""
         if not filters:
             return deliveries_df
+        record_filters('filters', filters)
+        record_rows('filters.in', len(deliveries_df))
         
         df = deliveries_df.copy()
         
@@ -388,17 +587,18 @@ class StatsEngine:
         if filters.get('innings_order'):
             df = df[df['inning'] == filters['innings_order']]
         
+        record_rows('filters.out', len(df))
         return df.drop(columns=['id', 'year', 'season', 'venue', 'team1', 'team2'], errors='ignore')
     
     def _get_total_matches(self, player: str, filters: Dict = None) -> int:
         """Get total matches where player appeared (batted OR bowled in inning 1 or 2)"""
         # Get deliveries where player batted (only inning 1 and 2)
-        batter_deliveries = self.deliveries_df[(self.deliveries_df['batter'] == player) & 
-                                               (self.deliveries_df['inning'].isin([1, 2]))]
+        batter_deliveries = self._player_rows(player, 'batter')
+        batter_deliveries = batter_deliveries[batter_deliveries['inning'].isin([1, 2])]
         
         # Get deliveries where player bowled (only inning 1 and 2)
-        bowler_deliveries = self.deliveries_df[(self.deliveries_df['bowler'] == player) & 
-                                               (self.deliveries_df['inning'].isin([1, 2]))]
+        bowler_deliveries = self._player_rows(player, 'bowler')
+        bowler_deliveries = bowler_deliveries[bowler_deliveries['inning'].isin([1, 2])]
         
         # Combine both (union of matches where player appeared)
         all_match_ids = set(batter_deliveries['match_id'].unique()) | set(bowler_deliveries['match_id'].unique())
@@ -410,29 +610,23 @@ class StatsEngine:
         if not filters or all(v is None for v in filters.values()):
             return len(all_match_ids)
         
-        # Apply filters manually to get filtered matches
-        filtered_matches = set()
-        for match_id in all_match_ids:
-            # Get match metadata
-            match_info = self.matches_df[self.matches_df['id'] == match_id]
-            if match_info.empty:
-                filtered_matches.add(match_id)
-                continue
-            
-            # Check if match passes filters
-            if filters.get('seasons') and match_info['year'].iloc[0] not in filters['seasons']:
-                continue
-            if filters.get('venue') and match_info['venue'].iloc[0] not in filters['venue']:
-                continue
-            
-            filtered_matches.add(match_id)
+        # Apply filters to the metadata of those matches in one pass (matches without metadata always count)
+        match_info = self.matches_df[self.matches_df['id'].isin(all_match_ids)].drop_duplicates('id')
+        passes = pd.Series(True, index=match_info.index)
+        if filters.get('seasons'):
+            passes &= match_info['year'].isin(filters['seasons'])
+        if filters.get('venue'):
+            passes &= match_info['venue'].map(lambda venue: venue in filters['venue']).astype(bool)
         
-        return len(filtered_matches)
+        return len(all_match_ids) - len(match_info) + int(passes.sum())
     
+    @traced()
     def _apply_cricket_filters(self, deliveries_df: pd.DataFrame, filters: Dict) -> pd.DataFrame:
         """Apply cricket-specific filters like match_phase, bowler_type, match_situation, etc"""
         if not filters:
             return deliveries_df
+        record_filters('cricket_filters', filters)
+        record_rows('cricket_filters.in', len(deliveries_df))
         
         df = deliveries_df.copy()
         
@@ -616,33 +810,40 @@ class StatsEngine:
         # Drop temporary columns
         df = df.drop(columns=['ball_number'], errors='ignore')
         
+        record_rows('cricket_filters.out', len(df))
         return df
     
-    def _get_batting_stats(self, player: str, filters: Dict = None, total_matches: int = None) -> Dict:
-        """Calculate comprehensive batting statistics"""
-        player_deliveries = self.deliveries_df[self.deliveries_df['batter'] == player].copy()
-        
-        # Apply basic filters (season, venue) first
+    def _apply_match_filters(self, deliveries_df: pd.DataFrame, filters: Dict) -> pd.DataFrame:
+        """Keep deliveries from matches in the filtered seasons and venues"""
         if filters:
             if filters.get('seasons'):
-                player_deliveries = player_deliveries.merge(
+                deliveries_df = deliveries_df.merge(
                     self.matches_df[['id', 'year']], 
                     left_on='match_id', right_on='id', how='inner'
                 )
-                player_deliveries = player_deliveries[player_deliveries['year'].isin(filters['seasons'])]
-                player_deliveries = player_deliveries.drop(columns=['id', 'year'])
+                deliveries_df = deliveries_df[deliveries_df['year'].isin(filters['seasons'])]
+                deliveries_df = deliveries_df.drop(columns=['id', 'year'])
             
             if filters.get('venue'):
-                player_deliveries = player_deliveries.merge(
+                deliveries_df = deliveries_df.merge(
                     self.matches_df[['id', 'venue']], 
                     left_on='match_id', right_on='id', how='inner'
                 )
-                player_deliveries = player_deliveries[player_deliveries['venue'].isin(filters['venue'])]
-                player_deliveries = player_deliveries.drop(columns=['id', 'venue'])
+                deliveries_df = deliveries_df[deliveries_df['venue'].isin(filters['venue'])]
+                deliveries_df = deliveries_df.drop(columns=['id', 'venue'])
+        return deliveries_df
+    
+    def _get_batting_stats(self, player: str, filters: Dict = None, total_matches: int = None) -> Dict:
+        """Calculate comprehensive batting statistics"""
+        player_deliveries = self._player_rows(player, 'batter').copy()
+        
+        # Apply basic filters (season, venue) first
+        player_deliveries = self._apply_match_filters(player_deliveries, filters)
         
         # Apply cricket-specific filters (match_phase, match_situation, vs_conditions, etc)
         player_deliveries = self._apply_cricket_filters(player_deliveries, filters)
         
+        record_rows('batting.deliveries', len(player_deliveries))
         if len(player_deliveries) == 0:
             return {}
         
@@ -696,32 +897,18 @@ class StatsEngine:
     
     def _get_bowling_stats(self, player: str, filters: Dict = None, total_matches: int = None) -> Dict:
         """Calculate comprehensive bowling statistics"""
-        player_deliveries = self.deliveries_df[self.deliveries_df['bowler'] == player].copy()
+        player_deliveries = self._player_rows(player, 'bowler').copy()
         
         # CRITICAL: Exclude super overs (innings 3 and above) - Cricinfo only counts regular innings
         player_deliveries = player_deliveries[player_deliveries['inning'].isin([1, 2])]
         
         # Apply basic filters (season, venue) first
-        if filters:
-            if filters.get('seasons'):
-                player_deliveries = player_deliveries.merge(
-                    self.matches_df[['id', 'year']], 
-                    left_on='match_id', right_on='id', how='inner'
-                )
-                player_deliveries = player_deliveries[player_deliveries['year'].isin(filters['seasons'])]
-                player_deliveries = player_deliveries.drop(columns=['id', 'year'])
-            
-            if filters.get('venue'):
-                player_deliveries = player_deliveries.merge(
-                    self.matches_df[['id', 'venue']], 
-                    left_on='match_id', right_on='id', how='inner'
-                )
-                player_deliveries = player_deliveries[player_deliveries['venue'].isin(filters['venue'])]
-                player_deliveries = player_deliveries.drop(columns=['id', 'venue'])
+        player_deliveries = self._apply_match_filters(player_deliveries, filters)
         
         # Apply cricket-specific filters (match_phase, match_situation, vs_conditions, etc)
         player_deliveries = self._apply_cricket_filters(player_deliveries, filters)
         
+        record_rows('bowling.deliveries', len(player_deliveries))
         if len(player_deliveries) == 0:
             return {}
         
@@ -806,12 +993,134 @@ class StatsEngine:
             'dot_ball_percentage': dot_ball_percentage
         }
     
+    # ===== BATCHED PLAYER STATS =====
+    # Same figures as _get_total_matches/_get_batting_stats/_get_bowling_stats, for many players in one pass
+    
+    def _get_total_matches_batch(self, batter_rows: pd.DataFrame, bowler_rows: pd.DataFrame,
+                                 filters: Dict = None) -> Dict[str, int]:
+        """Matches each player appeared in (batted or bowled in inning 1 or 2), after season/venue filters"""
+        appearances = pd.concat([
+            batter_rows.loc[batter_rows['inning'].isin([1, 2]), ['batter', 'match_id']].set_axis(['player', 'match_id'], axis=1),
+            bowler_rows.loc[bowler_rows['inning'].isin([1, 2]), ['bowler', 'match_id']].set_axis(['player', 'match_id'], axis=1),
+        ]).drop_duplicates()
+        
+        if filters and (filters.get('seasons') or filters.get('venue')):
+            # Matches without metadata always count, as in _get_total_matches
+            match_info = self.matches_df[['id', 'year', 'venue']].drop_duplicates('id')
+            appearances = appearances.merge(match_info, left_on='match_id', right_on='id', how='left')
+            passes = appearances['id'].isna()
+            known = pd.Series(True, index=appearances.index)
+            if filters.get('seasons'):
+                known &= appearances['year'].isin(filters['seasons'])
+            if filters.get('venue'):
+                known &= appearances['venue'].map(lambda venue: venue in filters['venue']).astype(bool)
+            appearances = appearances[passes | known]
+        
+        return {player: int(count) for player, count in appearances.groupby('player').size().items()}
+    
+    def _get_batting_stats_batch(self, batter_rows: pd.DataFrame, filters: Dict = None,
+                                 total_matches: Dict[str, int] = None) -> Dict[str, Dict]:
+        """Batting stats per batter in batter_rows: one filter application, one grouped aggregation"""
+        df = self._apply_match_filters(batter_rows, filters)
+        df = self._apply_cricket_filters(df, filters)
+        record_rows('batting.deliveries', len(df))
+        if len(df) == 0:
+            return {}
+        
+        runs = df['batsman_runs']
+        valid = (df['extras_type'] != 'wides') & (df['extras_type'] != 'noballs')
+        totals = pd.DataFrame({
+            'batter': df['batter'], 'runs': runs, 'balls': 1, 'fours': (runs == 4).astype(int),
+            'sixes': (runs == 6).astype(int), 'valid': valid.astype(int), 'dots': (valid & (runs == 0)).astype(int),
+        }).groupby('batter').sum()
+        innings = df[df['inning'].isin([1, 2])][['batter', 'match_id', 'inning']].drop_duplicates().groupby('batter').size()
+        dismissals = df[df['is_wicket'] == 1][['batter', 'match_id', 'inning']].drop_duplicates().groupby('batter').size()
+        match_scores = df.groupby(['batter', 'match_id'])['batsman_runs'].sum().groupby(level=0)
+        highest = match_scores.max()
+        centuries = match_scores.apply(lambda scores: int((scores >= 100).sum()))
+        fifties = match_scores.apply(lambda scores: int(((scores >= 50) & (scores < 100)).sum()))
+        
+        results = {}
+        for player, row in totals.iterrows():
+            player_runs = totals.at[player, 'runs']
+            player_dismissals = int(dismissals.get(player, 0))
+            valid_count = int(row['valid'])
+            dot_balls = int(row['dots'])
+            results[player] = {
+                'matches': (total_matches or {}).get(player, 0),
+                'innings': int(innings.get(player, 0)),
+                'runs': int(player_runs),
+                'balls': int(row['balls']),
+                'average': round(player_runs / player_dismissals, 2) if player_dismissals > 0 else 0,
+                'strike_rate': round((player_runs / valid_count * 100), 2) if valid_count > 0 else 0,
+                'highest_score': int(highest[player]),
+                'centuries': int(centuries[player]),
+                'fifties': int(fifties[player]),
+                'fours': int(row['fours']),
+                'sixes': int(row['sixes']),
+                'dot_balls': dot_balls,
+                'dot_ball_percentage': round((dot_balls / valid_count * 100), 2) if valid_count > 0 else 0
+            }
+        return results
+    
+    def _get_bowling_stats_batch(self, bowler_rows: pd.DataFrame, filters: Dict = None,
+                                 total_matches: Dict[str, int] = None) -> Dict[str, Dict]:
+        """Bowling stats per bowler in bowler_rows: one filter application, one grouped aggregation"""
+        df = bowler_rows[bowler_rows['inning'].isin([1, 2])]
+        df = self._apply_match_filters(df, filters)
+        df = self._apply_cricket_filters(df, filters)
+        record_rows('bowling.deliveries', len(df))
+        if len(df) == 0:
+            return {}
+        
+        valid = (df['extras_type'] != 'wides') & (df['extras_type'] != 'noballs')
+        conceded = df['total_runs'].where(~df['extras_type'].isin(['legbyes', 'byes']), 0)
+        totals = pd.DataFrame({
+            'bowler': df['bowler'],
+            'wickets': ((df['is_wicket'] == 1) & (df['dismissal_kind'] != 'run out')).astype(int),
+            'conceded': conceded, 'valid': valid.astype(int), 'dots': (valid & (df['total_runs'] == 0)).astype(int),
+        }).groupby('bowler').sum()
+        innings = df[['bowler', 'match_id', 'inning']].drop_duplicates().groupby('bowler').size()
+        
+        # Per match: all wickets (as in best figures and 4-wicket hauls) and runs conceded
+        per_match = pd.DataFrame({'bowler': df['bowler'], 'match_id': df['match_id'], 'wickets': df['is_wicket'],
+                                  'runs': conceded}).groupby(['bowler', 'match_id']).sum().reset_index()
+        best = per_match.sort_values(['bowler', 'wickets', 'runs'], ascending=[True, False, True],
+                                     kind='mergesort').drop_duplicates('bowler').set_index('bowler')
+        four_wickets = (per_match['wickets'] >= 4).groupby(per_match['bowler']).sum()
+        over_runs = df.groupby(['bowler', 'match_id', 'inning', 'over'])['total_runs'].sum()
+        maidens = (over_runs == 0).groupby(level=0).sum()
+        
+        results = {}
+        for player, row in totals.iterrows():
+            runs_conceded = totals.at[player, 'conceded']
+            wickets = int(row['wickets'])
+            balls = int(row['valid'])
+            dot_balls = int(row['dots'])
+            results[player] = {
+                'matches': (total_matches or {}).get(player, 0),
+                'innings': int(innings.get(player, 0)),
+                'wickets': wickets,
+                'runs_conceded': int(runs_conceded),
+                'balls': balls,
+                'overs': round(balls / 6, 1),
+                'economy': round((runs_conceded / (balls / 6)), 2) if balls > 0 else 0,
+                'average': round(runs_conceded / wickets, 2) if wickets > 0 else 0,
+                'best_figures': f"{int(best.at[player, 'wickets'])}/{int(best.at[player, 'runs'])}",
+                'four_wickets': int(four_wickets.get(player, 0)),
+                'maiden_overs': int(maidens.get(player, 0)),
+                'dot_balls': dot_balls,
+                'dot_ball_percentage': round((dot_balls / balls * 100), 2) if balls > 0 else 0
+            }
+        return results
+    
     def _get_highest_score(self, player: str) -> int:
         """Get highest score by a player"""
         player_deliveries = self.deliveries_df[self.deliveries_df['batter'] == player]
         match_scores = player_deliveries.groupby('match_id')['batsman_runs'].sum()
         return match_scores.max() if len(match_scores) > 0 else 0
     
+    @traced()
     def get_team_stats(self, team: str, filters: Dict = None) -> Dict:
         """Get team statistics with optional filters"""
         # Try to find the team first
@@ -819,40 +1128,50 @@ class StatsEngine:
         if not found_team:
             return {'error': f'Team {team} not found'}
         
-        team_matches = self.matches_df[
-            (self.matches_df['team1'] == found_team) | (self.matches_df['team2'] == found_team)
-        ].copy()
+        key = self._cache_key('team_stats', found_team, normalize_filters(filters))
+        return self._result_cache.get_or_compute(key, lambda: self._compute_team_stats(found_team, filters))
+    
+    @traced()
+    def _compute_team_stats(self, found_team: str, filters: Dict = None) -> Dict:
+        # Whole-career and season-only queries are served from the team-season table
+        if not filters or not any(v for k, v in filters.items() if k != 'seasons'):
+            seasons = self.team_tables.get_team_seasons(found_team)
+            if filters and filters.get('seasons'):
+                seasons = seasons[seasons['year'].isin(filters['seasons'])]
+            wins = int(seasons['wins'].sum())
+            total_matches = int(seasons['matches'].sum())
+            return {
+                'team': found_team,
+                'matches': total_matches,
+                'wins': wins,
+                'win_percentage': round((wins / total_matches * 100), 2) if total_matches > 0 else 0,
+                'win_rate': round((wins / total_matches), 2) if total_matches > 0 else 0
+            }
         
-        # Apply filters if provided
-        if filters:
-            if filters.get('seasons'):
-                team_matches = team_matches[team_matches['year'].isin(filters['seasons'])]
-            
-            if filters.get('venue'):
-                venues = filters['venue'] if isinstance(filters['venue'], list) else [filters['venue']]
-                team_matches = team_matches[team_matches['venue'].isin(venues)]
-            
-            # Home/Away filter
-            if filters.get('home_away'):
-                if filters['home_away'] == 'home':
-                    team_matches = team_matches[team_matches['team1'] == found_team]
-                elif filters['home_away'] == 'away':
-                    team_matches = team_matches[team_matches['team2'] == found_team]
-            
-            # Innings order filter - filter deliveries and get match_ids
-            if filters.get('innings_order'):
-                # Get deliveries for this team's matches with specified inning order
-                team_match_ids = set(team_matches['id'].unique())
-                team_deliveries = self.deliveries_df[
-                    (self.deliveries_df['match_id'].isin(team_match_ids)) &
-                    (self.deliveries_df['inning'] == filters['innings_order'])
-                ]
-                if len(team_deliveries) > 0:
-                    team_matches = team_matches[team_matches['id'].isin(team_deliveries['match_id'].unique())]
-                else:
-                    team_matches = team_matches.iloc[0:0]  # Empty dataframe
+        # Filtered queries use the same per-team match rows (franchise names merged, ties decided)
+        team_matches = self.team_tables.team_matches
+        team_matches = team_matches[team_matches['team'] == normalize_team(found_team)]
+        
+        if filters.get('seasons'):
+            team_matches = team_matches[team_matches['year'].isin(filters['seasons'])]
         
-        wins = len(team_matches[team_matches['winner'] == found_team])
+        if filters.get('venue'):
+            venues = filters['venue'] if isinstance(filters['venue'], list) else [filters['venue']]
+            team_matches = team_matches[team_matches['venue'].isin(venues)]
+        
+        # Home/Away filter: the home side is team1
+        if filters.get('home_away') in ('home', 'away'):
+            team_matches = team_matches[team_matches['is_home'] == (filters['home_away'] == 'home')]
+        
+        # Innings order filter - filter deliveries and get match_ids
+        if filters.get('innings_order'):
+            team_deliveries = self.deliveries_df[
+                (self.deliveries_df['match_id'].isin(set(team_matches['match_id']))) &
+                (self.deliveries_df['inning'] == filters['innings_order'])
+            ]
+            team_matches = team_matches[team_matches['match_id'].isin(team_deliveries['match_id'].unique())]
+        
+        wins = int(team_matches['won'].sum())
         total_matches = len(team_matches)
         
         return {
@@ -863,6 +1182,77 @@ class StatsEngine:
             'win_rate': round((wins / total_matches), 2) if total_matches > 0 else 0
         }
     
+    @traced()
+    def get_team_phase_stats(self, team: str, filters: Dict = None, role: str = 'batting') -> Dict:
+        """Get team batting (or bowling) aggregates from the team-innings table, optionally by phase"""
+        found_team = self.find_team(team)
+        if not found_team:
+            return {'error': f'Team {team} not found'}
+        
+        filters = filters or {}
+        return self.team_tables.get_team_phase_stats(found_team, seasons=filters.get('seasons'),
+                                                     phase=filters.get('match_phase'), role=role)
+    
+    @traced()
+    def get_teams_stats_batch(self, teams: List[str], filters: Dict = None, role: str = 'batting') -> Dict[str, Dict]:
+        """get_team_phase_stats() for several teams from one grouped pass, keyed by resolved team name"""
+        found_teams = []
+        for team in teams:
+            found_team = self.find_team(team)
+            if found_team and found_team not in found_teams:
+                found_teams.append(found_team)
+        
+        filters = filters or {}
+        return self.team_tables.get_teams_phase_stats(found_teams, seasons=filters.get('seasons'),
+                                                       phase=filters.get('match_phase'), role=role)
+
+    @traced()
+    def get_teams_summary_batch(self, teams: List[str], filters: Dict = None) -> Dict[str, Dict]:
+        """Win/loss record plus batting and bowling aggregates for several teams, keyed by resolved team name
+
+        Honours the seasons (record and aggregates) and match_phase (aggregates) filters.
+        Each part is one grouped pass over a team table for all the teams together;
+        records share the get_team_stats cache entries. Unknown names are left out.
+        """
+        found_teams = []
+        for team in teams:
+            found_team = self.find_team(team)
+            if found_team and found_team not in found_teams:
+                found_teams.append(found_team)
+
+        filters = filters or {}
+        seasons = filters.get('seasons')
+        season_filters = {'seasons': seasons} if seasons else None
+        records, missing = {}, []
+        for team in found_teams:
+            hit, record = self._result_cache.get(self._cache_key('team_stats', team, normalize_filters(season_filters)))
+            if hit:
+                records[team] = record
+            else:
+                missing.append(team)
+
+        if missing:
+            for team, counts in self.team_tables.get_teams_record(missing, seasons=seasons).items():
+                wins, total_matches = counts['wins'], counts['matches']
+                records[team] = {
+                    'team': team,
+                    'matches': total_matches,
+                    'wins': wins,
+                    'win_percentage': round((wins / total_matches * 100), 2) if total_matches > 0 else 0,
+                    'win_rate': round((wins / total_matches), 2) if total_matches > 0 else 0
+                }
+                self._result_cache.set(self._cache_key('team_stats', team, normalize_filters(season_filters)), records[team])
+
+        batting = self.team_tables.get_teams_phase_stats(found_teams, seasons=seasons,
+                                                         phase=filters.get('match_phase'), role='batting')
+        bowling = self.team_tables.get_teams_phase_stats(found_teams, seasons=seasons,
+                                                         phase=filters.get('match_phase'), role='bowling')
+        return {
+            team: {**records[team], 'batting': batting[team], 'bowling': bowling[team]}
+            for team in found_teams
+        }
+
+    @traced()
     def get_venue_stats(self, venue: str) -> Dict:
         """Get statistics for a specific venue"""
         venue_matches = self.matches_df[self.matches_df['venue'] == venue]
@@ -874,6 +1264,7 @@ class StatsEngine:
             'seasons': venue_matches['season'].nunique()
         }
     
+    @traced()
     def get_player_form(self, player: str, last_n_matches: int = 10) -> Dict:
         """Get recent form of a player"""
         player_deliveries = self.deliveries_df[self.deliveries_df['batter'] == player]
@@ -887,6 +1278,7 @@ class StatsEngine:
             'last_match_runs': int(recent_innings.iloc[-1]) if len(recent_innings) > 0 else 0
         }
     
+    @traced()
     def get_top_performers(self, category: str, n: int = 10) -> List[Dict]:
         """Get top performers by category"""
         if category == 'batting':
@@ -899,64 +1291,103 @@ class StatsEngine:
         
         return []
     
+    @traced()
     def get_player_head_to_head(self, player1: str, player2: str, filters: Dict = None) -> Dict:
         """Get head-to-head statistics between two players (batter vs bowler)"""
+        key = self._cache_key('head_to_head', player1, player2, normalize_filters(filters))
         try:
-            # Get deliveries where player1 batted and player2 bowled
-            h2h_deliveries = self.deliveries_df[
-                (self.deliveries_df['batter'] == player1) & 
-                (self.deliveries_df['bowler'] == player2)
-            ].copy()
-            
-            # Apply basic filters (seasons, venue) first
-            if filters:
-                if filters.get('seasons'):
-                    h2h_deliveries = h2h_deliveries.merge(
-                        self.matches_df[['id', 'year']], 
-                        left_on='match_id', right_on='id', how='inner'
-                    )
-                    h2h_deliveries = h2h_deliveries[h2h_deliveries['year'].isin(filters['seasons'])]
-                    h2h_deliveries = h2h_deliveries.drop(columns=['id', 'year'])
-                
-                if filters.get('venue'):
-                    h2h_deliveries = h2h_deliveries.merge(
-                        self.matches_df[['id', 'venue']], 
-                        left_on='match_id', right_on='id', how='inner'
-                    )
-                    h2h_deliveries = h2h_deliveries[h2h_deliveries['venue'].isin(filters['venue'])]
-                    h2h_deliveries = h2h_deliveries.drop(columns=['id', 'venue'])
-                
-                # Apply cricket-specific filters (match_phase, match_situation, etc)
-                h2h_deliveries = self._apply_cricket_filters(h2h_deliveries, filters)
-            
-            if len(h2h_deliveries) == 0:
+            return self._result_cache.get_or_compute(key, lambda: self._compute_player_head_to_head(player1, player2, filters))
+        except Exception as e:
+            # Raised out of the computation so failures are never cached
+            return {'error': True, 'message': str(e)}
+    
+    @traced()
+    def _compute_player_head_to_head(self, player1: str, player2: str, filters: Dict = None) -> Dict:
+        # Fast path: season/phase slices are served straight from the matchup matrix
+        if MatchupMatrix.supports(filters):
+            filters = filters or {}
+            cell = self.matchups.get(player1, player2, filters.get('seasons'), filters.get('match_phase'))
+            if cell['deliveries'] == 0:
                 return {
                     'message': f'{player1} and {player2} have not faced each other',
                     'error': True
                 }
-            
-            # Calculate stats
-            deliveries = len(h2h_deliveries)
-            runs = h2h_deliveries['batsman_runs'].sum()
+            deliveries = cell['deliveries']
+            runs = cell['runs']
             strike_rate = (runs / deliveries * 100) if deliveries > 0 else 0
-            dot_balls = len(h2h_deliveries[h2h_deliveries['batsman_runs'] == 0])
-            
             return {
                 'deliveries': deliveries,
-                'runs': int(runs),
+                'runs': runs,
                 'strike_rate': round(strike_rate, 2),
-                'dot_balls': dot_balls,
-                'summary': f'{player1} has faced {deliveries} balls from {player2}, scoring {int(runs)} runs at a strike rate of {strike_rate:.1f}'
+                'dot_balls': cell['dots'],
+                'dismissals': cell['dismissals'],
+                'summary': f'{player1} has faced {deliveries} balls from {player2}, scoring {runs} runs at a strike rate of {strike_rate:.1f}'
             }
-        except Exception as e:
-            return {'error': True, 'message': str(e)}
+        
+        # Get deliveries where player1 batted and player2 bowled
+        batter_rows = self._player_rows(player1, 'batter')
+        h2h_deliveries = batter_rows[batter_rows['bowler'] == player2].copy()
+        
+        # Apply basic filters (seasons, venue) first
+        if filters:
+            if filters.get('seasons'):
+                h2h_deliveries = h2h_deliveries.merge(
+                    self.matches_df[['id', 'year']], 
+                    left_on='match_id', right_on='id', how='inner'
+                )
+                h2h_deliveries = h2h_deliveries[h2h_deliveries['year'].isin(filters['seasons'])]
+                h2h_deliveries = h2h_deliveries.drop(columns=['id', 'year'])
+            
+            if filters.get('venue'):
+                h2h_deliveries = h2h_deliveries.merge(
+                    self.matches_df[['id', 'venue']], 
+                    left_on='match_id', right_on='id', how='inner'
+                )
+                h2h_deliveries = h2h_deliveries[h2h_deliveries['venue'].isin(filters['venue'])]
+                h2h_deliveries = h2h_deliveries.drop(columns=['id', 'venue'])
+            
+            # Apply cricket-specific filters (match_phase, match_situation, etc)
+            h2h_deliveries = self._apply_cricket_filters(h2h_deliveries, filters)
+        
+        if len(h2h_deliveries) == 0:
+            return {
+                'message': f'{player1} and {player2} have not faced each other',
+                'error': True
+            }
+        
+        # Calculate stats
+        deliveries = len(h2h_deliveries)
+        runs = h2h_deliveries['batsman_runs'].sum()
+        strike_rate = (runs / deliveries * 100) if deliveries > 0 else 0
+        dot_balls = len(h2h_deliveries[h2h_deliveries['batsman_runs'] == 0])
+        dismissals = len(h2h_deliveries[
+            (h2h_deliveries['is_wicket'] == 1) &
+            (h2h_deliveries['player_dismissed'] == player1) &
+            (~h2h_deliveries['dismissal_kind'].isin(MatchupMatrix.NON_BOWLER_DISMISSALS))
+        ])
+        
+        return {
+            'deliveries': deliveries,
+            'runs': int(runs),
+            'strike_rate': round(strike_rate, 2),
+            'dot_balls': dot_balls,
+            'dismissals': dismissals,
+            'summary': f'{player1} has faced {deliveries} balls from {player2}, scoring {int(runs)} runs at a strike rate of {strike_rate:.1f}'
+        }
     
+    @traced()
     def get_bowling_subtype_breakdown(self, player: str, vs_condition: str, filters: Dict = None) -> Dict:
         """Get batting stats breakdown by bowling sub-types
         
         For vs_spin, returns: vs_right_arm_off_spin, vs_left_arm_off_spin, vs_right_arm_leg_spin, vs_left_arm_leg_spin
         For vs_pace, returns: vs_right_arm_pace, vs_left_arm_pace
         """
+        key = self._cache_key('subtype_breakdown', player, vs_condition, normalize_filters(filters))
+        return self._result_cache.get_or_compute(
+            key, lambda: self._compute_bowling_subtype_breakdown(player, vs_condition, filters))
+    
+    @traced()
+    def _compute_bowling_subtype_breakdown(self, player: str, vs_condition: str, filters: Dict = None) -> Dict:
         base_filters = filters.copy() if filters else {}
         breakdown = {}
         
@@ -986,8 +1417,14 @@ class StatsEngine:
         
         return breakdown
 
+    @traced()
     def get_bowling_handedness_breakdown(self, player: str, filters: Dict = None) -> Dict:
         """Get bowling stats breakdown by batter handedness (RHB vs LHB)"""
+        key = self._cache_key('handedness_breakdown', player, normalize_filters(filters))
+        return self._result_cache.get_or_compute(key, lambda: self._compute_bowling_handedness_breakdown(player, filters))
+    
+    @traced()
+    def _compute_bowling_handedness_breakdown(self, player: str, filters: Dict = None) -> Dict:
         base_filters = filters.copy() if filters else {}
         breakdown = {}
         
@@ -995,7 +1432,7 @@ class StatsEngine:
         left_hand_batters = set(self._batter_handedness.get('left_hand_batters', []))
         
         # Get bowler's deliveries
-        player_deliveries = self.deliveries_df[self.deliveries_df['bowler'] == player].copy()
+        player_deliveries = self._player_rows(player, 'bowler').copy()
         
         # Apply basic filters first
         if base_filters:
@@ -1052,80 +1489,62 @@ class StatsEngine:
             'strike_rate': round((wickets / balls * 100), 2) if balls > 0 else 0,
         }
 
+    @traced()
     def get_league_rankings(self, metric: str = 'runs', seasons: List[int] = None, 
                             match_phase: str = None, limit: int = 10) -> List[Dict]:
         """Get league rankings for a specific metric
         
         Metrics: 'runs', 'wickets', 'strike_rate', 'economy', 'consistency', 'matches'
         """
-        players = self._get_all_players()
+        key = self._cache_key('league_rankings', metric, normalize_filters({'seasons': seasons}), match_phase, limit)
+        return self._result_cache.get_or_compute(
+            key, lambda: self._compute_league_rankings(metric, seasons, match_phase, limit))
+    
+    @traced()
+    def _compute_league_rankings(self, metric: str = 'runs', seasons: List[int] = None,
+                                 match_phase: str = None, limit: int = 10) -> List[Dict]:
+        filters = {}
+        if seasons:
+            filters['seasons'] = seasons
+        if match_phase:
+            filters['match_phase'] = match_phase
+        
+        # One grouped pass over every player; uncached, as caching each would flood the cache
+        all_stats = self._compute_players_stats_batch(self._get_all_players(), filters if filters else None)
         rankings = []
         
-        for player in players:
-            try:
-                filters = {}
-                if seasons:
-                    filters['seasons'] = seasons
-                if match_phase:
-                    filters['match_phase'] = match_phase
-                
-                stats = self.get_player_stats(player, filters if filters else None)
-                
-                if metric == 'runs':
-                    value = stats.get('batting', {}).get('runs', 0)
-                    if value > 0:
-                        rankings.append({
-                            'player': player,
-                            'value': value,
-                            'metric': 'Runs'
-                        })
-                elif metric == 'wickets':
-                    value = stats.get('bowling', {}).get('wickets', 0)
-                    if value > 0:
-                        rankings.append({
-                            'player': player,
-                            'value': value,
-                            'metric': 'Wickets'
-                        })
-                elif metric == 'strike_rate':
-                    value = stats.get('batting', {}).get('strike_rate', 0)
-                    if value > 0 and stats.get('batting', {}).get('balls', 0) >= 100:  # Min 100 balls for SR ranking
-                        rankings.append({
-                            'player': player,
-                            'value': round(value, 2),
-                            'metric': 'Strike Rate'
-                        })
-                elif metric == 'economy':
-                    value = stats.get('bowling', {}).get('economy', 0)
-                    if value > 0 and stats.get('bowling', {}).get('balls', 0) >= 240:  # Min 240 balls (40 overs)
-                        rankings.append({
-                            'player': player,
-                            'value': round(value, 2),
-                            'metric': 'Economy'
-                        })
-                elif metric == 'matches':
-                    value = stats.get('batting', {}).get('matches', 0) + stats.get('bowling', {}).get('matches', 0)
-                    if value > 0:
-                        rankings.append({
-                            'player': player,
-                            'value': value,
-                            'metric': 'Matches'
-                        })
-                elif metric == 'average':
-                    value = stats.get('batting', {}).get('average', 0)
-                    if value > 0 and stats.get('batting', {}).get('innings', 0) >= 10:  # Min 10 innings for average
-                        rankings.append({
-                            'player': player,
-                            'value': round(value, 2),
-                            'metric': 'Batting Average'
-                        })
-            except:
-                pass
+        for player, stats in all_stats.items():
+            batting, bowling = stats.get('batting', {}), stats.get('bowling', {})
+            if metric == 'runs':
+                value = batting.get('runs', 0)
+                if value > 0:
+                    rankings.append({'player': player, 'value': value, 'metric': 'Runs'})
+            elif metric == 'wickets':
+                value = bowling.get('wickets', 0)
+                if value > 0:
+                    rankings.append({'player': player, 'value': value, 'metric': 'Wickets'})
+            elif metric == 'strike_rate':
+                value = batting.get('strike_rate', 0)
+                if value > 0 and batting.get('balls', 0) >= 100:  # Min 100 balls for SR ranking
+                    rankings.append({'player': player, 'value': round(value, 2), 'metric': 'Strike Rate'})
+            elif metric == 'economy':
+                value = bowling.get('economy', 0)
+                if value > 0 and bowling.get('balls', 0) >= 240:  # Min 240 balls (40 overs)
+                    rankings.append({'player': player, 'value': round(value, 2), 'metric': 'Economy'})
+            elif metric == 'matches':
+                value = batting.get('matches', 0) + bowling.get('matches', 0)
+                if value > 0:
+                    rankings.append({'player': player, 'value': value, 'metric': 'Matches'})
+            elif metric == 'average':
+                value = batting.get('average', 0)
+                if value > 0 and batting.get('innings', 0) >= 10:  # Min 10 innings for average
+                    rankings.append({'player': player, 'value': round(value, 2), 'metric': 'Batting Average'})
         
         # Sort by value descending and return top N
         rankings.sort(key=lambda x: x['value'], reverse=True)
         return rankings[:limit]
     
+    @traced()
     def get_player_records(self, player: str) -> Dict:
         """Get all records for a player"""
         found_player = self.find_player(player)
@@ -1158,6 +1577,7 @@ class StatsEngine:
             }
         }
     
+    @traced()
     def get_ground_performance(self, player: str, ground: str) -> Dict:
         """Get player's performance at a specific ground"""
         found_player = self.find_player(player)
@@ -1174,6 +1594,7 @@ class StatsEngine:
             'bowling': stats.get('bowling', {})
         }
     
+    @traced()
     def get_player_comparison(self, players: List[str], metric: str = 'runs') -> Dict:
         """Compare multiple players on a specific metric"""
         comparison = {}
@@ -1204,6 +1625,7 @@ class StatsEngine:
         
         return comparison
 
+    @traced()
     def get_primary_skill(self, player: str) -> str:
         """Determine a player's primary skill (batter/bowler) based on participation
         
@@ -0,0 +1,381 @@
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional
+from cricket_conventions import PHASES, TEAM_NAME_MAPPING, normalize_team, phase_codes
+
+
+class TeamTables:
+    """Materialized team-level tables built once from the matches data
+
+    - team_seasons: one row per team x season (matches, wins, losses, no results,
+      win %, home record, rank within the season, champion flag)
+    - team_overall: one row per team across all seasons (with overall rank and titles)
+    - champions: one row per season with the final and its winner
+    - team_innings: one row per match x batting team (totals, phase splits, boundaries)
+    - points_table: league standings per season (played, won, lost, NR, points, NRR)
+    """
+
+    PHASES = PHASES
+
+    # Dismissals that don't cost the batting side a wicket
+    NOT_WICKETS = ['retired hurt']
+
+    PLAYOFF_TYPES = ['Final', 'Qualifier 1', 'Qualifier 2', 'Eliminator', 'Semi Final',
+                     'Elimination Final', '3rd Place Play-Off']
+
+    # Seasons without labelled playoffs (e.g. 2025) end with at most this many knockout matches
+    UNLABELLED_PLAYOFF_MATCHES = 4
+
+    FULL_OVERS = 20
+    POINTS_FOR_WIN = 2
+    POINTS_FOR_NO_RESULT = 1
+
+    def __init__(self, matches_df: pd.DataFrame, deliveries_df: pd.DataFrame = None):
+        self.matches_df = matches_df
+        self.deliveries_df = deliveries_df
+        matches_df = matches_df.replace({col: TEAM_NAME_MAPPING for col in ['team1', 'team2', 'winner', 'toss_winner']})
+        if deliveries_df is not None:
+            matches_df = self._resolve_tie_winners(matches_df, deliveries_df)
+
+        self.team_matches = self._build_team_matches(matches_df)
+        self.champions = self._build_champions(matches_df)
+        self.team_seasons = self._build_team_seasons()
+        self.team_overall = self._build_team_overall()
+        self.team_innings = self._build_team_innings(deliveries_df, matches_df) if deliveries_df is not None else None
+        self.points_table = self._build_points_table(matches_df)
+
+    def _resolve_tie_winners(self, matches_df: pd.DataFrame, deliveries_df: pd.DataFrame) -> pd.DataFrame:
+        """Ties recorded without a winner (e.g. 2025's DC v RR) go to the side that won the last super over"""
+        unresolved = matches_df['winner'].isna() & (matches_df['result'] == 'tie')
+        if not unresolved.any():
+            return matches_df
+
+        super_overs = deliveries_df[(deliveries_df['inning'] >= 3)
+                                    & deliveries_df['match_id'].isin(matches_df.loc[unresolved, 'id'])]
+        totals = super_overs.groupby(['match_id', 'inning']).agg(
+            team=('batting_team', 'first'), runs=('total_runs', 'sum')).reset_index()
+        winners = {}
+        for match_id, innings in totals.groupby('match_id'):
+            last_pair = innings.nlargest(2, 'inning')
+            if len(last_pair) == 2 and last_pair['runs'].nunique() == 2:
+                winners[match_id] = self._normalize_team(last_pair.loc[last_pair['runs'].idxmax(), 'team'])
+
+        matches_df = matches_df.copy()
+        resolved = unresolved & matches_df['id'].isin(winners)
+        matches_df.loc[resolved, 'winner'] = matches_df.loc[resolved, 'id'].map(winners)
+        return matches_df
+
+    def _build_team_matches(self, matches_df: pd.DataFrame) -> pd.DataFrame:
+        """Long format: one row per match x participating team"""
+        cols = ['id', 'season', 'year', 'date', 'venue', 'winner', 'result', 'result_margin']
+        home = matches_df[cols + ['team1', 'team2']].rename(columns={'team1': 'team', 'team2': 'opponent'})
+        home['is_home'] = True
+        away = matches_df[cols + ['team2', 'team1']].rename(columns={'team2': 'team', 'team1': 'opponent'})
+        away['is_home'] = False
+
+        long = pd.concat([home, away], ignore_index=True).rename(columns={'id': 'match_id'})
+        long['won'] = (long['winner'] == long['team']).astype(int)
+        long['no_result'] = long['winner'].isna().astype(int)
+        long['lost'] = 1 - long['won'] - long['no_result']
+        return long
+
+    def _build_champions(self, matches_df: pd.DataFrame) -> pd.DataFrame:
+        """Final of each season: the match labelled 'Final', else the last match by date"""
+        df = matches_df[['id', 'season', 'year', 'date', 'match_type', 'team1', 'team2', 'winner', 'venue']].copy()
+        df['_date'] = pd.to_datetime(df['date'], errors='coerce')
+        df['_is_final'] = (df['match_type'] == 'Final').astype(int)
+
+        # Labelled finals sort last, then latest date, then highest id
+        df = df.sort_values(['year', '_is_final', '_date', 'id'])
+        finals = df.groupby('year', sort=True).tail(1)
+
+        champions = finals.rename(columns={'id': 'final_match_id', 'winner': 'champion'})
+        champions = champions[['year', 'season', 'final_match_id', 'date', 'team1', 'team2', 'champion', 'venue']]
+        return champions.reset_index(drop=True)
+
+    def _build_team_seasons(self) -> pd.DataFrame:
+        grouped = self.team_matches.groupby(['team', 'year'], sort=True)
+        table = grouped.agg(
+            season=('season', 'first'),
+            matches=('match_id', 'size'),
+            wins=('won', 'sum'),
+            losses=('lost', 'sum'),
+            no_results=('no_result', 'sum'),
+            home_matches=('is_home', 'sum'),
+        ).reset_index()
+
+        home = self.team_matches[self.team_matches['is_home']]
+        home_wins = home.groupby(['team', 'year'])['won'].sum().rename('home_wins')
+        table = table.merge(home_wins, on=['team', 'year'], how='left')
+        table['home_wins'] = table['home_wins'].fillna(0).astype(int)
+
+        table['win_percentage'] = (table['wins'] / table['matches'] * 100).round(2)
+        table['rank'] = table.groupby('year')['win_percentage'].rank(method='min', ascending=False).astype(int)
+
+        champion_of = self.champions.set_index('year')['champion']
+        table['champion'] = table['year'].map(champion_of) == table['team']
+        return table
+
+    def _build_team_overall(self) -> pd.DataFrame:
+        grouped = self.team_matches.groupby('team', sort=False)
+        table = grouped.agg(
+            matches=('match_id', 'size'),
+            wins=('won', 'sum'),
+            losses=('lost', 'sum'),
+            no_results=('no_result', 'sum'),
+            seasons=('year', 'nunique'),
+            avg_result_margin=('result_margin', 'mean'),
+        )
+        table['win_percentage'] = (table['wins'] / table['matches'] * 100).round(2)
+        table['titles'] = self.champions['champion'].value_counts().reindex(table.index, fill_value=0)
+
+        # Stable sort keeps first-appearance order for teams tied on win %
+        table = table.sort_values('win_percentage', ascending=False, kind='mergesort')
+        table['rank'] = np.arange(1, len(table) + 1)
+        return table.reset_index()
+
+    def _build_team_innings(self, deliveries_df: pd.DataFrame, matches_df: pd.DataFrame) -> pd.DataFrame:
+        """Aggregate deliveries into one row per match x batting team in one grouped pass"""
+        df = deliveries_df[deliveries_df['inning'] <= 2]  # Super overs are not part of the innings
+
+        phase = phase_codes(df['over'].to_numpy())
+        runs = df['total_runs'].to_numpy()
+        balls = (~df['extras_type'].isin(['wides', 'noballs'])).to_numpy().astype(int)
+        wickets = ((df['is_wicket'] == 1) & (~df['dismissal_kind'].isin(self.NOT_WICKETS))).to_numpy().astype(int)
+
+        frame = pd.DataFrame({
+            'match_id': df['match_id'].to_numpy(),
+            'inning': df['inning'].to_numpy(),
+            'runs': runs,
+            'balls': balls,
+            'wickets': wickets,
+            'fours': (df['batsman_runs'] == 4).to_numpy().astype(int),
+            'sixes': (df['batsman_runs'] == 6).to_numpy().astype(int),
+        })
+        for code, name in enumerate(self.PHASES):
+            in_phase = phase == code
+            frame[f'{name}_runs'] = np.where(in_phase, runs, 0)
+            frame[f'{name}_balls'] = np.where(in_phase, balls, 0)
+            frame[f'{name}_wickets'] = np.where(in_phase, wickets, 0)
+
+        innings = frame.groupby(['match_id', 'inning'], sort=True).sum().reset_index()
+
+        # Team names follow matches_df (deliveries may carry a franchise's older name)
+        order = self._batting_order(matches_df)
+        first = innings['inning'] == 1
+        batting = innings['match_id'].map(order['batted_first']).where(first, innings['match_id'].map(order['batted_second']))
+        bowling = innings['match_id'].map(order['batted_second']).where(first, innings['match_id'].map(order['batted_first']))
+        innings.insert(2, 'batting_team', batting)
+        innings.insert(3, 'bowling_team', bowling)
+
+        seasons = matches_df.set_index('id')[['year', 'season', 'venue']]
+        innings = innings.join(seasons, on='match_id')
+
+        innings['overs'] = innings['balls'] // 6 + (innings['balls'] % 6) / 10
+        innings['run_rate'] = self._rate(innings['runs'], innings['balls'])
+        for name in self.PHASES:
+            innings[f'{name}_run_rate'] = self._rate(innings[f'{name}_runs'], innings[f'{name}_balls'])
+        return innings
+
+    def _league_match_ids(self, matches_df: pd.DataFrame) -> pd.Series:
+        """Ids of league-stage matches that count in the standings
+
+        Void matches (no winner and no result recorded, e.g. 2025's abandoned
+        PBKS v DC, which was replayed) are left out; recorded no-results stay in.
+        """
+        playoff = matches_df['match_type'].isin(self.PLAYOFF_TYPES)
+        labelled = playoff.groupby(matches_df['year']).transform('any')
+        void = matches_df['winner'].isna() & matches_df['result'].isna()
+
+        # Unlabelled seasons: the sides in the last few matches are the knockout sides, and the
+        # league stage ends with the last match involving any other side; the closing matches
+        # played after that date are the playoffs
+        dates = pd.to_datetime(matches_df['date'], errors='coerce')
+        for year in matches_df.loc[~labelled, 'year'].unique():
+            season = matches_df[(matches_df['year'] == year) & ~void]
+            season_dates = dates[season.index]
+            closing = season_dates.rank(method='first', ascending=False) <= self.UNLABELLED_PLAYOFF_MATCHES
+            knockout_sides = set(season.loc[closing, 'team1']) | set(season.loc[closing, 'team2'])
+            others = ~season['team1'].isin(knockout_sides) | ~season['team2'].isin(knockout_sides)
+            league_end = season_dates[others].max()
+            playoff[season.index[closing & (season_dates > league_end)]] = True
+        return matches_df.loc[~playoff & ~void, 'id']
+
+    @staticmethod
+    def _overs_to_balls(overs: pd.Series) -> pd.Series:
+        """Convert cricket overs notation (9.2 = 9 overs 2 balls) to balls"""
+        whole = np.floor(overs)
+        return whole * 6 + ((overs - whole) * 10).round()
+
+    def _build_points_table(self, matches_df: pd.DataFrame) -> pd.DataFrame:
+        """League standings per season with net run rate"""
+        league_ids = self._league_match_ids(matches_df)
+        league = self.team_matches[self.team_matches['match_id'].isin(league_ids)]
+
+        table = league.groupby(['year', 'team'], sort=True).agg(
+            season=('season', 'first'),
+            played=('match_id', 'size'),
+            won=('won', 'sum'),
+            lost=('lost', 'sum'),
+            no_result=('no_result', 'sum'),
+        ).reset_index()
+        table['points'] = table['won'] * self.POINTS_FOR_WIN + table['no_result'] * self.POINTS_FOR_NO_RESULT
+
+        nrr_columns = ['runs_for', 'overs_faced', 'runs_against', 'overs_bowled', 'net_run_rate']
+        if self.team_innings is not None:
+            table = table.merge(self._net_run_rates(matches_df, league_ids), on=['year', 'team'], how='left')
+            table[nrr_columns] = table[nrr_columns].fillna(0)
+        else:
+            table[nrr_columns] = 0.0
+
+        table = table.sort_values(['year', 'points', 'net_run_rate'], ascending=[True, False, False])
+        table['position'] = table.groupby('year').cumcount() + 1
+        return table.reset_index(drop=True)
+
+    def _net_run_rates(self, matches_df: pd.DataFrame, league_ids: pd.Series) -> pd.DataFrame:
+        """Runs and overs for/against per team-season and the resulting NRR
+
+        No-result matches are excluded; ties count like any other match. A side bowled out is charged its full
+        quota of overs, and in D/L matches the side batting first is credited
+        with the target minus one off the revised overs.
+        """
+        decided = matches_df[matches_df['id'].isin(league_ids) & (matches_df['result'] != 'no result')]
+        info = decided.set_index('id')[['target_runs', 'target_overs', 'method']]
+        innings = self.team_innings.join(info, on='match_id', how='inner')
+
+        quota_balls = self._overs_to_balls(innings['target_overs'].fillna(self.FULL_OVERS))
+        all_out = innings['wickets'] >= 10
+        balls = np.where(all_out, quota_balls, innings['balls'])
+        runs = innings['runs'].to_numpy(dtype=float)
+
+        revised = (innings['inning'] == 1) & (innings['method'] == 'D/L') & innings['target_runs'].notna()
+        runs = np.where(revised, innings['target_runs'] - 1, runs)
+        balls = np.where(revised, quota_balls, balls)
+        overs = balls / 6
+
+        batting = pd.DataFrame({'year': innings['year'], 'team': innings['batting_team'],
+                                'runs_for': runs, 'overs_faced': overs})
+        bowling = pd.DataFrame({'year': innings['year'], 'team': innings['bowling_team'],
+                                'runs_against': runs, 'overs_bowled': overs})
+        nrr = batting.groupby(['year', 'team']).sum().join(bowling.groupby(['year', 'team']).sum(), how='outer').fillna(0)
+
+        faced = nrr['overs_faced'].replace(0, np.nan)
+        bowled = nrr['overs_bowled'].replace(0, np.nan)
+        nrr['net_run_rate'] = (nrr['runs_for'] / faced - nrr['runs_against'] / bowled).round(3).fillna(0)
+        return nrr.reset_index()
+
+    @staticmethod
+    def _batting_order(matches_df: pd.DataFrame) -> pd.DataFrame:
+        """Which team batted first and second in each match, derived from the toss"""
+        toss_loser = np.where(matches_df['toss_winner'] == matches_df['team1'], matches_df['team2'], matches_df['team1'])
+        bat_first = (matches_df['toss_decision'] == 'bat').to_numpy()
+        return pd.DataFrame({
+            'batted_first': np.where(bat_first, matches_df['toss_winner'], toss_loser),
+            'batted_second': np.where(bat_first, toss_loser, matches_df['toss_winner']),
+        }, index=matches_df['id'].to_numpy())
+
+    @staticmethod
+    def _rate(runs: pd.Series, balls: pd.Series) -> pd.Series:
+        """Runs per over, 0 where no legal balls were bowled"""
+        return (runs / balls.replace(0, np.nan) * 6).round(2).fillna(0)
+
+    def _normalize_team(self, team: Optional[str]) -> Optional[str]:
+        return normalize_team(team)
+
+    def get_team_seasons(self, team: str) -> pd.DataFrame:
+        """Season-by-season record for one team, oldest first"""
+        team = self._normalize_team(team)
+        return self.team_seasons[self.team_seasons['team'] == team]
+
+    def get_teams_record(self, teams: List[str], seasons: List[int] = None) -> Dict[str, Dict]:
+        """Matches and wins for several teams from one grouped pass over team_seasons, keyed by the names given"""
+        names = {team: self._normalize_team(team) for team in teams}
+        table = self.team_seasons[self.team_seasons['team'].isin(set(names.values()))]
+        if seasons:
+            table = table[table['year'].isin(seasons)]
+        totals = table.groupby('team')[['matches', 'wins']].sum()
+
+        results = {}
+        for name, team in names.items():
+            matches = int(totals.at[team, 'matches']) if team in totals.index else 0
+            wins = int(totals.at[team, 'wins']) if team in totals.index else 0
+            results[name] = {'team': team, 'matches': matches, 'wins': wins}
+        return results
+
+    def get_team_overall(self, team: str) -> Optional[Dict]:
+        """All-time record for one team, or None if the team never played"""
+        team = self._normalize_team(team)
+        rows = self.team_overall[self.team_overall['team'] == team]
+        if len(rows) == 0:
+            return None
+        return rows.iloc[0].to_dict()
+
+    def get_titles(self, team: str) -> List[int]:
+        """Years in which the team won the final"""
+        team = self._normalize_team(team)
+        return self.champions[self.champions['champion'] == team]['year'].astype(int).tolist()
+
+    def get_champion(self, year: int) -> Optional[Dict]:
+        """The final of a season and its winner, or None if the season is not in the data"""
+        rows = self.champions[self.champions['year'] == year]
+        if len(rows) == 0:
+            return None
+        return rows.iloc[0].to_dict()
+
+    def get_team_phase_stats(self, team: str, seasons: List[int] = None, phase: str = None,
+                             role: str = 'batting') -> Dict:
+        """Aggregate a team's innings (batting) or opposition innings (bowling), optionally by phase"""
+        return next(iter(self.get_teams_phase_stats([team], seasons=seasons, phase=phase, role=role).values()))
+
+    def get_teams_phase_stats(self, teams: List[str], seasons: List[int] = None, phase: str = None,
+                              role: str = 'batting') -> Dict[str, Dict]:
+        """get_team_phase_stats() for several teams in one grouped pass, keyed by the names given"""
+        names = {team: self._normalize_team(team) for team in teams}
+        column = 'batting_team' if role == 'batting' else 'bowling_team'
+        innings = self.team_innings[self.team_innings[column].isin(set(names.values()))]
+        if seasons:
+            innings = innings[innings['year'].isin(seasons)]
+
+        prefix = f'{phase}_' if phase in self.PHASES else ''
+        grouped = innings.groupby(column)
+        totals = grouped[[f'{prefix}runs', f'{prefix}balls', f'{prefix}wickets', 'fours', 'sixes']].sum()
+        counts = grouped.size()
+        highest = grouped['runs'].max()
+
+        results = {}
+        for name, team in names.items():
+            has_innings = team in counts.index
+            runs = int(totals.at[team, f'{prefix}runs']) if has_innings else 0
+            balls = int(totals.at[team, f'{prefix}balls']) if has_innings else 0
+            wickets = int(totals.at[team, f'{prefix}wickets']) if has_innings else 0
+            count = int(counts[team]) if has_innings else 0
+
+            stats = {
+                'team': team,
+                'role': role,
+                'phase': phase if prefix else None,
+                'innings': count,
+                'runs': runs,
+                'balls': balls,
+                'wickets': wickets,
+                'economy' if role == 'bowling' else 'run_rate': round(runs / balls * 6, 2) if balls > 0 else 0,
+                'runs_per_innings': round(runs / count, 2) if count > 0 else 0,
+                'wickets_per_innings': round(wickets / count, 2) if count > 0 else 0,
+            }
+            if not prefix:
+                stats['fours'] = int(totals.at[team, 'fours']) if has_innings else 0
+                stats['sixes'] = int(totals.at[team, 'sixes']) if has_innings else 0
+                stats['highest_total'] = int(highest[team]) if count > 0 else 0
+            results[name] = stats
+        return results
+
+    def highest_totals(self, n: int = 10, seasons: List[int] = None) -> pd.DataFrame:
+        """Top-n team innings totals"""
+        innings = self.team_innings
+        if seasons:
+            innings = innings[innings['year'].isin(seasons)]
+        return innings.nlargest(n, 'runs')
+
+    def get_points_table(self, year: int) -> pd.DataFrame:
+        """League standings for a season, top of the table first"""
+        return self.points_table[self.points_table['year'] == year]
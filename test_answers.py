@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Verify computed answers: rendering to markdown, JSON and chart series, and caching of the computed form"""
+
+import json
+import pickle
+import sys
+sys.path.insert(0, '.')
+import numpy as np
+import config
+from models import Answer
+from renderers import chart_series, render, render_json, render_markdown
+
+
+def test_renderers():
+    answer = Answer(query_type='rankings', title='Top 2', data={'best': np.int64(973)})
+    answer.add_text("Heading\n\n")
+    answer.add_table('rankings', ['Rank', 'Player', 'Value'], [[1, 'V Kohli', np.int64(973)], [2, 'JC Buttler', 863.5]],
+                     title='Top 2', icon='🏅', chart=True, label='Player')
+    answer.add_table('metrics', ['Metric', 'Value'], [['Runs', 10], ['Average', 2], ['Best', '3/12']],
+                     formats={'Average': '{:.2f}'})
+
+    markdown = render_markdown(answer)
+    assert "🏅 **Top 2**\n\n| Rank | Player | Value |\n|------|--------|-------|\n" in markdown
+    assert "| 2 | JC Buttler | 863.50 |" in markdown
+    assert "| Average | 2.00 |" in markdown and "| Best | 3/12 |" in markdown
+
+    payload = render_json(answer)
+    json.dumps(payload)  # numpy values are converted
+    assert payload['blocks'][1]['rows'][0] == [1, 'V Kohli', 973] and payload['markdown'] == markdown
+
+    charts = chart_series(answer)
+    assert list(charts) == ['rankings']  # metric tables are not charted unless asked for by key
+    assert charts['rankings']['labels'] == ['V Kohli', 'JC Buttler']
+    assert charts['rankings']['series'] == {'Value': [973, 863.5]}
+    assert chart_series(answer, 'metrics') == {}  # no all-numeric column
+    assert render(answer, 'chart') == charts
+
+    error = Answer.from_markdown("❌ Team 'X' not found")
+    assert error.is_error and not Answer.from_markdown("**Profile**").is_error
+    assert pickle.loads(pickle.dumps(answer)) == answer
+
+
+def test_chatbot_answers():
+    config.LLM_BACKEND = 'local'
+    from engine_context import EngineContext
+    chatbot = EngineContext.get('.').get_chatbot(None)
+
+    answer = chatbot.get_answer("compare MI, CSK and RCB death bowling")
+    assert answer.query_type == 'comparative_analysis' and not answer.is_error
+    chart = chart_series(answer)['teams']
+    assert chart['labels'] == ['Mumbai Indians', 'Chennai Super Kings', 'Royal Challengers Bengaluru']
+    assert set(chart['series']) == {'Innings', 'Runs', 'Wickets', 'Economy', 'Runs/Inns'}
+
+    # The cached answer is the computed object; every rendering comes from it
+    assert chatbot.get_answer("compare MI, CSK and RCB death bowling") == answer
+    assert chatbot.get_response("compare MI, CSK and RCB death bowling") == render_markdown(answer)
+
+    stats = chatbot.get_answer("kohli stats")
+    assert stats.data['batting']['runs'] == stats.table('batting').rows[3][1]
+    assert "| Average |" in render_markdown(stats)
+
+    points = chatbot.get_answer("points table 2023")
+    assert chart_series(points)['points_table']['labels'][0] == points.table('points_table').rows[0][1]
+
+    # Text-only handlers are wrapped, and errors are flagged rather than cached
+    assert not chatbot.get_answer("kohli recent form").is_error
+    assert chatbot.get_answer("who won ipl season 40").is_error
+
+
+if __name__ == "__main__":
+    test_renderers()
+    test_chatbot_answers()
+    print("✅ Computed answers render as expected")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Verify the chat API: plain and streamed answers, sessions and the batch variant"""
+
+import asyncio
+import json
+import sys
+sys.path.insert(0, '.')
+import config
+config.LLM_BACKEND = 'local'
+import api
+from models import BatchChatRequest, ChatRequest
+
+
+async def _events(response):
+    """(event, data) pairs of a server-sent event stream"""
+    events = []
+    async for chunk in response.body_iterator:
+        for message in chunk.strip().split('\n\n'):
+            event, data = message.split('\n', 1)
+            events.append((event[len('event: '):], json.loads(data[len('data: '):])))
+    return events
+
+
+def test_chat():
+    result = asyncio.run(api.chat(ChatRequest(query="kohli vs bumrah")))
+    data = result['data']
+    assert data['query_type'] == 'head_to_head' and data['answer'].startswith('**Head-to-Head: V Kohli vs JJ Bumrah**')
+
+    result = asyncio.run(api.chat(ChatRequest(query="top 5 run scorers in 2016", format='json')))
+    table = next(block for block in result['data']['blocks'] if block['kind'] == 'table')
+    assert table['key'] == 'rankings' and table['rows'][0][1] == 'V Kohli'
+
+
+def test_chat_stream():
+    response = asyncio.run(api.chat(ChatRequest(query="bumrah stats in 2024", stream=True)))
+    events = asyncio.run(_events(response))
+    names = [event for event, _ in events]
+    assert names[0] == 'query' and names[1] == 'parsed' and names[-1] == 'done'
+    assert events[1][1]['player1'] == 'JJ Bumrah' and 'block' in names
+
+    # The answer is cached now, so the stream skips the parse
+    events = asyncio.run(_events(asyncio.run(api.chat(ChatRequest(query="bumrah stats in 2024", stream=True)))))
+    assert 'parsed' not in [event for event, _ in events]
+    streamed = ''.join(data['markdown'] for event, data in events if event == 'block')
+    assert streamed == asyncio.run(api.chat(ChatRequest(query="bumrah stats in 2024")))['data']['answer']
+
+    # Sessions carry over to streamed follow-ups
+    asyncio.run(api.chat(ChatRequest(query="kohli vs spin", session_id='api')))
+    events = asyncio.run(_events(asyncio.run(api.chat(ChatRequest(query="and in 2016?", session_id='api', stream=True)))))
+    parsed = dict(events)['parsed']
+    assert parsed['player1'] == 'V Kohli' and parsed['seasons'] == [2016] and parsed['vs_conditions'] == 'vs_spin'
+
+
+def test_chat_batch():
+    queries = ["kohli stats", "points table 2023", "kohli stats", "tell me a joke"]
+    result = asyncio.run(api.chat_batch(BatchChatRequest(queries=queries)))
+    results = result['data']['results']
+    assert [r['query'] for r in results] == queries and results[0]['answer'] == results[2]['answer']
+    assert results[1]['query_type'] == 'points_table'
+
+    response = asyncio.run(api.chat_batch(BatchChatRequest(queries=queries[:2], stream=True)))
+    events = asyncio.run(_events(response))
+    assert sorted(data['index'] for event, data in events if event == 'result') == [0, 1]
+    assert events[-1] == ('done', {'count': 2})
+
+
+if __name__ == "__main__":
+    test_chat()
+    test_chat_stream()
+    test_chat_batch()
+    print("✅ Chat API behaves as expected")
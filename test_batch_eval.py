@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Verify batch evaluation: input formats, parse deduplication and forked answering"""
+
+import os
+import sys
+import tempfile
+sys.path.insert(0, '.')
+from batch_eval import read_queries, run
+from tracing import note
+
+
+class StubChatbot:
+    """Parses 'x stats' queries to a player, counting how often each stage runs"""
+
+    def __init__(self):
+        self.parses = 0
+
+    def _correct_spelling(self, query):
+        return query.replace('kholi', 'kohli')
+
+    def parse_query(self, query):
+        self.parses += 1
+        note('parse_source', 'local')
+        player = query.lower().split()[0]
+        return {'player1': player, 'query_type': 'player_stats', 'interpretation': query}
+
+    def _answer_query(self, query, parsed):
+        note('query_type', parsed['query_type'])
+        if parsed['player1'] == 'nobody':
+            return "❌ Player not found"
+        return f"Stats for {parsed['player1']} (pid {os.getpid()})"
+
+    def after_fork(self):
+        pass
+
+
+def test_batch_run():
+    path = os.path.join(tempfile.mkdtemp(), 'queries.jsonl')
+    with open(path, 'w') as f:
+        f.write('{"query": "kohli stats", "expected_query_type": "player_stats"}\n')
+        f.write('"kohli  stats"\n')
+        f.write('kholi stats\n')
+        f.write('\n{"id": 7}\n')
+        f.write('{"query": "nobody stats", "id": "q5"}\n')
+    records = read_queries(path)
+    assert [r['id'] for r in records] == [1, 2, 3, 'q5']
+
+    for workers in (1, 2):
+        chatbot = StubChatbot()
+        results, summary = run(records, chatbot, workers=workers, parse_concurrency=2)
+
+        # Three spellings of one query are parsed and answered once
+        assert chatbot.parses == 2 and summary['distinct_queries'] == 2 and summary['distinct_answers'] == 2
+        assert results[0]['response'] == results[2]['response']
+        assert results[2]['corrected_query'] == 'kohli stats'
+        assert results[0]['intent_match'] is True
+        assert results[3]['error'].startswith('❌') and summary['errors'] == 1
+        assert summary['query_types'] == {'player_stats': 4} and summary['latency']['p50_ms'] >= 0
+        if workers > 1:
+            assert str(os.getpid()) not in results[0]['response']  # answered in a forked worker
+    print(summary)
+
+
+if __name__ == "__main__":
+    test_batch_run()
+    print("✅ Batch evaluation behaves as expected")
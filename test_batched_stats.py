@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Verify batched multi-entity stats match the per-entity computation, and that the parser emits entity lists"""
+
+import sys
+sys.path.insert(0, '.')
+import config
+from engine_context import EngineContext
+
+PLAYERS = ['V Kohli', 'RG Sharma', 'Shubman Gill', 'JJ Bumrah', 'RA Jadeja']
+FILTER_SETS = [
+    None,
+    {'seasons': [2024], 'match_phase': 'powerplay'},
+    {'vs_conditions': 'vs_spin', 'match_phase': 'death_overs'},
+    {'match_situation': 'chasing', 'opposition_team': 'Mumbai Indians'},
+    {'venue': ['Eden Gardens'], 'seasons': [2019, 2020]},
+]
+
+
+def test_players_batch_matches_single():
+    engine = EngineContext.get('.').stats_engine
+    for filters in FILTER_SETS:
+        batch = engine._compute_players_stats_batch(PLAYERS, filters)
+        for player in PLAYERS:
+            assert batch[player] == engine._compute_player_stats(player, filters), (player, filters)
+
+    # Names are resolved, deduplicated and cached under the single-player keys
+    stats = engine.get_players_stats_batch(['V Kohli', 'V Kohli', 'zzqqxx', 'Jasprit Bumrah'], {'seasons': [2023]})
+    assert list(stats) == ['V Kohli', 'JJ Bumrah']
+    assert engine.get_player_stats('V Kohli', {'seasons': [2023]}) == stats['V Kohli']
+
+
+def test_teams_batch_matches_single():
+    engine = EngineContext.get('.').stats_engine
+    teams = ['Mumbai Indians', 'Chennai Super Kings', 'Royal Challengers Bengaluru']
+    for role in ('batting', 'bowling'):
+        for filters in (None, {'match_phase': 'death_overs', 'seasons': [2023]}):
+            batch = engine.get_teams_stats_batch(teams, filters, role=role)
+            assert batch == {team: engine.get_team_phase_stats(team, filters, role=role) for team in teams}
+
+
+def test_parser_emits_entity_lists():
+    config.LLM_BACKEND = 'local'
+    chatbot = EngineContext.get('.').get_chatbot(None)
+
+    parsed = chatbot.parse_query("kohli, rohit and gill in powerplay 2024")
+    assert parsed['query_type'] == 'comparative_analysis'
+    assert parsed['player_list'] == ['V Kohli', 'RG Sharma', 'Shubman Gill'] and parsed['seasons'] == [2024]
+
+    parsed = chatbot.parse_query("compare MI, CSK and RCB death bowling")
+    assert parsed['team_list'] == ['Mumbai Indians', 'Chennai Super Kings', 'Royal Challengers Bengaluru']
+    assert parsed['comparison_type'] == 'bowling' and parsed['match_phase'] == 'death_overs'
+
+    response = chatbot.get_response("kohli, rohit and gill in powerplay 2024")
+    assert 'Comparing 3 Players' in response and 'Shubman Gill' in response
+
+
+if __name__ == "__main__":
+    test_players_batch_matches_single()
+    test_teams_batch_matches_single()
+    test_parser_emits_entity_lists()
+    print("✅ Batched multi-entity stats behave as expected")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Verify the bulk player and team stats endpoints against the single-entity engine calls"""
+
+import asyncio
+import sys
+sys.path.insert(0, '.')
+import config
+config.LLM_BACKEND = 'local'
+import api
+from fastapi import HTTPException
+from models import PlayersStatsRequest, StatsFilters, TeamsStatsRequest
+
+
+def _status(coro) -> int:
+    try:
+        asyncio.run(coro)
+    except HTTPException as e:
+        return e.status_code
+    raise AssertionError("expected an HTTPException")
+
+
+def test_players_stats():
+    engine = api.stats_engine
+    filters = StatsFilters(seasons=[2016], match_phase='death_overs', opposition_team='gujarat lions')
+    request = PlayersStatsRequest(players=['V Kohli', 'ab de villiers', 'zzqqxx', 'V Kohli'], filters=filters)
+    result = asyncio.run(api.get_players_stats(request))
+
+    data = result['data']
+    assert list(data['players']) == ['V Kohli', 'AB de Villiers'] and data['not_found'] == ['zzqqxx']
+    resolved = api.resolve_filters(filters).to_filters()
+    assert result['filters']['opposition_team'] == 'Gujarat Lions'
+    for player, stats in data['players'].items():
+        assert stats == engine._compute_player_stats(player, resolved)
+
+    assert _status(api.get_players_stats(PlayersStatsRequest(players=['V Kohli'] * (config.BULK_STATS_MAX_NAMES + 1)))) == 413
+    bad = PlayersStatsRequest(players=['V Kohli'], filters=StatsFilters(opposition_team='qqqqqqqq'))
+    assert _status(api.get_players_stats(bad)) == 422
+
+
+def test_teams_stats():
+    engine = api.stats_engine
+    request = TeamsStatsRequest(teams=['chennai', 'Mumbai Indians', 'Nowhere XI'],
+                                filters=StatsFilters(seasons=[2019, 2020], match_phase='powerplay'))
+    result = asyncio.run(api.get_teams_stats(request))
+
+    data = result['data']
+    assert data['not_found'] == ['Nowhere XI'] and data['count'] == 2
+    for team, stats in data['teams'].items():
+        record = engine._compute_team_stats(team, {'seasons': [2019, 2020]})
+        assert {key: stats[key] for key in record} == record
+        assert stats['batting'] == engine.get_team_phase_stats(team, {'seasons': [2019, 2020], 'match_phase': 'powerplay'})
+        assert stats['bowling']['role'] == 'bowling' and stats['bowling']['phase'] == 'powerplay'
+
+    # Records are shared with get_team_stats through the result cache
+    hit, cached = engine._result_cache.get(engine._cache_key('team_stats', 'Mumbai Indians', StatsFilters(seasons=[2019, 2020]).cache_key()))
+    assert hit and cached['wins'] == data['teams']['Mumbai Indians']['wins']
+
+    for filters in (StatsFilters(vs_conditions='spin'), StatsFilters(match_phase='opening')):
+        assert _status(api.get_teams_stats(TeamsStatsRequest(teams=['chennai'], filters=filters))) == 422
+
+
+if __name__ == "__main__":
+    test_players_stats()
+    test_teams_stats()
+    print("✅ Bulk stats endpoints behave as expected")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Verify session context: follow-up parsing, session expiry and reuse of player delivery slices"""
+
+import sys
+import time
+sys.path.insert(0, '.')
+import pandas as pd
+import config
+from conversation import SessionStore, SliceStore, active_slices, use_slices
+
+
+def test_session_store():
+    store = SessionStore(max_sessions=2, ttl=0.05, max_slices=1)
+    first = store.get('a')
+    first.remember({'player1': 'V Kohli', 'query_type': 'player_stats'})
+    assert store.get('a') is first and first.turns == 1
+    store.get('b')
+    store.get('c')
+    assert len(store) == 2 and store.get('a') is not first  # least recently used session dropped
+
+    time.sleep(0.06)
+    assert store.get('c').last_parsed is None  # idle past the TTL
+
+    slices = SliceStore(max_slices=1)
+    slices.put(('v1', 'V Kohli', 'batter'), pd.DataFrame({'x': [1]}))
+    slices.put(('v1', 'V Kohli', 'bowler'), pd.DataFrame({'x': [2]}))
+    assert slices.get(('v1', 'V Kohli', 'batter')) is None and len(slices) == 1
+
+    assert active_slices() is None
+    with use_slices(slices):
+        assert active_slices() is slices
+    assert active_slices() is None
+
+
+def test_follow_ups():
+    config.LLM_BACKEND = 'local'
+    from engine_context import EngineContext
+    from openai_handler import CricketChatbot
+    from stats_engine import StatsEngine
+    # A fresh engine, so its result and response caches start cold whatever ran before
+    context = EngineContext.get('.')
+    chatbot = CricketChatbot(context.matches_df, context.deliveries_df,
+                             stats_engine=StatsEngine(context.matches_df, context.deliveries_df))
+
+    first = chatbot.get_response("kohli vs spin", session_id='s1')
+    context = chatbot.sessions.get('s1')
+    assert context.last_parsed['player1'] == 'V Kohli'
+    misses = context.slices.misses
+
+    # A filter-only follow-up keeps the player and earlier filters and reuses his slices
+    answer = chatbot.get_response("and in death overs?", session_id='s1')
+    parsed = context.last_parsed
+    assert parsed['player1'] == 'V Kohli' and parsed['vs_conditions'] == 'vs_spin'
+    assert parsed['match_phase'] == 'death_overs' and answer != first
+    assert context.slices.misses == misses and context.slices.hits > 0 and context.follow_ups == 1
+
+    chatbot.get_response("what about 2023?", session_id='s1')
+    assert context.last_parsed['seasons'] == [2023] and context.last_parsed['match_phase'] == 'death_overs'
+
+    chatbot.get_response("what about rohit?", session_id='s1')
+    assert context.last_parsed['player1'] == 'RG Sharma' and context.last_parsed['seasons'] == [2023]
+
+    # New questions are parsed from scratch, and sessions do not leak into each other
+    assert chatbot._parse_follow_up("top run scorers in 2023", context.last_parsed) is None
+    assert chatbot._parse_follow_up("bumrah stats", context.last_parsed) is None
+    chatbot.get_response("and in death overs?", session_id='s2')
+    assert (chatbot.sessions.get('s2').last_parsed or {}).get('player1') is None
+
+    # A first turn answered from the cache still slices its player for the follow-ups
+    chatbot.get_response("kohli vs spin", session_id='s3')
+    cached = chatbot.sessions.get('s3')
+    assert (chatbot.stats_engine.dataset_version, 'V Kohli', 'batter') in cached.slices
+    misses = cached.slices.misses
+    chatbot.get_response("and in 2019?", session_id='s3')
+    assert cached.slices.misses == misses and cached.slices.hits > 0
+
+
+if __name__ == "__main__":
+    test_session_store()
+    test_follow_ups()
+    print("✅ Conversation sessions behave as expected")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Verify the endpoint worker pool: per-endpoint limits, bounded queues, metrics and a free event loop"""
+
+import asyncio
+import contextvars
+import sys
+import time
+sys.path.insert(0, '.')
+from endpoint_pool import EndpointPool, PoolSaturated
+
+_request = contextvars.ContextVar('request', default=None)
+
+
+def test_limits_and_metrics():
+    pool = EndpointPool(workers=4, limits={'default': 2, 'slow': 1}, max_queue=2)
+
+    async def scenario():
+        started = time.perf_counter()
+        slow = [asyncio.create_task(pool.run('slow', time.sleep, 0.1)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        assert pool.stats()['endpoints']['slow']['queued'] == 2
+
+        # A cheap endpoint is not queued behind the slow one, and the loop itself stays free
+        assert await pool.run('cheap', sum, [1, 2, 3]) == 6
+        cheap_ms = (time.perf_counter() - started) * 1000
+        await asyncio.sleep(0)
+
+        try:
+            await pool.run('slow', time.sleep, 0.1)
+            raise AssertionError("expected the full queue to refuse the request")
+        except PoolSaturated:
+            pass
+
+        await asyncio.gather(*slow)
+        return cheap_ms, (time.perf_counter() - started) * 1000
+
+    cheap_ms, total_ms = asyncio.run(scenario())
+    assert cheap_ms < 80 and total_ms >= 300  # slow requests ran one at a time
+    slow = pool.stats()['endpoints']['slow']
+    assert slow['completed'] == 3 and slow['rejected'] == 1 and slow['max_queued'] == 2 and slow['queued'] == 0
+    assert slow['avg_wait_ms'] > 0 and pool.stats()['endpoints']['cheap']['limit'] == 2
+
+
+def test_context_and_errors():
+    pool = EndpointPool(workers=2)
+
+    async def scenario():
+        _request.set('r1')
+        assert await pool.run('ctx', _request.get) == 'r1'
+        try:
+            await pool.run('ctx', int, 'x')
+        except ValueError:
+            pass
+        return pool.stats()['endpoints']['ctx']
+
+    stats = asyncio.run(scenario())
+    assert stats['completed'] == 1 and stats['failed'] == 1 and stats['running'] == 0
+    # A new event loop gets fresh semaphores
+    assert asyncio.run(pool.run('ctx', abs, -1)) == 1
+
+
+def test_api_offloads():
+    import config
+    config.LLM_BACKEND = 'local'
+    import api
+    from fastapi import HTTPException
+    from models import StatsFilters
+
+    def completed(endpoint):
+        return api.pool.stats()['endpoints'].get(endpoint, {}).get('completed', 0)
+
+    # api.pool is shared with whatever ran before: count this test's requests only
+    before = {endpoint: completed(endpoint) for endpoint in ('player', 'chat')}
+
+    async def scenario():
+        stats, health = await asyncio.gather(api.get_player_stats('V Kohli', StatsFilters()), api.health_check())
+        try:
+            await api.get_player_stats('zzqqxx', StatsFilters())
+            raise AssertionError("expected a 404")
+        except HTTPException as e:
+            assert e.status_code == 404  # not turned into a 500 by the route's error handling
+        await api.chat(api.ChatRequest(query="kohli vs bumrah in 2019"))
+        return stats, health
+
+    stats, health = asyncio.run(scenario())
+    assert health['status'] == 'healthy' and stats['data']['batting']['runs'] > 0
+    assert completed('player') - before['player'] == 2 and completed('chat') - before['chat'] == 1
+
+
+if __name__ == "__main__":
+    test_limits_and_metrics()
+    test_context_and_errors()
+    test_api_offloads()
+    print("✅ Endpoint pool behaves as expected")
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""Verify the engine context loads the data once and shares one StatsEngine with every engine built on it"""
+
+import sys
+import threading
+sys.path.insert(0, '.')
+import config
+config.LLM_BACKEND = 'local'
+from engine_context import EngineContext
+
+
+def test_context_is_shared():
+    context = EngineContext.get('.')
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(EngineContext.get('.'))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(other is context for other in seen + [EngineContext.get('.')])
+
+    # One chatbot per API key, reused on later calls
+    chatbot = context.get_chatbot(None)
+    assert context.get_chatbot(None) is chatbot
+    keyed = context.get_chatbot('test-key')
+    assert keyed is not chatbot and context.get_chatbot('test-key') is keyed
+
+    assert context.ai_engine is context.ai_engine
+    assert context.ai_engine.stats_engine is context.stats_engine is chatbot.stats_engine is keyed.stats_engine
+
+
+if __name__ == "__main__":
+    test_context_is_shared()
+    print("✅ Engine context is shared as expected")
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Verify the intent classifier learns the ten query types from the docs and predicts fast"""
+
+import os
+import sys
+import tempfile
+import time
+sys.path.insert(0, '.')
+from intent_classifier import IntentClassifier
+
+
+def test_intent_classifier():
+    examples = IntentClassifier.load_corpus('.')
+    labels = {label for _, label in examples}
+    print(f"{len(examples)} labelled examples, {len(labels)} query types")
+    assert len(labels) == 10
+
+    path = os.path.join(tempfile.mkdtemp(), 'intent.pkl')
+    classifier = IntentClassifier.load_or_train(path, '.')
+    assert os.path.exists(path)
+
+    for query, expected in [
+        ('kohli last 5 innings', 'trends'),
+        ('top 10 run scorers', 'rankings'),
+        ('kohli highest score', 'records'),
+        ('kohli at wankhede', 'ground_insights'),
+        ('who should bat in powerplay', 'predictions'),
+    ]:
+        intent, probability = classifier.predict(query)
+        assert intent == expected, (query, intent, probability)
+
+    # Reloaded from disk, not retrained, and well under a millisecond per query
+    reloaded = IntentClassifier.load_or_train(path, '.')
+    assert reloaded.predict('kohli current form') == classifier.predict('kohli current form')
+    start = time.perf_counter()
+    for _ in range(1000):
+        reloaded.predict('bumrah last 10 matches')
+    per_query_ms = (time.perf_counter() - start)
+    print(f"{per_query_ms:.3f} ms per prediction")
+    assert per_query_ms < 1.0
+
+
+if __name__ == "__main__":
+    test_intent_classifier()
+    print("\n✅ Intent classifier behaves as expected")
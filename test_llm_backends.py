@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""Verify the LLM backends: cassette replay and recording, and the circuit breaker around them"""
+
+import asyncio
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+sys.path.insert(0, '.')
+from llm_backends import (LLMBackend, LocalBackend, RecordingBackend, ResilientBackend, CircuitBreaker,
+                          BackendUnavailable, cassette_key)
+
+
+class EchoBackend(LLMBackend):
+    """Stands in for the live API"""
+
+    def complete(self, messages, temperature=0.2, max_tokens=500, task=None, query=None):
+        return json.dumps({"echo": messages[-1]["content"]})
+
+
+def test_local_backend():
+    path = os.path.join(tempfile.mkdtemp(), 'cassette.json')
+    messages = [{"role": "user", "content": "parse: kohli vs bumrah"}]
+
+    # Recording keys parses on the normalized query, so the prompt can change later
+    recorder = RecordingBackend(EchoBackend('gpt-4o-mini'), path)
+    reply = recorder.complete(messages, task='parse', query='Kohli  vs Bumrah')
+    assert cassette_key(messages, 'parse', 'kohli vs bumrah') == 'parse:kohli vs bumrah'
+
+    # Replayed offline with simulated latency
+    local = LocalBackend(path, latency=0.02)
+    start = time.time()
+    assert local.complete([{"role": "user", "content": "new prompt"}], task='parse', query='kohli vs bumrah') == reply
+    assert time.time() - start >= 0.02
+    assert local.cassette_hits == 1
+    usage = local.usage.summary()['parse']
+    assert usage['calls'] == 1 and usage['prompt_tokens'] > 0 and usage['p50_latency_ms'] >= 20
+
+    # Unrecorded calls go to the responder, or fail loudly without one
+    local = LocalBackend(path, responder=lambda task, query, messages: f"{task}:{query}")
+    assert local.complete(messages, task='team', query='csk') == 'team:csk'
+    try:
+        LocalBackend(path).complete(messages, task='team', query='csk')
+        raise AssertionError("expected LookupError")
+    except LookupError:
+        pass
+
+
+class FlakyBackend(LLMBackend):
+    """Fails until told to recover"""
+
+    def __init__(self):
+        super().__init__('gpt-4o-mini')
+        self.healthy = False
+        self.calls = 0
+
+    def complete(self, messages, temperature=0.2, max_tokens=500, task=None, query=None):
+        self.calls += 1
+        if not self.healthy:
+            raise ConnectionError("upstream unavailable")
+        return "ok"
+
+
+def test_circuit_breaker():
+    upstream = FlakyBackend()
+    backend = ResilientBackend(upstream, retries=1, backoff=0.0,
+                               breaker=CircuitBreaker(failure_rate=0.5, min_calls=4, window=60, cooldown=0.05))
+    messages = [{"role": "user", "content": "hi"}]
+
+    # Two calls with one retry each: four failures open the circuit
+    for _ in range(2):
+        try:
+            backend.complete(messages)
+        except ConnectionError:
+            pass
+    assert backend.breaker.state == 'open' and upstream.calls == 4
+
+    # While open, calls are refused without touching the upstream
+    try:
+        backend.complete(messages)
+        raise AssertionError("expected BackendUnavailable")
+    except BackendUnavailable:
+        pass
+    assert upstream.calls == 4
+
+    # After the cooldown one successful trial closes it again
+    time.sleep(0.06)
+    upstream.healthy = True
+    assert backend.complete(messages) == "ok"
+    assert backend.breaker.state == 'closed'
+    print(backend.stats())
+
+
+class SlowBackend(LLMBackend):
+    """Times out like a client library does, in both paths"""
+
+    def __init__(self):
+        super().__init__('gpt-4o-mini')
+
+    def complete(self, messages, temperature=0.2, max_tokens=500, task=None, query=None):
+        raise TimeoutError("read timed out")
+
+    async def acomplete(self, messages, temperature=0.2, max_tokens=500, task=None, query=None):
+        await asyncio.sleep(1)
+        return "late"
+
+
+def test_timeouts_and_loops():
+    backend = ResilientBackend(SlowBackend(), timeout=0.01, retries=0, backoff=0.0,
+                               breaker=CircuitBreaker(failure_rate=1.0, min_calls=100))
+    messages = [{"role": "user", "content": "hi"}]
+
+    # Sync and async timeouts are counted the same way
+    for call in (lambda: backend.complete(messages), lambda: asyncio.run(backend.acomplete(messages))):
+        try:
+            call()
+            raise AssertionError("expected a timeout")
+        except TimeoutError:
+            pass
+    assert backend.stats()['timeouts'] == 2
+
+    # Each event loop gets its own slots, and a finished loop's slots go with it
+    echo = ResilientBackend(EchoBackend('gpt-4o-mini'), retries=0)
+    for _ in range(20):
+        assert asyncio.run(echo.acomplete(messages, task='t', query='q'))
+    gc.collect()
+    assert len(echo._async_slots) == 0 and echo.breaker.state == 'closed'
+
+
+class HangingBackend(LLMBackend):
+    """Never answers until told to"""
+
+    def __init__(self):
+        super().__init__('gpt-4o-mini')
+        self.healthy = False
+
+    def complete(self, messages, temperature=0.2, max_tokens=500, task=None, query=None):
+        return "ok"
+
+    async def acomplete(self, messages, temperature=0.2, max_tokens=500, task=None, query=None):
+        if not self.healthy:
+            await asyncio.sleep(10)
+        return "ok"
+
+
+def _open(breaker):
+    for _ in range(breaker.min_calls):
+        breaker.record(False, breaker.allow())
+    assert breaker.state == 'open'
+
+
+def test_half_open_trial_is_released():
+    upstream = HangingBackend()
+    breaker = CircuitBreaker(failure_rate=0.5, min_calls=2, window=60, cooldown=0.01)
+    backend = ResilientBackend(upstream, timeout=5, retries=0, breaker=breaker)
+    messages = [{"role": "user", "content": "hi"}]
+
+    # A cancelled trial hands the probe back instead of wedging the circuit half-open
+    _open(breaker)
+    time.sleep(0.02)
+
+    async def cancel_trial():
+        trial = asyncio.ensure_future(backend.acomplete(messages))
+        await asyncio.sleep(0.01)
+        assert breaker.state == 'half_open' and breaker._trial_in_flight
+        trial.cancel()
+        try:
+            await trial
+        except asyncio.CancelledError:
+            pass
+        upstream.healthy = True
+        return await backend.acomplete(messages)
+
+    assert asyncio.run(cancel_trial()) == "ok" and breaker.state == 'closed'
+
+    # So does a sync trial that never got a slot
+    _open(breaker)
+    time.sleep(0.02)
+    saturated = ResilientBackend(upstream, timeout=0.01, max_concurrency=1, retries=0, breaker=breaker)
+    saturated._slots.acquire()
+    try:
+        saturated.complete(messages)
+        raise AssertionError("expected BackendUnavailable")
+    except BackendUnavailable:
+        pass
+    saturated._slots.release()
+    assert saturated.complete(messages) == "ok" and breaker.state == 'closed'
+
+    # A straggler granted before the circuit opened does not decide the trial
+    grant = breaker.allow()
+    _open(breaker)
+    time.sleep(0.02)
+    assert breaker.allow() == 'trial'
+    breaker.release(grant)
+    breaker.record(True, grant)
+    assert breaker.state == 'half_open' and breaker.allow() is None
+
+
+def test_async_slot_wait_is_bounded():
+    upstream = HangingBackend()
+    backend = ResilientBackend(upstream, timeout=0.05, max_concurrency=1, retries=0)
+    messages = [{"role": "user", "content": "hi"}]
+
+    async def scenario():
+        slots = backend._loop_slots()
+        await slots.acquire()
+        started = time.perf_counter()
+        try:
+            await backend.acomplete(messages)
+            raise AssertionError("expected BackendUnavailable")
+        except BackendUnavailable:
+            pass
+        slots.release()
+        return time.perf_counter() - started
+
+    assert asyncio.run(scenario()) < 1 and backend.rejected == 1
+    assert backend.breaker.state == 'closed'
+
+
+if __name__ == "__main__":
+    test_local_backend()
+    test_circuit_breaker()
+    test_timeouts_and_loops()
+    test_half_open_trial_is_released()
+    test_async_slot_wait_is_bounded()
+    print("✅ LLM backends behave as expected")
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""Verify the local parser orients head-to-head queries and leaves peer and unknown pairs to the right handler"""
+
+import sys
+sys.path.insert(0, '.')
+import config
+config.LLM_BACKEND = 'local'
+from engine_context import EngineContext
+
+
+def test_head_to_head_orientation():
+    chatbot = EngineContext.get('.').get_chatbot(None)
+
+    # Either order is looked up with the batter first
+    for query in ("kohli vs bumrah", "bumrah vs kohli"):
+        parsed, confidence = chatbot._parse_locally(query)
+        assert (parsed['player1'], parsed['player2'], parsed['query_type']) == ('V Kohli', 'JJ Bumrah', 'head_to_head')
+        assert confidence >= config.LOCAL_PARSE_MIN_CONFIDENCE
+    assert chatbot.get_response("bumrah vs kohli").startswith('**Head-to-Head: V Kohli vs JJ Bumrah**')
+
+    # Two batters are compared, not matched up
+    parsed, confidence = chatbot._parse_locally("rohit vs gill in powerplay")
+    assert parsed['query_type'] == 'comparative_analysis' and parsed['match_phase'] == 'powerplay'
+    assert confidence >= config.LOCAL_PARSE_MIN_CONFIDENCE
+    assert 'Could not find head-to-head' not in chatbot.get_response("rohit vs gill in powerplay")
+
+    # A batter and a bowler who never met: not confident enough to skip the LLM
+    matchups = chatbot.stats_engine.matchups
+    parsed, confidence = chatbot._parse_locally("abhishek sharma vs rashid")
+    assert matchups.get(parsed['player1'], parsed['player2'])['deliveries'] == 0
+    assert matchups.primary_role(parsed['player1']) == 'batter'
+    assert confidence < config.LOCAL_PARSE_MIN_CONFIDENCE
+
+
+if __name__ == "__main__":
+    test_head_to_head_orientation()
+    print("✅ Local head-to-head parses are oriented as expected")
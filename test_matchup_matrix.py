@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Verify matchup matrix head-to-head lookups match a raw deliveries scan"""
+
+import sys
+sys.path.insert(0, '.')
+from data_loader import IPLDataLoader
+from stats_engine import StatsEngine
+
+
+def test_matchup_matches_delivery_scan():
+    loader = IPLDataLoader()
+    matches_df, deliveries_df = loader.load_data()
+    matches_df, deliveries_df = loader.preprocess_data()
+    stats = StatsEngine(matches_df, deliveries_df)
+
+    pairs = [('V Kohli', 'JJ Bumrah'), ('RG Sharma', 'SP Narine'), ('MS Dhoni', 'R Ashwin')]
+    slices = [(None, None), ([2019], None), (None, 'powerplay'), ([2023, 2024], 'death_overs')]
+    phase_overs = {'powerplay': (0, 5), 'middle_overs': (6, 15), 'death_overs': (16, 99)}
+
+    for batter, bowler in pairs:
+        for seasons, phase in slices:
+            cell = stats.matchups.get(batter, bowler, seasons, phase)
+
+            scan = deliveries_df[(deliveries_df['batter'] == batter) & (deliveries_df['bowler'] == bowler)]
+            if seasons:
+                match_ids = matches_df[matches_df['year'].isin(seasons)]['id']
+                scan = scan[scan['match_id'].isin(match_ids)]
+            if phase:
+                low, high = phase_overs[phase]
+                scan = scan[(scan['over'] >= low) & (scan['over'] <= high)]
+
+            print(f"{batter} vs {bowler} {seasons or 'all'} {phase or 'all'}: {cell['runs']} runs off {cell['deliveries']}")
+            assert cell['deliveries'] == len(scan)
+            assert cell['runs'] == int(scan['batsman_runs'].sum())
+            assert cell['fours'] == int((scan['batsman_runs'] == 4).sum())
+            assert cell['sixes'] == int((scan['batsman_runs'] == 6).sum())
+
+    # Row scan: every bowler row for a batter should add up to the batter's career deliveries faced
+    faced = stats.matchups.bowlers_vs('V Kohli')
+    assert faced['deliveries'].sum() == len(deliveries_df[deliveries_df['batter'] == 'V Kohli'])
+    print("\nBowlers who trouble Kohli most:")
+    print(stats.matchups.toughest_bowlers('V Kohli')[['balls', 'runs', 'dismissals', 'strike_rate']])
+
+
+if __name__ == "__main__":
+    test_matchup_matches_delivery_scan()
+    print("\n✅ Matchup matrix matches delivery scan")
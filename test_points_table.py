@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""Verify league standings: playoffs and void matches are left out, including in seasons without playoff labels,
+and ties recorded without a winner go to the super-over winner"""
+
+import sys
+sys.path.insert(0, '.')
+from engine_context import EngineContext
+
+
+def _row(table, team):
+    return table[table['team'] == team].iloc[0]
+
+
+def test_points_table():
+    tables = EngineContext.get('.').stats_engine.team_tables
+
+    # Labelled playoffs: every side plays its 14 league matches
+    table = tables.get_points_table(2023)
+    assert set(table['played']) == {14}
+    assert table.iloc[0]['team'] == 'Gujarat Titans' and table.iloc[0]['points'] == 20
+
+    # 2025 has no playoff labels, and its abandoned PBKS v DC (replayed later) has no result recorded
+    table = tables.get_points_table(2025)
+    assert table['played'].max() == 14
+    pbks = _row(table, 'Punjab Kings')
+    assert (pbks['played'], pbks['won'], pbks['lost'], pbks['no_result'], pbks['points']) == (14, 9, 4, 1, 19)
+    assert pbks['position'] == 1
+    # Qualifier 1, Eliminator, Qualifier 2 and the final are not league matches
+    assert _row(table, 'Mumbai Indians')['played'] == 14 and _row(table, 'Gujarat Titans')['played'] == 14
+    assert 1473495 not in set(tables._league_match_ids(tables.matches_df))
+
+    # DC v RR was tied with no winner recorded; DC won the super over, and the match counts towards NRR
+    dc, rr = _row(table, 'Delhi Capitals'), _row(table, 'Rajasthan Royals')
+    assert (dc['won'], dc['lost'], dc['no_result'], dc['points']) == (7, 6, 1, 15)
+    assert (rr['won'], rr['lost'], rr['no_result'], rr['points']) == (4, 10, 0, 8)
+    innings = tables.team_innings
+    rr_innings = innings[(innings['batting_team'] == 'Rajasthan Royals') & (innings['year'] == 2025)
+                         & innings['match_id'].isin(tables._league_match_ids(tables.matches_df))]
+    assert 1473469 in set(rr_innings['match_id']) and rr['runs_for'] == rr_innings['runs'].sum()
+
+
+if __name__ == "__main__":
+    test_points_table()
+    print("✅ Points table behaves as expected")
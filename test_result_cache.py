@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Verify result cache key normalization, LRU eviction, TTL expiry and copy-on-read"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+sys.path.insert(0, '.')
+from result_cache import ResultCache, DiskCache, normalize_filters
+
+
+def test_result_cache():
+    # Equivalent filter dicts share a key
+    assert normalize_filters({'seasons': [2024, 2023], 'venue': None}) == normalize_filters({'seasons': [2023, 2024]})
+    assert normalize_filters({}) == normalize_filters(None) == ()
+    assert normalize_filters({'match_phase': 'powerplay'}) != normalize_filters({'match_phase': 'death_overs'})
+
+    # LRU: touching 'a' keeps it, 'b' is evicted
+    cache = ResultCache(max_entries=2, ttl=None)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == (True, 1)
+    cache.set('c', 3)
+    assert cache.get('b') == (False, None)
+    assert cache.get('a') == (True, 1) and cache.get('c') == (True, 3)
+    assert cache.stats()['evictions'] == 1
+
+    # Callers can't mutate cached values
+    cache.set('stats', {'batting': {'runs': 10}})
+    _, value = cache.get('stats')
+    value['batting']['runs'] = -1
+    assert cache.get('stats')[1]['batting']['runs'] == 10
+
+    # TTL expiry counts as a miss
+    cache = ResultCache(max_entries=10, ttl=0.05)
+    calls = []
+    compute = lambda: calls.append(1) or len(calls)
+    assert cache.get_or_compute('k', compute) == 1
+    assert cache.get_or_compute('k', compute) == 1
+    time.sleep(0.1)
+    assert cache.get_or_compute('k', compute) == 2
+    stats = cache.stats()
+    print(stats)
+    assert stats['hits'] == 1 and stats['misses'] == 2 and stats['expirations'] == 1
+
+
+def test_disk_tier_survives_restart_until_data_changes():
+    path = os.path.join(tempfile.mkdtemp(), 'results.sqlite')
+    key = ('player_stats', 'V Kohli', (('match_phase', 'powerplay'),))
+
+    ResultCache(backing=DiskCache(path, 'v1')).set(key, {'runs': 100})
+
+    # Fresh in-memory tier (a restart) is served from disk
+    cache = ResultCache(backing=DiskCache(path, 'v1'))
+    assert cache.get(key) == (True, {'runs': 100})
+    assert cache.stats()['disk_hits'] == 1
+
+    # A new dataset version purges the old rows
+    cache = ResultCache(backing=DiskCache(path, 'v2'))
+    assert cache.get(key) == (False, None)
+    assert cache.stats()['disk_entries'] == 0
+
+
+def test_disk_tier_is_bounded_on_write():
+    path = os.path.join(tempfile.mkdtemp(), 'results.sqlite')
+    disk = DiskCache(path, 'v1', max_entries=10)
+    for i in range(25):
+        disk.set(('k', i), {'i': i}, stored_at=1000.0 + i)
+        assert len(disk) <= 10
+    assert disk.get(('k', 24)) == (True, {'i': 24}) and disk.get(('k', 0)) == (False, None)
+
+    # Rewriting cached keys does not push fresh ones out
+    size = len(disk)
+    for i in range(30):
+        disk.set(('k', 24), {'i': 24}, stored_at=2000.0 + i)
+    assert len(disk) >= size - 1 and disk.get(('k', 23)) == (True, {'i': 23})
+
+
+def test_failed_computations_are_not_cached():
+    cache = ResultCache(max_entries=10, ttl=None)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        return {'runs': 100}
+
+    try:
+        cache.get_or_compute('k', compute)
+        raise AssertionError("expected the computation's error")
+    except RuntimeError:
+        pass
+    assert cache.get('k') == (False, None)
+    assert cache.get_or_compute('k', compute) == {'runs': 100} and len(calls) == 2
+
+    # A head-to-head that fails is reported, not stored
+    from engine_context import EngineContext
+    engine = EngineContext.get('.').stats_engine
+    filters = {'venue': 5}  # not a list of venue names: the filtered lookup raises
+    result = engine.get_player_head_to_head('V Kohli', 'JJ Bumrah', filters)
+    assert result['error'] is True
+    key = engine._cache_key('head_to_head', 'V Kohli', 'JJ Bumrah', normalize_filters(filters))
+    assert engine._result_cache.get(key) == (False, None)
+
+
+def test_concurrent_misses_share_one_computation():
+    cache = ResultCache(max_entries=10, ttl=None)
+    calls = []
+    results = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return {'runs': 100}
+
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute('k', compute))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1 and len(results) == 8
+    # Every caller got an equal but independent copy
+    assert all(r == {'runs': 100} for r in results) and len({id(r) for r in results}) == 8
+    assert cache.stats()['coalesced'] == 7
+
+
+if __name__ == "__main__":
+    test_result_cache()
+    test_disk_tier_survives_restart_until_data_changes()
+    test_disk_tier_is_bounded_on_write()
+    test_failed_computations_are_not_cached()
+    test_concurrent_misses_share_one_computation()
+    print("\n✅ Result cache behaves as expected")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Verify selection recommendations pick from the named team, and weigh an opponent only when one is named"""
+
+import sys
+sys.path.insert(0, '.')
+import config
+config.LLM_BACKEND = 'local'
+from engine_context import EngineContext
+
+
+def _squad(recommender, team: str, role: str) -> set:
+    squads = recommender.squads
+    ids = squads[(squads['team'] == team) & (squads['role'] == role)
+                 & (squads['year'] == recommender.latest_year)]['player_id'].unique()
+    names = recommender.matchups.batters if role == 'batter' else recommender.matchups.bowlers
+    return {names[int(i)] for i in ids}
+
+
+def _table_players(markdown: str, heading: str) -> list:
+    section = markdown.split(heading, 1)[1].split('\n\n')[1]
+    return [line.split('**')[1] for line in section.splitlines()[2:]]
+
+
+def test_picks_from_named_team():
+    chatbot = EngineContext.get('.').get_chatbot(None)
+    recommender = chatbot.stats_engine.recommender
+    csk = 'Chennai Super Kings'
+
+    parsed = {'opposition_team': csk, 'match_phase': 'powerplay', 'query_type': 'predictions',
+              'interpretation': 'Best CSK powerplay batters'}
+    markdown = chatbot._route_query("who should bat for CSK in powerplay", parsed).blocks[0].text
+    batters = _table_players(markdown, f"Recommended Batters for {csk} (Powerplay)")
+    bowlers = _table_players(markdown, f"Recommended Bowlers for {csk} (Powerplay)")
+    assert batters and set(batters) <= _squad(recommender, csk, 'batter')
+    assert bowlers and set(bowlers) <= _squad(recommender, csk, 'bowler')
+    assert "Super Kings's" not in markdown
+
+    # "against" makes the named team the opponent: its own players are left out
+    markdown = chatbot._route_query("best death bowlers against CSK", dict(parsed, match_phase='death_overs')).blocks[0].text
+    bowlers = _table_players(markdown, f"Recommended Bowlers vs {csk} (Death Overs)")
+    assert bowlers and not set(bowlers) & _squad(recommender, csk, 'bowler')
+
+    # Two teams: pick from the first, weighted against the second
+    parsed = {'team_list': ['Mumbai Indians', csk], 'match_phase': 'death_overs', 'query_type': 'predictions',
+              'interpretation': 'MI death bowlers vs CSK'}
+    markdown = chatbot._route_query("best death bowlers for MI against CSK", parsed).blocks[0].text
+    bowlers = _table_players(markdown, f"Recommended Bowlers for Mumbai Indians vs {csk} (Death Overs)")
+    assert bowlers and set(bowlers) <= _squad(recommender, 'Mumbai Indians', 'bowler')
+    assert bowlers == [b['player'] for b in recommender.recommend_bowlers(csk, 'death_overs', team='Mumbai Indians')]
+
+
+if __name__ == "__main__":
+    test_picks_from_named_team()
+    print("✅ Selection recommendations pick from the right team")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Verify symmetric-delete spelling correction of query words"""
+
+import sys
+sys.path.insert(0, '.')
+import config
+config.LLM_BACKEND = 'local'
+from engine_context import EngineContext
+from spell_correction import SpellCorrector, CRICKET_WORDS, COMMON_WORDS, edit_distance
+
+
+def build_corrector() -> SpellCorrector:
+    corrector = SpellCorrector(max_edit_distance=2)
+    corrector.add_aliases({
+        'JJ Bumrah': ['jasprit bumrah', 'jasprit', 'jaspit bumrah', 'bumra', 'jasprit bumra'],
+        'HH Pandya': ['hardik pandya', 'hardik', 'hardik sharmaa'],
+        'RG Sharma': ['rohit sharma', 'rohit'],
+        'Mohit Rathee': ['mohit'],
+    }, weights={'JJ Bumrah': 3000, 'HH Pandya': 2500, 'RG Sharma': 5000, 'Mohit Rathee': 50})
+    corrector.add_aliases({'Wankhede Stadium': []}, default_weight=10000)
+    corrector.add_words(CRICKET_WORDS, 10000)
+    return corrector
+
+
+def test_edit_distance():
+    assert edit_distance('bumrah', 'bumrah', 2) == 0
+    assert edit_distance('bumrha', 'bumrah', 2) == 1  # transposition counts once
+    assert edit_distance('wankede', 'wankhede', 2) == 1
+    assert edit_distance('kohli', 'bumrah', 2) == 3  # gives up past the limit
+
+
+def test_alias_misspellings_are_not_vocabulary():
+    corrector = build_corrector()
+    assert {'jasprit', 'bumrah', 'hardik', 'rohit', 'mohit'} <= set(corrector.words)
+    # Typos collected in the alias lists correct towards the real spelling
+    assert 'jaspit' not in corrector.words and 'bumra' not in corrector.words
+    assert 'sharmaa' not in corrector.words
+
+
+def test_correct_query():
+    corrector = build_corrector()
+    assert corrector.correct('jaspit bumra at wankede in powerply') == 'jasprit bumrah at wankhede in powerplay'
+    assert corrector.correct('rohit sharmaa in deth overs 2024') == 'rohit sharma in death overs 2024'
+
+    # Known words, short words, numbers and words with nothing close are left alone
+    assert corrector.correct('should mohit open in 2024') == 'should mohit open in 2024'
+    assert corrector.correct('how good is xyzzy') == 'how good is xyzzy'
+    assert corrector.lookup('zzzzzzz') is None
+
+
+
+def test_english_and_keywords_are_kept():
+    corrector = build_corrector()
+    corrector.add_known_words(COMMON_WORDS)
+    corrector.add_words(['chase', 'least', 'match'], 10000)
+    corrector.guard_words(['chase', 'least', 'match', 'stadium'])
+
+    # Everyday words are no misspelling of a keyword, and keywords are only reached beside a name
+    assert corrector.correct('top 10 run scorers please') == 'top 10 run scorers please'
+    assert corrector.correct('how did they fare in the chse') == 'how did they fare in the chse'
+    assert corrector.correct('wankede stadum') == 'wankhede stadium'
+    assert corrector.correct('bumra chse') == 'bumrah chase'
+
+
+def test_chatbot_keeps_query_words():
+    chatbot = EngineContext.get('.').get_chatbot(None)
+    for query in ("kohli in death phase", "kohli powerplay phase 2024", "most catches in ipl",
+                  "top 10 run scorers please", "who bowled most dot balls", "kohli batted at three",
+                  "dhoni captaincy record", "gayle hits most sixes"):
+        assert chatbot._correct_spelling(query) == query, query
+    assert chatbot._correct_spelling("jaspit bumra at wankede") == "jasprit bumrah at wankhede"
+
+    parsed, _ = chatbot._parse_locally(chatbot._correct_spelling("kohli in death phase"))
+    assert parsed.get('match_situation') is None and parsed['match_phase'] == 'death_overs'
+
+
+if __name__ == "__main__":
+    test_edit_distance()
+    test_alias_misspellings_are_not_vocabulary()
+    test_correct_query()
+    test_english_and_keywords_are_kept()
+    test_chatbot_keeps_query_words()
+    print("✅ Spell correction behaves as expected")
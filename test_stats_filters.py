@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Verify API stats filters: validation, canonical form and cache key, and the filtered player endpoint"""
+
+import asyncio
+import sys
+sys.path.insert(0, '.')
+import config
+from models import StatsFilters
+from pydantic import ValidationError
+
+
+def test_canonical_filters():
+    first = StatsFilters(seasons=['2024,2023'], match_phase='Death Overs', vs_conditions='spin', innings_order=2)
+    second = StatsFilters(seasons=[2023, 2024, 2023], match_phase='death_overs', vs_conditions='vs_spin',
+                          innings_order=2, ground='  ')
+    assert first == second and hash(first) == hash(second) and first.cache_key() == second.cache_key()
+    assert first.to_filters() == {'seasons': [2023, 2024], 'match_phase': 'death_overs',
+                                  'vs_conditions': 'vs_spin', 'innings_order': 2}
+    assert StatsFilters().to_filters() == {} and StatsFilters().cache_key() == ()
+
+    for bad in ({'match_phase': 'tea_break'}, {'seasons': ['1999']}, {'seasons': ['abc']},
+                {'innings_order': 3}, {'bowler': 'JJ Bumrah'}):
+        try:
+            StatsFilters(**bad)
+            raise AssertionError(f"{bad} should not validate")
+        except ValidationError:
+            pass
+
+
+def test_filtered_player_endpoint():
+    config.LLM_BACKEND = 'local'
+    import api
+    from fastapi import HTTPException
+
+    filters = api.stats_filters(seasons=['2016'], phase='POWERPLAY', situation=None, vs_conditions=None,
+                                opposition='gujarat lions', ground='chinnaswamy', handedness=None, innings=None,
+                                match_type=None)
+    assert filters.opposition_team == 'Gujarat Lions' and filters.ground == 'M Chinnaswamy Stadium'
+
+    result = asyncio.run(api.get_player_stats('V Kohli', filters))
+    engine = api.stats_engine
+    assert result['data'] == engine._compute_player_stats('V Kohli', filters.to_filters())
+    assert result['filters']['seasons'] == [2016]
+    # The canonical filters are the engine's cache key
+    hit, cached = engine._result_cache.get(engine._cache_key('player_stats', 'V Kohli', filters.cache_key()))
+    assert hit and cached == result['data']
+
+    unfiltered = asyncio.run(api.get_player_stats('V Kohli', StatsFilters()))
+    assert unfiltered['data']['batting']['runs'] > result['data']['batting']['runs']
+
+    for bad in ({'phase': 'tea_break'}, {'opposition': 'qqqqqqqq'}):
+        params = dict(seasons=None, phase=None, situation=None, vs_conditions=None, opposition=None, ground=None,
+                      handedness=None, innings=None, match_type=None)
+        params.update(bad)
+        try:
+            api.stats_filters(**params)
+            raise AssertionError(f"{bad} should be rejected")
+        except HTTPException as e:
+            assert e.status_code == 422
+
+
+if __name__ == "__main__":
+    test_canonical_filters()
+    test_filtered_player_endpoint()
+    print("✅ Stats filters behave as expected")
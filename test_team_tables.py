@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Verify the team tables against the raw matches and deliveries, with franchise names merged"""
+
+import sys
+sys.path.insert(0, '.')
+from engine_context import EngineContext
+from cricket_conventions import TEAM_NAME_MAPPING, normalize_team
+
+
+def test_team_seasons_match_raw_matches():
+    engine = EngineContext.get('.').stats_engine
+    tables, matches = engine.team_tables, engine.matches_df
+    assert not set(TEAM_NAME_MAPPING) & set(tables.team_seasons['team'])
+
+    for team, year in (('Royal Challengers Bengaluru', 2015), ('Chennai Super Kings', 2023), ('Punjab Kings', 2014)):
+        names = {team} | {old for old, new in TEAM_NAME_MAPPING.items() if new == team}
+        raw = matches[(matches['year'] == year) & (matches['team1'].isin(names) | matches['team2'].isin(names))]
+        row = tables.team_seasons[(tables.team_seasons['team'] == team) & (tables.team_seasons['year'] == year)].iloc[0]
+        assert row['matches'] == len(raw) and row['wins'] == raw['winner'].isin(names).sum()
+
+    # Both paths of team stats see the same matches under either RCB name
+    whole = engine._compute_team_stats('Royal Challengers Bangalore', {'seasons': [2015]})
+    home = engine._compute_team_stats('Royal Challengers Bangalore', {'seasons': [2015], 'home_away': 'home'})
+    away = engine._compute_team_stats('Royal Challengers Bengaluru', {'seasons': [2015], 'home_away': 'away'})
+    assert whole['matches'] == home['matches'] + away['matches'] and whole['wins'] == home['wins'] + away['wins']
+
+
+def test_champions_match_labelled_finals():
+    engine = EngineContext.get('.').stats_engine
+    finals = engine.matches_df[engine.matches_df['match_type'] == 'Final']
+    assert len(finals) > 10
+    champions = engine.team_tables.champions.set_index('year')
+    for _, final in finals.iterrows():
+        assert champions.at[final['year'], 'final_match_id'] == final['id']
+        assert champions.at[final['year'], 'champion'] == normalize_team(final['winner'])
+
+
+def test_team_innings_match_raw_deliveries():
+    engine = EngineContext.get('.').stats_engine
+    deliveries, innings = engine.deliveries_df, engine.team_tables.team_innings
+    for match_id in innings['match_id'].drop_duplicates().sample(20, random_state=0):
+        for _, row in innings[innings['match_id'] == match_id].iterrows():
+            balls = deliveries[(deliveries['match_id'] == match_id) & (deliveries['inning'] == row['inning'])]
+            assert row['runs'] == balls['total_runs'].sum()
+            assert row['powerplay_runs'] == balls.loc[balls['over'] <= 5, 'total_runs'].sum()
+            assert row['death_overs_runs'] == balls.loc[balls['over'] >= 16, 'total_runs'].sum()
+            assert row['batting_team'] == normalize_team(balls['batting_team'].iloc[0])
+
+    # Squads follow renamed franchises into their latest season
+    squads = engine.recommender.squads
+    assert not set(TEAM_NAME_MAPPING) & set(squads['team'])
+    assert {2018, 2020} <= set(squads.loc[squads['team'] == 'Punjab Kings', 'year'])
+
+
+if __name__ == "__main__":
+    test_team_seasons_match_raw_matches()
+    test_champions_match_labelled_finals()
+    test_team_innings_match_raw_deliveries()
+    print("✅ Team tables match the raw data")
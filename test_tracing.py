@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Verify request tracing: nested span timings, notes, record caps and the latency log"""
+
+import sys
+import time
+sys.path.insert(0, '.')
+from tracing import (Trace, StageLatencyLog, start_trace, span, traced, note, record_rows, record_filters,
+                     current_trace)
+from result_cache import ResultCache
+
+
+@traced('stats.compute')
+def compute():
+    time.sleep(0.02)
+    record_rows('deliveries', 120)
+    return 42
+
+
+def test_spans_and_notes():
+    # Outside a trace every helper is a no-op
+    assert compute() == 42 and current_trace() is None
+
+    cache = ResultCache(name='stats')
+    with start_trace('kohli stats') as trace:
+        note('query_type', 'player_stats')
+        with span('answer'):
+            cache.get_or_compute(('player_stats', 'V Kohli'), compute)
+            cache.get_or_compute(('player_stats', 'V Kohli'), compute)
+            record_filters('cricket_filters', {'match_phase': 'powerplay', 'seasons': None})
+            record_filters('cricket_filters', {'match_phase': 'powerplay'})
+    assert current_trace() is None
+
+    result = trace.to_dict()
+    assert result['query_type'] == 'player_stats'
+    assert result['rows'] == [{'stage': 'deliveries', 'rows': 120}]
+    assert result['filters'] == [{'stage': 'cricket_filters', 'filters': {'match_phase': 'powerplay'}}]
+    assert [lookup['hit'] for lookup in result['cache']] == [False, True]
+
+    # The answer span's self time excludes the nested computation
+    timings = result['timings']
+    assert timings['stats.compute']['calls'] == 1 and timings['stats.compute']['total_ms'] >= 20
+    assert timings['answer']['self_ms'] < timings['answer']['total_ms'] - 19
+    print(timings)
+
+
+def test_record_cap_and_latency_log():
+    with start_trace('top wicket takers 2023') as trace:
+        for _ in range(Trace.MAX_RECORDS + 5):
+            with span('stats.player'):
+                record_rows('deliveries', 1)
+    assert len(trace.rows) == Trace.MAX_RECORDS and trace.dropped == 10
+    assert trace.stage_timings()['stats.player']['calls'] == Trace.MAX_RECORDS + 5
+
+    log = StageLatencyLog(slow_ms=0)
+    log.record(trace)
+    summary = log.summary()
+    assert summary['requests'] == 1 and 'stats.player' in summary['stages']
+    assert len(log.slow_traces) == 1
+
+
+if __name__ == "__main__":
+    test_spans_and_notes()
+    test_record_cap_and_latency_log()
+    print("✅ Tracing behaves as expected")
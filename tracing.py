@@ -0,0 +1,225 @@
+"""
+Per-stage latency tracing for chatbot requests
+
+A Trace is bound to the current context (contextvars), so the stats engine,
+caches and parsers can record spans and notes without it being passed through
+every call - and asyncio.to_thread carries it into worker threads. With no
+active trace every helper here is a single context lookup.
+"""
+
+import contextvars
+import functools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar('ipl_trace', default=None)
+
+
+class Trace:
+    """Timed spans plus what was resolved, filtered and cached while answering one query
+
+    Stage timings are aggregated as spans close; the individual span, row-count
+    and cache records are capped at MAX_RECORDS each (a season ranking runs the
+    stats engine for hundreds of players), with the overflow only counted.
+    """
+
+    MAX_RECORDS = 200
+
+    def __init__(self, query: str):
+        self.query = query
+        self.started = time.perf_counter()
+        self.total_ms: Optional[float] = None
+        self.spans: List[Dict] = []
+        self._open: List[Dict] = []
+        self.notes: Dict[str, Any] = {}
+        self.entities: Dict[str, Optional[str]] = {}
+        self.filters: List[Dict] = []
+        self.rows: List[Dict] = []
+        self.cache: List[Dict] = []
+        self.dropped = 0
+        self._stages: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _append(self, records: List, record: Any):
+        if len(records) < self.MAX_RECORDS:
+            records.append(record)
+        else:
+            self.dropped += 1
+
+    def _elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def finish(self) -> 'Trace':
+        if self.total_ms is None:
+            self.total_ms = round(self._elapsed_ms(), 3)
+        return self
+
+    def _close_span(self, record: Dict):
+        with self._lock:
+            stage = self._stages.setdefault(record['name'], {'calls': 0, 'total_ms': 0.0, 'self_ms': 0.0})
+            stage['calls'] += 1
+            stage['total_ms'] += record['duration_ms']
+            stage['self_ms'] += record['duration_ms'] - record['child_ms']
+            self._append(self.spans, record)
+
+    def stage_timings(self) -> Dict[str, Dict]:
+        """Per span name: calls, total time, and self time (excluding nested spans)"""
+        with self._lock:
+            return {name: {'calls': stage['calls'], 'total_ms': round(stage['total_ms'], 3),
+                           'self_ms': round(stage['self_ms'], 3)}
+                    for name, stage in self._stages.items()}
+
+    def to_dict(self) -> Dict:
+        self.finish()
+        return {
+            'query': self.query,
+            'total_ms': self.total_ms,
+            **self.notes,
+            'entities': dict(self.entities),
+            'filters': list(self.filters),
+            'rows': list(self.rows),
+            'cache': list(self.cache),
+            'timings': self.stage_timings(),
+            'spans': [{key: value for key, value in record.items() if key != 'child_ms'} for record in self.spans],
+            'dropped_records': self.dropped,
+        }
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def start_trace(query: str):
+    """Collect spans for everything run inside the block into a new Trace"""
+    trace = Trace(query)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        trace.finish()
+        _current_trace.reset(token)
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time a stage of the current trace; nested spans are charged to their parent's child time"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    record = {'name': name, 'depth': len(trace._open), 'start_ms': round(trace._elapsed_ms(), 3), **attrs}
+    started = time.perf_counter()
+    trace._open.append(record)
+    record['child_ms'] = 0.0
+    try:
+        yield record
+    finally:
+        trace._open.pop()
+        record['duration_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        if trace._open:
+            trace._open[-1]['child_ms'] += record['duration_ms']
+        trace._close_span(record)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorator: run the function inside span(name or its qualified name)"""
+    def decorate(fn: Callable) -> Callable:
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current_trace.get() is None:
+                return fn(*args, **kwargs)
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def note(key: str, value: Any):
+    """Attach a value (parsed intent, routed query type, ...) to the current trace"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.notes[key] = value
+
+
+def record_entity(raw: str, resolved: Optional[str]):
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.entities[raw] = resolved
+
+
+def record_filters(stage: str, filters: Optional[Dict]):
+    """The filters a stage actually applied (None values dropped), each distinct plan once"""
+    trace = _current_trace.get()
+    if trace is not None and filters:
+        applied = {'stage': stage, 'filters': {key: value for key, value in filters.items() if value is not None}}
+        with trace._lock:
+            if applied['filters'] and applied not in trace.filters:
+                trace._append(trace.filters, applied)
+
+
+def record_rows(stage: str, rows: int):
+    trace = _current_trace.get()
+    if trace is not None:
+        with trace._lock:
+            trace._append(trace.rows, {'stage': stage, 'rows': int(rows)})
+
+
+def record_cache(cache: str, key: Hashable, hit: bool):
+    """A cache lookup; keys are shown by their leading label ('player_stats', 'parse', ...)"""
+    trace = _current_trace.get()
+    if trace is not None:
+        label = key[0] if isinstance(key, tuple) and key and isinstance(key[0], str) else None
+        with trace._lock:
+            trace._append(trace.cache, {'cache': cache, 'key': label, 'hit': hit})
+
+
+class StageLatencyLog:
+    """Stage timings of recent traces, for per-stage percentiles, plus the slowest traces in full"""
+
+    def __init__(self, max_traces: int = 1000, slow_ms: Optional[float] = None, keep_slow: int = 50):
+        self.slow_ms = slow_ms
+        self._timings: deque = deque(maxlen=max_traces)
+        self.slow_traces: deque = deque(maxlen=keep_slow)
+        self._lock = threading.Lock()
+
+    def record(self, trace: Trace):
+        trace.finish()
+        with self._lock:
+            self._timings.append((trace.total_ms, trace.stage_timings()))
+            if self.slow_ms is not None and trace.total_ms >= self.slow_ms:
+                self.slow_traces.append(trace.to_dict())
+
+    @staticmethod
+    def _percentile(values: List[float], fraction: float) -> float:
+        ordered = sorted(values)
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 3)
+
+    def summary(self) -> Dict:
+        """Request and per-stage (self time) p50/p95/p99 in milliseconds over recent traces"""
+        with self._lock:
+            timings = list(self._timings)
+        if not timings:
+            return {'requests': 0, 'stages': {}}
+        per_stage: Dict[str, List[float]] = {}
+        for _, stages in timings:
+            for name, stage in stages.items():
+                per_stage.setdefault(name, []).append(stage['self_ms'])
+        totals = [total for total, _ in timings]
+        return {
+            'requests': len(timings),
+            'p50_ms': self._percentile(totals, 0.50),
+            'p95_ms': self._percentile(totals, 0.95),
+            'p99_ms': self._percentile(totals, 0.99),
+            'slow_traces': len(self.slow_traces),
+            'stages': {name: {'requests': len(values),
+                              'p50_ms': self._percentile(values, 0.50),
+                              'p95_ms': self._percentile(values, 0.95),
+                              'p99_ms': self._percentile(values, 0.99)}
+                       for name, values in sorted(per_stage.items())},
+        }